@@ -1,6 +1,7 @@
 import os
 import sys
-from sqlalchemy import create_engine, event
+from typing import Callable
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
 from models.schema import Base
 
@@ -44,8 +45,33 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
 def init_db():
-    """모든 테이블 생성 (최초 실행 시)"""
+    """모든 테이블 생성 (최초 실행 시) + 기존 DB에 추가된 컬럼 반영"""
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    _create_missing_indexes()
+
+
+def _add_missing_columns():
+    """
+    create_all은 기존 테이블을 변경하지 않으므로, 모델에 새로 추가된 nullable 컬럼을
+    ALTER TABLE ADD COLUMN으로 보충 (별도 마이그레이션 도구 없이 이전 버전 DB 호환 유지)
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {col_type}'))
+
+
+def _create_missing_indexes():
+    """기존 테이블에 모델에 새로 추가된 인덱스 생성 (이미 있으면 건너뜀)"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 
 def get_db() -> Session:
@@ -55,3 +81,15 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+def run_in_session(fn: Callable, *args, **kwargs):
+    """
+    전용 세션으로 fn(db, ...) 실행 — asyncio.to_thread로 넘길 동기 작업용.
+    세션은 스레드 간에 공유할 수 없으므로 요청 세션(get_db) 대신 사용
+    """
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
@@ -0,0 +1,287 @@
+import json
+import logging
+import os
+import sys
+import time
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 임베딩 백엔드 선택 — auto: onnxruntime이 있으면 onnx (fp32), 없으면 torch
+#   torch: sentence-transformers (PyTorch fp32)
+#   onnx: 내보낸 ONNX 그래프 (fp32, PyTorch와 같은 벡터)
+#   onnx-int8: 동적 int8 양자화 그래프 — 명시적으로 선택했을 때만, fp32 대비 패리티 검사를 통과해야 사용
+EMBEDDING_BACKEND = os.environ.get("CLASP_EMBEDDING_BACKEND", "auto")
+BACKENDS = ("torch", "onnx", "onnx-int8")
+# 요청한 백엔드를 쓸 수 없을 때 차례로 시도하는 대체 백엔드
+_FALLBACKS = {"onnx-int8": ("onnx-int8", "onnx", "torch"), "onnx": ("onnx", "torch"), "torch": ("torch",)}
+
+# sentence-transformers 모델과 같은 최대 토큰 길이 (paraphrase-multilingual-MiniLM-L12-v2: 128)
+MAX_SEQ_LENGTH = 128
+# ONNX 백엔드가 PyTorch fp32와 일치한다고 보는 최소 코사인 유사도
+PARITY_MIN_COSINE = 0.99
+# int8 패리티 검사에 쓰는 예문 — 분류 대상 문서와 비슷한 한국어·영어 혼합 문장
+PARITY_SAMPLES = [
+    "운영체제 과제 보고서 — 프로세스 스케줄링 알고리즘 비교",
+    "2024년 1분기 매출 정산 및 예산 집행 현황",
+    "캡스톤디자인 최종 발표자료: 딥러닝 기반 이미지 분류 서비스",
+    "회의록 - 신규 서비스 기획 검토 및 일정 협의",
+    "Database normalization and SQL query optimization lecture notes",
+    "Quarterly revenue report with regional sales breakdown",
+    "설문 결과 데이터 전처리 및 시각화 파이프라인",
+    "웹 백엔드 API 서버 구현과 인증 보안 설계",
+    "계약서 초안: 용역 범위, 대금 지급 조건, 비밀유지 조항",
+    "실험 데이터 CSV 로그 수집과 통계 분석 결과",
+    "머신러닝 기말과제 — 선형대수와 확률 기초 정리",
+    "Project plan and milestone schedule for the mobile app release",
+]
+
+
+def _get_models_dir() -> str:
+    """내보낸 ONNX 모델 저장 경로 (database.py의 DB_DIR과 동일 위치)"""
+    if sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support/Clasp")
+    elif sys.platform == "win32":
+        base = os.path.join(os.environ.get("APPDATA", os.path.expanduser("~")), "Clasp")
+    else:
+        base = os.path.join(
+            os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share")), "Clasp"
+        )
+    return os.path.join(base, "models")
+
+
+class OnnxEncoder:
+    """
+    ONNX Runtime으로 실행하는 문장 인코더 — SentenceTransformer.encode와 같은 호출 방식·결과 형태.
+    같은 토크나이저로 토큰화한 뒤 transformer 출력을 attention mask 기준 평균 풀링 (원본 모델의 Pooling 모듈과 동일)
+    """
+
+    def __init__(self, model_path: str, tokenizer, max_seq_length: int = MAX_SEQ_LENGTH):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = onnxruntime.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"],
+        )
+        self._input_names = {i.name for i in self._session.get_inputs()}
+        self.tokenizer = tokenizer
+        self.max_seq_length = max_seq_length
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        tokens = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+        feeds = {name: tokens[name].astype(np.int64) for name in self._input_names if name in tokens}
+        hidden = self._session.run(None, feeds)[0]
+        mask = tokens["attention_mask"][..., None].astype(np.float32)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences, batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        embeddings = np.concatenate([
+            self._encode_batch(texts[start:start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ]).astype(np.float32)
+        return embeddings[0] if single else embeddings
+
+
+def _export_onnx(model_name: str, model_dir: str, quantize: bool) -> str:
+    """
+    PyTorch 모델을 ONNX로 한 번 내보내고 (필요하면 int8 동적 양자화) 경로 반환.
+    이미 내보낸 파일이 있으면 재사용 — 처음 한 번만 PyTorch가 필요
+    """
+    fp32_path = os.path.join(model_dir, "model.onnx")
+    int8_path = os.path.join(model_dir, "model.int8.onnx")
+    target = int8_path if quantize else fp32_path
+    if os.path.exists(target):
+        return target
+
+    os.makedirs(model_dir, exist_ok=True)
+    if not os.path.exists(fp32_path):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        st_model = SentenceTransformer(model_name, device="cpu")
+        transformer = st_model[0].auto_model.eval()
+        st_model.tokenizer.save_pretrained(model_dir)
+        sample = st_model.tokenizer(["export"], return_tensors="pt")
+        tmp_path = fp32_path + ".tmp"
+        with torch.no_grad():
+            torch.onnx.export(
+                transformer,
+                (sample["input_ids"], sample["attention_mask"]),
+                tmp_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "last_hidden_state": {0: "batch", 1: "sequence"},
+                },
+                opset_version=14,
+            )
+        os.replace(tmp_path, fp32_path)
+        logger.info("ONNX 모델 내보내기 완료: %s", fp32_path)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        tmp_path = int8_path + ".tmp"
+        quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, int8_path)
+        logger.info("int8 양자화 완료: %s", int8_path)
+    return target
+
+
+def min_cosine(a: np.ndarray, b: np.ndarray) -> float:
+    """같은 순서의 두 임베딩 행렬에서 행별 코사인 유사도의 최솟값"""
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return float((a * b).sum(axis=1).min())
+
+
+def _int8_parity(model_dir: str, tokenizer) -> float:
+    """
+    int8 그래프와 fp32 그래프의 PARITY_SAMPLES 임베딩 코사인 최솟값.
+    양자화 파일마다 한 번만 계산해 model.int8.parity.json에 기록
+    """
+    int8_path = os.path.join(model_dir, "model.int8.onnx")
+    record_path = os.path.join(model_dir, "model.int8.parity.json")
+    mtime_ns = os.stat(int8_path).st_mtime_ns
+    try:
+        with open(record_path, "r", encoding="utf-8") as f:
+            record = json.load(f)
+        if record.get("mtime_ns") == mtime_ns:
+            return record["min_cosine"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    fp32 = OnnxEncoder(os.path.join(model_dir, "model.onnx"), tokenizer)
+    int8 = OnnxEncoder(int8_path, tokenizer)
+    value = min_cosine(fp32.encode(PARITY_SAMPLES), int8.encode(PARITY_SAMPLES))
+    try:
+        with open(record_path, "w", encoding="utf-8") as f:
+            json.dump({"mtime_ns": mtime_ns, "min_cosine": value}, f)
+    except OSError:
+        pass
+    return value
+
+
+def _load_onnx(model_name: str, quantize: bool) -> OnnxEncoder:
+    from transformers import AutoTokenizer
+
+    model_dir = os.path.join(_get_models_dir(), model_name)
+    model_path = _export_onnx(model_name, model_dir, quantize)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    if quantize:
+        parity = _int8_parity(model_dir, tokenizer)
+        if parity < PARITY_MIN_COSINE:
+            raise RuntimeError(f"int8 패리티 미달 (cosine min {parity:.4f} < {PARITY_MIN_COSINE})")
+    return OnnxEncoder(model_path, tokenizer)
+
+
+def _load_torch(model_name: str):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def resolve_backend(requested: Optional[str] = None) -> str:
+    """설정값을 실제 백엔드 이름으로 — auto는 onnxruntime 설치 여부로 결정 (int8은 자동 선택하지 않음)"""
+    requested = (requested or EMBEDDING_BACKEND).lower()
+    if requested in BACKENDS:
+        return requested
+    try:
+        import onnxruntime  # noqa: F401
+        return "onnx"
+    except ImportError:
+        return "torch"
+
+
+def load_encoder(model_name: str, backend: Optional[str] = None) -> tuple[object, str]:
+    """
+    (인코더, 실제로 사용한 백엔드) 반환.
+    요청한 백엔드를 쓸 수 없으면 (onnxruntime 미설치·내보내기 실패·int8 패리티 미달 등)
+    onnx-int8 → onnx → torch 순서로 대체
+    """
+    candidates = _FALLBACKS[resolve_backend(backend)]
+    for candidate in candidates[:-1]:
+        try:
+            return _load_onnx(model_name, quantize=candidate == "onnx-int8"), candidate
+        except Exception as e:
+            logger.warning("임베딩 백엔드 %s 사용 불가 — 다음 백엔드로 대체: %s", candidate, e)
+    return _load_torch(model_name), "torch"
+
+
+def compare_backends(
+    model_name: str,
+    texts: list[str],
+    backends: tuple[str, ...] = BACKENDS,
+    batch_size: int = 32,
+) -> dict[str, dict]:
+    """
+    백엔드별 처리량과 PyTorch fp32 대비 코사인 일치도 측정.
+    반환: {backend: {docs_per_sec, speedup, min_cosine, mean_cosine}} (사용할 수 없는 백엔드는 제외)
+    """
+    report: dict[str, dict] = {}
+    reference: Optional[np.ndarray] = None
+    for requested in ("torch", *[b for b in backends if b != "torch"]):
+        encoder, backend = load_encoder(model_name, requested)
+        if backend != requested:
+            continue
+        encoder.encode(texts[:batch_size], batch_size=batch_size)  # 워밍업
+        started = time.perf_counter()
+        embeddings = np.asarray(encoder.encode(texts, batch_size=batch_size), dtype=np.float32)
+        elapsed = time.perf_counter() - started
+
+        normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        if reference is None:
+            reference = normalized
+        cosines = (normalized * reference).sum(axis=1)
+        report[backend] = {
+            "docs_per_sec": len(texts) / elapsed,
+            "min_cosine": float(cosines.min()),
+            "mean_cosine": float(cosines.mean()),
+        }
+    base = report.get("torch", {}).get("docs_per_sec")
+    for entry in report.values():
+        entry["speedup"] = entry["docs_per_sec"] / base if base else None
+    return {backend: report[backend] for backend in backends if backend in report}
+
+
+def check_parity(model_name: str, texts: list[str], backend: str, min_cosine: float = PARITY_MIN_COSINE) -> bool:
+    """backend의 임베딩이 모든 텍스트에서 PyTorch fp32와 코사인 min_cosine 이상 일치하는지"""
+    report = compare_backends(model_name, texts, ("torch", backend))
+    if backend not in report:
+        return False
+    return report[backend]["min_cosine"] >= min_cosine
+
+
+if __name__ == "__main__":
+    # 패리티·성능 측정: python -m engines.embedding_backend [텍스트 파일 ...]
+    from engines.tier2_embedding import CATEGORY_KEYWORDS, MODEL_NAME, TAG_CANDIDATES
+
+    logging.basicConfig(level=logging.INFO)
+    if sys.argv[1:]:
+        samples = []
+        for path in sys.argv[1:]:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                samples.append(f.read()[:2000])
+    else:
+        words = [w for group in (*CATEGORY_KEYWORDS.values(), *TAG_CANDIDATES.values()) for w in group]
+        samples = [" ".join(words[i:i + 40]) for i in range(0, len(words), 5)]
+    for name, entry in compare_backends(MODEL_NAME, samples).items():
+        parity = "ok" if entry["min_cosine"] >= PARITY_MIN_COSINE else "FAIL"
+        print(
+            f"{name:10s} {entry['docs_per_sec']:8.1f} docs/s  x{entry['speedup'] or 0:.2f}  "
+            f"cosine min {entry['min_cosine']:.4f} mean {entry['mean_cosine']:.4f}  parity {parity}"
+        )
@@ -1,8 +1,12 @@
 import re
 import os
-from typing import Optional
-from sqlalchemy.orm import Session
-from models.schema import Classification, Rule, CustomExtension
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+from database import SessionLocal
+from models.schema import Rule, CustomExtension
+from utils.keyword_automaton import KeywordAutomaton
 
 # 확장자 → 기본 카테고리 매핑
 _EXT_CATEGORY_MAP = {
@@ -74,12 +78,95 @@ _FILENAME_PATTERNS = [
     (re.compile(r"(매뉴얼|manual|지침서|가이드|guide)", re.I), "문서"),
 ]
 
+# 파일명 키워드 패턴 전체를 합친 패턴 — 대부분의 파일명은 한 번의 검색으로 걸러지고, 걸린 경우만 순서대로 다시 확인
+_ANY_FILENAME_PATTERN = re.compile("|".join(pattern.pattern for pattern, _ in _FILENAME_PATTERNS), re.I)
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """DB Rule에서 매칭에 필요한 값만 뽑아 미리 정규화한 규칙"""
+    type: str
+    value: str
+    folder_name: str
+
+
+@dataclass(frozen=True)
+class Tier1Matcher:
+    """
+    규칙 + 확장자 매핑을 한 번 컴파일한 불변 매처 — 여러 스레드에서 잠금 없이 공유.
+    version: 컴파일 시점의 규칙 버전, invalidate_matcher() 이후에는 오래된 매처로 간주해 다시 컴파일
+    content_keywords: content 규칙 키워드 전체를 담은 오토마톤 — 텍스트를 한 번만 훑어 매칭되는 규칙을 모두 찾음
+    """
+    version: int
+    rules: tuple[CompiledRule, ...]
+    ext_map: Mapping[str, str]
+    content_keywords: KeywordAutomaton
+
+    def find_content_keywords(self, *texts: Optional[str]) -> set[str]:
+        """각 텍스트에 포함된 content 규칙 키워드의 합집합 — 텍스트끼리 이어 붙이지 않아 경계를 넘는 매칭은 없음"""
+        found: set[str] = set()
+        for text in texts:
+            found |= self.content_keywords.find(text)
+        return found
+
+
+# 규칙·커스텀 확장자가 바뀔 때마다 증가 — 컴파일된 매처의 version과 다르면 다시 컴파일
+_version = 0
+_matcher: Optional[Tier1Matcher] = None
+_matcher_lock = threading.Lock()
+
+
+def invalidate_matcher() -> None:
+    """규칙·커스텀 확장자 변경 후 호출 — 다음 분류 때 DB에서 다시 컴파일"""
+    global _version
+    with _matcher_lock:
+        _version += 1
+
+
+def _compile(version: int) -> Tier1Matcher:
+    db = SessionLocal()
+    try:
+        rules = db.query(Rule).order_by(Rule.priority).all()
+        custom_exts = db.query(CustomExtension).all()
+        compiled = tuple(
+            CompiledRule(type=rule.type, value=rule.value.lower(), folder_name=rule.folder_name)
+            for rule in rules
+        )
+        return Tier1Matcher(
+            version=version,
+            rules=compiled,
+            ext_map=MappingProxyType({
+                **_EXT_CATEGORY_MAP,
+                **{row.extension: row.category for row in custom_exts},
+            }),
+            content_keywords=KeywordAutomaton(rule.value for rule in compiled if rule.type == "content"),
+        )
+    finally:
+        db.close()
+
+
+def get_matcher() -> Tier1Matcher:
+    """현재 버전의 매처 반환 — 무효화된 뒤 처음 호출될 때만 DB를 조회"""
+    global _matcher
+    matcher = _matcher
+    if matcher is not None and matcher.version == _version:
+        return matcher
+    with _matcher_lock:
+        if _matcher is None or _matcher.version != _version:
+            _matcher = _compile(_version)
+        return _matcher
+
+
+def extract_year(filename: str) -> Optional[str]:
+    """파일명의 첫 연도 (date 규칙·연도 태그 기준)"""
+    match = _YEAR_PATTERN.search(filename)
+    return match.group() if match else None
+
 
 def run(
     file_path: str,
     filename: str,
     extension: str,
-    db: Session,
     manual_category: Optional[str] = None,
     extracted_text: Optional[str] = None,
 ) -> dict:
@@ -88,9 +175,55 @@ def run(
     - 수동 분류 결과 우선 참조
     - 사용자 정의 규칙 적용
     - 확장자 기본 매핑 fallback
+    규칙·확장자 매핑은 컴파일된 매처를 사용하므로 파일마다 DB를 조회하지 않음
     반환: { category, tag, confidence_score }
     """
+    return run_batch([filename], [extension], [extracted_text], [manual_category])[0]
+
+
+def run_batch(
+    filenames: list[str],
+    extensions: list[str],
+    extracted_texts: Optional[list[Optional[str]]] = None,
+    manual_categories: Optional[list[Optional[str]]] = None,
+) -> list[dict]:
+    """
+    여러 파일을 한 번에 Tier 1 분류 — 열마다 같은 길이의 목록을 받아 입력 순서대로 결과 반환.
+    매처는 배치당 한 번만 가져오고, 확장자 매핑은 배치 안의 고유 확장자만 조회.
+    반환: [{ category, tag, confidence_score }, ...]
+    """
+    count = len(filenames)
+    texts = extracted_texts or [None] * count
+    manuals = manual_categories or [None] * count
+    matcher = get_matcher()
+
+    ext_lowers = [extension.lstrip(".").lower() for extension in extensions]
+    ext_categories = {ext: matcher.ext_map.get(ext) for ext in set(ext_lowers)}
+    years = [extract_year(filename) for filename in filenames]
+    return [
+        _classify(matcher, filename, ext_lower, ext_categories[ext_lower], year, text, manual)
+        for filename, ext_lower, year, text, manual in zip(filenames, ext_lowers, years, texts, manuals)
+    ]
+
 
+def _result(category: Optional[str], year: Optional[str], confidence_score: float) -> dict:
+    return {
+        "category": category,
+        # 파일명에서 추출한 연도로 태그 생성
+        "tag": f"{category}_{year}" if category and year else None,
+        "confidence_score": confidence_score,
+    }
+
+
+def _classify(
+    matcher: Tier1Matcher,
+    filename: str,
+    ext_lower: str,
+    ext_category: Optional[str],
+    year: Optional[str],
+    extracted_text: Optional[str],
+    manual_category: Optional[str],
+) -> dict:
     # 수동 분류 결과 최우선 적용 (is_manual=True)
     if manual_category:
         return {
@@ -100,48 +233,24 @@ def run(
         }
 
     # 사용자 정의 규칙 적용 (우선순위 오름차순)
-    rules: list[Rule] = db.query(Rule).order_by(Rule.priority).all()
-    for rule in rules:
-        matched = _match_rule(rule, file_path, filename, extension, extracted_text)
-        if matched:
-            year_match = _YEAR_PATTERN.search(filename)
-            tag = f"{rule.folder_name}_{year_match.group()}" if year_match else None
-            return {
-                "category": rule.folder_name,
-                "tag": tag,
-                "confidence_score": 0.85,
-            }
+    # content 규칙 키워드는 첫 content 규칙을 만났을 때 본문·파일명을 한 번씩만 훑어 모두 찾아 둠
+    content_hits: Optional[set[str]] = None
+    for rule in matcher.rules:
+        if rule.type == "content" and content_hits is None:
+            content_hits = matcher.find_content_keywords(extracted_text, filename)
+        if _match_rule(rule, ext_lower, year, content_hits):
+            return _result(rule.folder_name, year, 0.85)
 
     # 파일명 키워드 패턴 매칭 (확장자 매핑보다 우선)
     filename_no_ext = os.path.splitext(filename)[0]
-    for pattern, matched_category in _FILENAME_PATTERNS:
-        if pattern.search(filename_no_ext):
-            year_match = _YEAR_PATTERN.search(filename)
-            tag = f"{matched_category}_{year_match.group()}" if year_match else None
-            return {
-                "category": matched_category,
-                "tag": tag,
-                "confidence_score": 0.82,
-            }
+    if _ANY_FILENAME_PATTERN.search(filename_no_ext):
+        for pattern, matched_category in _FILENAME_PATTERNS:
+            if pattern.search(filename_no_ext):
+                return _result(matched_category, year, 0.82)
 
     # 확장자 매핑 (기본 + 사용자 커스텀)
-    ext_lower = extension.lstrip(".").lower()
-    custom_exts = {
-        row.extension: row.category
-        for row in db.query(CustomExtension).all()
-    }
-    merged_ext_map = {**_EXT_CATEGORY_MAP, **custom_exts}
-
-    if ext_lower in merged_ext_map:
-        category = merged_ext_map[ext_lower]
-        # 파일명에서 연도 추출해 태그 생성
-        year_match = _YEAR_PATTERN.search(filename)
-        tag = f"{category}_{year_match.group()}" if year_match else None
-        return {
-            "category": category,
-            "tag": tag,
-            "confidence_score": 0.70,
-        }
+    if ext_category is not None:
+        return _result(ext_category, year, 0.70)
 
     return {
         "category": None,
@@ -151,26 +260,22 @@ def run(
 
 
 def _match_rule(
-    rule: Rule,
-    file_path: str,
-    filename: str,
-    extension: str,
-    extracted_text: Optional[str] = None,
+    rule: CompiledRule,
+    ext_lower: str,
+    year: Optional[str],
+    content_hits: Optional[set[str]] = None,
 ) -> bool:
-    """규칙 유형별 매칭"""
+    """규칙 유형별 매칭 — content 규칙은 오토마톤이 찾은 키워드 집합(content_hits)으로 판별"""
     rule_type = rule.type
-    value = rule.value.lower()
+    value = rule.value
 
     if rule_type == "extension":
-        return extension.lstrip(".").lower() == value
+        return ext_lower == value
 
     if rule_type == "date":
-        year_match = _YEAR_PATTERN.search(filename)
-        return bool(year_match and year_match.group() == value)
+        return year == value
 
     if rule_type == "content":
-        if extracted_text and value in extracted_text.lower():
-            return True
-        return value in filename.lower()
+        return value in content_hits
 
     return False
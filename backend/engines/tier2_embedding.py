@@ -1,12 +1,15 @@
+import hashlib
 import json
 import logging
 import os
 import re
 import sys
-from typing import Optional
+from typing import Callable, Optional
 
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+
+from engines import embedding_backend
+from utils.embedding_matrix import EmbeddingMatrix, normalize
 
 logger = logging.getLogger(__name__)
 
@@ -97,13 +100,31 @@ TAG_CANDIDATES = {
     ],
 }
 
-# 태그 임베딩 캐시
-_tag_embeddings: dict[str, dict[str, np.ndarray]] = {}
+# 카테고리별 태그 후보 임베딩 행렬 캐시
+_tag_embeddings: dict[str, EmbeddingMatrix] = {}
 # 커스텀 카테고리의 키워드를 태그 후보로 사용
 _custom_tag_candidates: dict[str, list[str]] = {}
+# 현재 카테고리 행렬에 반영된 커스텀 카테고리 키워드 — 바뀐 카테고리만 다시 인코딩
+_custom_category_keywords: dict[str, list[str]] = {}
+
+MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
 
 _model = None
-_category_embeddings = None
+# 실제로 로드된 임베딩 백엔드 (torch / onnx / onnx-int8)
+_backend: Optional[str] = None
+# 모델 이름 → (인코더, 백엔드) — 기본은 현재 프로세스에서 로드, 앱 실행 중에는 임베딩 서비스 프로세스
+_model_loader: Callable[[str], tuple[object, str]] = embedding_backend.load_encoder
+_category_embeddings: Optional[EmbeddingMatrix] = None
+
+# 한 번에 인코딩하는 텍스트 수 — CPU에서는 배치 인코딩이 문장 단위 인코딩보다 처리량이 몇 배 높음
+TIER2_BATCH_SIZE = int(os.environ.get("CLASP_TIER2_BATCH_SIZE", "32"))
+# 카테고리 분류·태그 추론에 사용하는 텍스트 길이
+_BODY_CHARS = 2000
+_TAG_CHARS = 300
+# 표지 유사도 그룹화에 사용하는 표지 텍스트 길이 (SIMILARITY_THRESHOLD가 이 길이 기준으로 정해짐)
+_COVER_CHARS = 500
+# run_batch가 파일별로 함께 돌려주는 상위 후보 수
+TOP_K = 3
 
 
 # ── 피드백 영속화 ──────────────────────────────────────────────────────────────
@@ -121,7 +142,7 @@ def _get_feedback_path() -> str:
     return os.path.join(base, "feedback_embeddings.json")
 
 
-def _load_feedback_to_embeddings(cat_embeddings: dict[str, np.ndarray]) -> None:
+def _load_feedback_to_embeddings(cat_embeddings: EmbeddingMatrix) -> None:
     """
     저장된 피드백 임베딩을 cat_embeddings에 덮어씀.
     파일이 없거나 손상된 경우 무시하고 계속 진행.
@@ -142,7 +163,7 @@ def _load_feedback_to_embeddings(cat_embeddings: dict[str, np.ndarray]) -> None:
         logger.warning("피드백 임베딩 로드 실패 (초기값 사용): %s", e)
 
 
-def _save_feedback_embeddings(cat_embeddings: dict[str, np.ndarray]) -> None:
+def _save_feedback_embeddings(cat_embeddings: EmbeddingMatrix) -> None:
     """보정된 카테고리 임베딩 전체를 JSON으로 저장"""
     path = _get_feedback_path()
     try:
@@ -155,177 +176,404 @@ def _save_feedback_embeddings(cat_embeddings: dict[str, np.ndarray]) -> None:
         logger.warning("피드백 임베딩 저장 실패: %s", e)
 
 
+# ── 카테고리·태그 임베딩 아티팩트 ────────────────────────────────────────────────
+# 내장 카테고리 중심 벡터와 태그 후보 행렬을 한 번 배치 인코딩해 디스크에 저장하고, 이후 실행은 mmap으로 읽음.
+# 버전 키 = (모델 ID, CATEGORY_KEYWORDS, TAG_CANDIDATES) 해시 — 모델이나 키워드 목록이 바뀌면 새로 생성
+
+def _get_artifact_dir() -> str:
+    return os.path.join(os.path.dirname(_get_feedback_path()), "embeddings")
+
+
+def _artifact_key() -> str:
+    payload = json.dumps(
+        {"model": model_id(), "categories": CATEGORY_KEYWORDS, "tags": TAG_CANDIDATES},
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _build_artifact() -> tuple[dict, np.ndarray]:
+    """
+    내장 카테고리 키워드와 태그 후보 전체를 중복 제거 후 한 번에 배치 인코딩.
+    반환: (색인 {categories, tags}, 정규화된 행렬 — 카테고리 행 다음에 카테고리별 태그 행)
+    """
+    tag_lists = {category: list(dict.fromkeys(tags)) for category, tags in TAG_CANDIDATES.items()}
+    texts = list(dict.fromkeys([
+        *(kw for keywords in CATEGORY_KEYWORDS.values() for kw in keywords),
+        *(tag for tags in tag_lists.values() for tag in tags),
+    ]))
+    encoded = dict(zip(texts, encode_texts(texts)))
+    rows = [
+        # 키워드별 개별 임베딩 후 평균 — 단순 문자열 결합보다 각 키워드 의미가 고르게 반영됨
+        np.mean([encoded[kw] for kw in keywords], axis=0)
+        for keywords in CATEGORY_KEYWORDS.values()
+    ]
+    rows.extend(encoded[tag] for tags in tag_lists.values() for tag in tags)
+    index = {"categories": list(CATEGORY_KEYWORDS), "tags": tag_lists}
+    return index, normalize(np.stack(rows))
+
+
+def _save_artifact(key: str, index: dict, matrix: np.ndarray) -> None:
+    """아티팩트 저장 (임시 파일 후 교체) — 이전 버전 키의 파일은 삭제"""
+    directory = _get_artifact_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"tier2-{key}")
+        with open(base + ".npy.tmp", "wb") as f:
+            np.save(f, np.ascontiguousarray(matrix, dtype="<f4"))
+        with open(base + ".json.tmp", "w", encoding="utf-8") as f:
+            json.dump({"key": key, "model": model_id(), **index}, f, ensure_ascii=False)
+        os.replace(base + ".npy.tmp", base + ".npy")
+        os.replace(base + ".json.tmp", base + ".json")
+        for name in os.listdir(directory):
+            if name.startswith("tier2-") and not name.startswith(f"tier2-{key}."):
+                os.remove(os.path.join(directory, name))
+        logger.info("카테고리·태그 임베딩 아티팩트 저장: %s", base + ".npy")
+    except Exception as e:
+        logger.warning("임베딩 아티팩트 저장 실패 (다음 실행 시 다시 인코딩): %s", e)
+
+
+def _load_artifact(key: str) -> Optional[tuple[dict, np.ndarray]]:
+    """저장된 아티팩트를 mmap(copy-on-write)으로 읽음 — 없거나 버전 키·행 수가 맞지 않으면 None"""
+    base = os.path.join(_get_artifact_dir(), f"tier2-{key}")
+    if not os.path.exists(base + ".npy") or not os.path.exists(base + ".json"):
+        return None
+    try:
+        with open(base + ".json", "r", encoding="utf-8") as f:
+            index = json.load(f)
+        matrix = np.load(base + ".npy", mmap_mode="c")
+        rows = len(index["categories"]) + sum(len(tags) for tags in index["tags"].values())
+        if index.get("key") != key or matrix.ndim != 2 or matrix.shape[0] != rows:
+            return None
+        return index, matrix
+    except Exception as e:
+        logger.warning("임베딩 아티팩트 로드 실패 (다시 인코딩): %s", e)
+        return None
+
+
+def _init_embeddings() -> None:
+    """
+    카테고리 중심 행렬과 내장 태그 행렬 준비 — 아티팩트가 있으면 mmap으로 읽고, 없으면 배치 인코딩 후 저장.
+    태그 행렬은 아티팩트의 행 구간을 그대로 참조하고, 수정될 때만 메모리로 복사됨
+    """
+    global _category_embeddings
+    key = _artifact_key()
+    loaded = _load_artifact(key)
+    if loaded is None:
+        loaded = _build_artifact()
+        _save_artifact(key, *loaded)
+    else:
+        logger.info("카테고리·태그 임베딩 아티팩트 로드: tier2-%s", key)
+    index, matrix = loaded
+
+    categories = index["categories"]
+    # 카테고리 행은 피드백으로 자주 갱신되므로 메모리로 복사 (5행)
+    cat_embeddings = EmbeddingMatrix.from_normalized(categories, np.array(matrix[:len(categories)]))
+    offset = len(categories)
+    for category, tags in index["tags"].items():
+        _tag_embeddings[category] = EmbeddingMatrix.from_normalized(tags, matrix[offset:offset + len(tags)])
+        offset += len(tags)
+    for category in _custom_tag_candidates:
+        _sync_tag_embeddings(category)
+    # 이전 세션에서 저장된 피드백 적용 (없으면 무시)
+    _load_feedback_to_embeddings(cat_embeddings)
+    _category_embeddings = cat_embeddings
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 
 
 def _get_model():
-    global _model
+    """
+    임베딩 인코더 — CLASP_EMBEDDING_BACKEND에 따라 ONNX Runtime(int8 양자화 포함) 또는 PyTorch.
+    ONNX를 쓸 수 없으면 PyTorch로 대체. 어느 쪽이든 encode 호출 방식은 같음
+    """
+    global _model, _backend
     if _model is None:
-        from sentence_transformers import SentenceTransformer
-        _model = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
+        _model, _backend = _model_loader(MODEL_NAME)
+        logger.info("임베딩 백엔드: %s", _backend)
     return _model
 
 
-def _get_category_embeddings():
-    global _category_embeddings
+def set_model_loader(loader: Callable[[str], tuple[object, str]]) -> None:
+    """인코더 로더 교체 (앱 시작 시 임베딩 서비스 프로세스로) — 다음 인코딩부터 새 로더의 인코더 사용"""
+    global _model_loader, _model, _backend
+    _model_loader = loader
+    _model = None
+    _backend = None
+
+
+def model_id() -> str:
+    """
+    임베딩 저장소 키에 쓰는 모델 ID — 모델이 바뀌면 이전 벡터를 재사용하지 않음.
+    ONNX fp32는 PyTorch와 같은 벡터이므로 같은 ID, int8 양자화 벡터는 별도 ID
+    """
+    _get_model()
+    return f"{MODEL_NAME}:int8" if _backend == "onnx-int8" else MODEL_NAME
+
+
+def _get_category_embeddings() -> EmbeddingMatrix:
+    """카테고리 중심 임베딩 행렬 (정규화된 float32, 카테고리당 한 행)"""
     if _category_embeddings is None:
-        model = _get_model()
-        _category_embeddings = {}
-        for category, keywords in CATEGORY_KEYWORDS.items():
-            # 키워드별 개별 임베딩 후 평균 — 단순 문자열 결합보다 각 키워드 의미가 고르게 반영됨
-            keyword_embs = model.encode(keywords)
-            _category_embeddings[category] = keyword_embs.mean(axis=0)
-        # 이전 세션에서 저장된 피드백 적용 (없으면 무시)
-        _load_feedback_to_embeddings(_category_embeddings)
+        _init_embeddings()
     return _category_embeddings
 
 
-def _get_tag_embeddings(category: str) -> dict[str, np.ndarray]:
-    """카테고리별 태그 후보 임베딩 캐시 반환 (내장 + 커스텀 태그 후보 통합)"""
-    global _tag_embeddings
+def _tag_candidates(category: str) -> list[str]:
+    """카테고리의 태그 후보 (내장 + 커스텀, 순서 유지·중복 제거)"""
+    candidates = [*TAG_CANDIDATES.get(category, []), *_custom_tag_candidates.get(category, [])]
+    return list(dict.fromkeys(candidates))
+
+
+def _get_tag_embeddings(category: str) -> EmbeddingMatrix:
+    """카테고리별 태그 후보 임베딩 행렬 캐시 반환 (후보가 없으면 빈 행렬)"""
+    if _category_embeddings is None:
+        _init_embeddings()
     if category not in _tag_embeddings:
-        candidates = list(TAG_CANDIDATES.get(category, []))
-        candidates.extend(_custom_tag_candidates.get(category, []))
-        seen = set()
-        unique = [c for c in candidates if not (c in seen or seen.add(c))]
-        if not unique:
-            return {}
-        model = _get_model()
-        _tag_embeddings[category] = {
-            tag: model.encode(tag)
-            for tag in unique
-        }
+        candidates = _tag_candidates(category)
+        if not candidates:
+            return EmbeddingMatrix()
+        _tag_embeddings[category] = EmbeddingMatrix(candidates, encode_texts(candidates))
     return _tag_embeddings[category]
 
 
-def infer_tag(text: str, category: str, threshold: float = 0.35) -> Optional[str]:
+def _sync_tag_embeddings(category: str) -> None:
+    """태그 후보가 바뀐 카테고리의 캐시된 행렬을 제자리에서 갱신 — 빠진 후보는 삭제, 새 후보만 인코딩"""
+    tag_embs = _tag_embeddings.get(category)
+    if tag_embs is None:
+        return
+    candidates = _tag_candidates(category)
+    if not candidates:
+        del _tag_embeddings[category]
+        return
+    wanted = set(candidates)
+    for tag in tag_embs:
+        if tag not in wanted:
+            del tag_embs[tag]
+    missing = [tag for tag in candidates if tag not in tag_embs]
+    if missing:
+        for tag, emb in zip(missing, encode_texts(missing)):
+            tag_embs[tag] = emb
+
+
+def encode_texts(texts: list[str], batch_size: int = TIER2_BATCH_SIZE) -> np.ndarray:
+    """
+    여러 텍스트를 배치 단위로 인코딩해 입력 순서대로 (len(texts), dim) 배열 반환.
+    길이순으로 정렬해 배치를 만들어 같은 배치 안의 패딩을 줄임
+    """
+    model = _get_model()
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    embeddings: list[Optional[np.ndarray]] = [None] * len(texts)
+    for start in range(0, len(order), batch_size):
+        chunk = order[start:start + batch_size]
+        encoded = model.encode([texts[i] for i in chunk], batch_size=batch_size)
+        for i, emb in zip(chunk, encoded):
+            embeddings[i] = emb
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def top_tags(embedding: np.ndarray, category: str, k: int = TOP_K) -> list[tuple[str, float]]:
+    """텍스트 임베딩과 가장 유사한 태그 후보 상위 k개 [(태그, 점수), ...]"""
+    return _get_tag_embeddings(category).top_k(embedding, k)[0]
+
+
+def _best_tag(text_emb: np.ndarray, category: str, threshold: float) -> Optional[str]:
+    ranked = top_tags(text_emb, category, 1)
+    return ranked[0][0] if ranked and ranked[0][1] >= threshold else None
+
+
+def infer_tag(
+    text: str,
+    category: str,
+    threshold: float = 0.35,
+    embedding: Optional[np.ndarray] = None,
+) -> Optional[str]:
     """
     텍스트 임베딩과 태그 후보 임베딩 간 코사인 유사도로 세부 태그 추론.
     threshold 이상인 후보 중 가장 유사한 태그 반환, 없으면 None.
     태그 추론은 문서 도입부(제목·첫 문단)가 정보 밀도가 높으므로 앞 300자만 사용.
+    embedding: run_batch가 미리 계산한 tag_embedding — 주어지면 다시 인코딩하지 않음
     """
     if not text or not category:
         return None
-    candidates = _get_tag_embeddings(category)
-    if not candidates:
+    if not _get_tag_embeddings(category):
         return None
 
     try:
-        model = _get_model()
-        # 앞 300자: 제목·헤더 영역이 태그 정보가 가장 집중되어 있음
-        text_emb = model.encode(text.strip()[:300])
-
-        best_tag = None
-        best_score = 0.0
-        for tag, tag_emb in candidates.items():
-            score = float(
-                cosine_similarity(
-                    text_emb.reshape(1, -1),
-                    tag_emb.reshape(1, -1),
-                )[0][0]
-            )
-            if score > best_score:
-                best_score = score
-                best_tag = tag
-
-        return best_tag if best_score >= threshold else None
+        if embedding is None:
+            # 앞 300자: 제목·헤더 영역이 태그 정보가 가장 집중되어 있음
+            embedding = _get_model().encode(text.strip()[:_TAG_CHARS])
+        return _best_tag(embedding, category, threshold)
     except Exception as e:
         logger.warning("태그 추론 실패: %s", e)
         return None
 
 
-def run(text: str) -> dict:
+def bundle_texts(text: Optional[str], tag_source: Optional[str] = None) -> tuple[str, str]:
+    """번들을 만드는 (본문 앞 2000자, 도입부 앞 300자) — 도입부는 tag_source(표지)가 있으면 그 텍스트"""
+    return (text or "").strip()[:_BODY_CHARS], (tag_source or text or "").strip()[:_TAG_CHARS]
+
+
+def cover_window(cover_text: Optional[str]) -> str:
     """
-    텍스트 임베딩 후 카테고리별 코사인 유사도 계산
-    반환: { category, tag, confidence_score, embedding }
+    표지 유사도 임베딩에 쓰는 표지 앞 500자.
+    표지는 COVER_TEXT_MAX_LEN(300자) 미만만 저장되므로 번들 head와 같은 텍스트 — Stage 5 벡터를 그대로 재사용
     """
-    if not text or not text.strip():
-        return {"category": None, "tag": None, "confidence_score": 0.0, "embedding": None}
+    return (cover_text or "").strip()[:_COVER_CHARS]
+
+
+def encode_bundles(
+    texts: list[Optional[str]],
+    tag_sources: Optional[list[Optional[str]]] = None,
+    batch_size: int = TIER2_BATCH_SIZE,
+) -> list[Optional[dict]]:
+    """
+    파일 임베딩 번들 {body, head}을 배치로 계산 (텍스트가 없으면 None).
+    - body: 본문 앞 2000자 — 카테고리 분류·피드백 보정
+    - head: 도입부 앞 300자 (표지가 있으면 표지) — 태그 추론, 표지 유사도 그룹화 (cover_window와 같은 텍스트)
+    파일 하나당 번들을 한 번만 만들어 저장해 두고 모든 단계가 재사용.
+    본문이 짧아 두 텍스트가 같거나 여러 파일의 텍스트가 같으면 한 번만 인코딩
+    """
+    if tag_sources is None:
+        tag_sources = texts
+    pairs = [bundle_texts(text, source) for text, source in zip(texts, tag_sources)]
+    unique = list(dict.fromkeys(text for pair in pairs for text in pair if text))
+    if not unique:
+        return [None] * len(texts)
+    encoded = dict(zip(unique, encode_texts(unique, batch_size)))
+    return [
+        {"body": encoded[body], "head": encoded.get(head)} if body else None
+        for body, head in pairs
+    ]
+
+
+def _empty_result() -> dict:
+    return {"category": None, "tag": None, "confidence_score": 0.0, "embedding": None}
+
+
+def run_batch(
+    texts: list[Optional[str]],
+    tag_sources: Optional[list[Optional[str]]] = None,
+    batch_size: int = TIER2_BATCH_SIZE,
+    top_k: int = TOP_K,
+    bundles: Optional[list[Optional[dict]]] = None,
+) -> list[dict]:
+    """
+    여러 텍스트의 Tier 2 분류를 배치로 한 번에 계산.
+    bundles: 저장된 파일 임베딩 번들 (encode_bundles 결과) — None인 항목만 길이순 배치로 인코딩.
+    카테고리 점수는 정규화된 중심 행렬과의 행렬 곱 한 번으로 배치 전체를 계산.
+    반환 (입력 순서): { category, tag, confidence_score, scores(카테고리별 점수),
+                      top_categories, top_tags(상위 top_k개 [(이름, 점수)]), embedding, tag_embedding, bundle }
+    - tag: Tier 2 카테고리 기준 태그, tag_embedding: 다른 카테고리로 태그를 추론할 때 infer_tag(embedding=)에 전달
+    - embedding/tag_embedding은 번들의 body/head (텍스트가 없으면 None)
+    """
+    if tag_sources is None:
+        tag_sources = texts
+    bundles = list(bundles) if bundles is not None else [None] * len(texts)
+    results = [_empty_result() for _ in texts]
 
     try:
-        model = _get_model()
-        cat_embeddings = _get_category_embeddings()
+        missing = [i for i, bundle in enumerate(bundles) if bundle is None and bundle_texts(texts[i])[0]]
+        if missing:
+            encoded = encode_bundles([texts[i] for i in missing], [tag_sources[i] for i in missing], batch_size)
+            for i, bundle in zip(missing, encoded):
+                bundles[i] = bundle
+        indices = [i for i, bundle in enumerate(bundles) if bundle is not None]
+        if not indices:
+            return results
 
-        text_embedding = model.encode(text.strip()[:2000])
-
-        best_category = None
-        best_score = 0.0
-
-        for category, cat_emb in cat_embeddings.items():
-            score = float(
-                cosine_similarity(
-                    text_embedding.reshape(1, -1),
-                    cat_emb.reshape(1, -1)
-                )[0][0]
-            )
-            if score > best_score:
-                best_score = score
-                best_category = category
-
-        embedding_json = json.dumps(text_embedding.tolist())
-
-        return {
-            "category": best_category if best_score > 0.3 else None,
-            "tag": None,
-            "confidence_score": best_score,
-            "embedding": embedding_json,
-        }
+        cat_embeddings = _get_category_embeddings()
+        body_embs = np.stack([bundles[i]["body"] for i in indices])
+        ranked_rows = cat_embeddings.top_k(body_embs, len(cat_embeddings))
+
+        for i, ranked in zip(indices, ranked_rows):
+            best_category, best_score = ranked[0] if ranked else (None, 0.0)
+            category = best_category if best_score > 0.3 else None
+            tag_embedding = bundles[i]["head"]
+            ranked_tags = top_tags(tag_embedding, category, top_k) if category and tag_embedding is not None else []
+            results[i] = {
+                "category": category,
+                "tag": ranked_tags[0][0] if ranked_tags and ranked_tags[0][1] >= 0.35 else None,
+                "confidence_score": best_score,
+                "scores": dict(ranked),
+                "top_categories": ranked[:top_k],
+                "top_tags": ranked_tags,
+                "embedding": bundles[i]["body"],
+                "tag_embedding": tag_embedding,
+                "bundle": bundles[i],
+            }
     except Exception as e:
-        logger.warning("Tier 2 임베딩 분류 실패: %s", e)
-        return {"category": None, "tag": None, "confidence_score": 0.0, "embedding": None}
+        logger.warning("Tier 2 배치 임베딩 분류 실패 (%d개): %s", len(texts), e)
+        return [_empty_result() for _ in texts]
+    return results
+
+
+def run(text: str) -> dict:
+    """
+    텍스트 임베딩 후 카테고리별 코사인 유사도 계산
+    반환: { category, tag, confidence_score } — 임베딩이 필요하면 run_batch의 bundle 사용
+    """
+    result = run_batch([text])[0]
+    return {
+        "category": result["category"],
+        "tag": None,
+        "confidence_score": result["confidence_score"],
+    }
 
 
 def load_custom_categories(custom_categories: list[dict]) -> None:
     """
-    사용자 정의 카테고리를 임베딩 캐시에 추가.
-    내장 카테고리는 유지하고 커스텀 카테고리만 갱신(이전 커스텀 제거 후 재추가).
+    사용자 정의 카테고리를 임베딩 행렬에 반영.
+    내장 카테고리는 유지하고, 없어진 커스텀 카테고리 행은 삭제, 새로 추가되거나 키워드가 바뀐 카테고리만 인코딩해 제자리 갱신.
     키워드가 있으면 태그 후보로도 등록하여 infer_tag에서 사용 가능.
     custom_categories: [{"name": "...", "keywords": ["...", ...]}, ...]
     """
-    global _custom_tag_candidates, _tag_embeddings
-
-    # 내장 태그 후보 캐시도 초기화 — TAG_CANDIDATES 변경 시 재계산 보장
-    _tag_embeddings.clear()
-
-    # 이전 커스텀 태그 캐시 정리
-    _custom_tag_candidates.clear()
-
     cat_embeddings = _get_category_embeddings()
     builtin = set(CATEGORY_KEYWORDS.keys())
 
-    # 이전 커스텀 카테고리 제거 (내장 카테고리는 유지)
-    for key in list(cat_embeddings.keys()):
-        if key not in builtin:
-            _tag_embeddings.pop(key, None)
-            del cat_embeddings[key]
-
-    if not custom_categories:
-        return
-
-    model = _get_model()
-
-    for entry in custom_categories:
+    wanted: dict[str, list[str]] = {}
+    for entry in custom_categories or []:
         name = entry.get("name", "").strip()
-        keywords = [kw for kw in entry.get("keywords", []) if kw.strip()]
-        if not name:
-            continue
-        if keywords:
-            kw_embs = model.encode(keywords)
-            cat_embeddings[name] = kw_embs.mean(axis=0)
-            _custom_tag_candidates[name] = keywords
-        else:
-            cat_embeddings[name] = model.encode(name)
+        if name:
+            wanted[name] = [kw for kw in entry.get("keywords", []) if kw.strip()]
 
-    _load_feedback_to_embeddings(cat_embeddings)
-    logger.info("커스텀 카테고리 %d개 임베딩 완료", len(custom_categories))
+    # 이전 커스텀 카테고리 중 없어진 것만 제거 (내장 카테고리는 유지)
+    for key in cat_embeddings.keys():
+        if key not in builtin and key not in wanted:
+            del cat_embeddings[key]
+    for name in list(_custom_category_keywords):
+        if name not in wanted:
+            del _custom_category_keywords[name]
+
+    changed = [
+        name for name, keywords in wanted.items()
+        if name not in cat_embeddings or _custom_category_keywords.get(name) != keywords
+    ]
+    for name in changed:
+        keywords = wanted[name]
+        cat_embeddings[name] = encode_texts(keywords).mean(axis=0) if keywords else encode_texts([name])[0]
+        _custom_category_keywords[name] = keywords
+
+    # 태그 후보가 바뀐 카테고리의 태그 행렬만 갱신
+    previous_tags = dict(_custom_tag_candidates)
+    _custom_tag_candidates.clear()
+    _custom_tag_candidates.update({name: keywords for name, keywords in wanted.items() if keywords})
+    for category in set(previous_tags) | set(_custom_tag_candidates):
+        if previous_tags.get(category) != _custom_tag_candidates.get(category):
+            _sync_tag_embeddings(category)
+
+    if changed:
+        _load_feedback_to_embeddings(cat_embeddings)
+        logger.info("커스텀 카테고리 %d개 임베딩 완료", len(changed))
 
 
-def apply_feedback(text: str, correct_category: str) -> None:
+def apply_feedback(text: str, correct_category: str, embedding: Optional[np.ndarray] = None) -> None:
     """
     수동 분류 피드백 반영 — 해당 카테고리 임베딩을 파일 텍스트 방향으로 점진적 보정.
-    learning_rate=0.05: 기존 임베딩 95% + 새 텍스트 임베딩 5% 가중 이동 평균.
-    카테고리 임베딩 캐시와 feedback_embeddings.json 파일을 모두 갱신하므로 재시작 후에도 유지됨.
+    learning_rate=0.15: 기존 임베딩 85% + 새 텍스트 임베딩 15% 가중 이동 평균 (둘 다 정규화된 방향 기준).
+    카테고리 행렬의 해당 행만 제자리에서 갱신하고 feedback_embeddings.json 파일도 갱신하므로 재시작 후에도 유지됨.
     내장 카테고리와 커스텀 카테고리 모두 지원.
+    embedding: 파일 임베딩 번들의 body — 주어지면 텍스트를 다시 인코딩하지 않음
     """
     if not text or not text.strip():
         return
@@ -334,21 +582,15 @@ def apply_feedback(text: str, correct_category: str) -> None:
         return
 
     try:
-        model = _get_model()
-
-        text_emb = model.encode(text.strip()[:2000])
+        if embedding is None:
+            embedding = _get_model().encode(text.strip()[:_BODY_CHARS])
+        text_emb = normalize(embedding)
         current_emb = cat_embeddings[correct_category]
 
         # 사용자가 명시적으로 수정한 피드백이므로 0.15로 더 빠르게 반영
         learning_rate = 0.15
-        updated_emb = (1 - learning_rate) * current_emb + learning_rate * text_emb
-
-        # L2 정규화로 코사인 유사도 계산 안정성 유지
-        norm = float(np.linalg.norm(updated_emb))
-        if norm > 0:
-            updated_emb = updated_emb / norm
-
-        cat_embeddings[correct_category] = updated_emb
+        # 행렬에 저장할 때 L2 정규화되어 코사인 유사도 계산 안정성 유지
+        cat_embeddings[correct_category] = (1 - learning_rate) * current_emb + learning_rate * text_emb
         logger.info("피드백 반영: 카테고리='%s' 임베딩 보정 완료", correct_category)
         # 보정 결과를 파일로 저장 — 재시작 후에도 유지됨
         _save_feedback_embeddings(cat_embeddings)
@@ -356,23 +598,9 @@ def apply_feedback(text: str, correct_category: str) -> None:
         logger.warning("피드백 임베딩 보정 실패: %s", e)
 
 
-def compute_embedding(text: str) -> Optional[str]:
-    """표지 텍스트 임베딩 계산 후 JSON 직렬화"""
-    if not text:
-        return None
-    try:
-        model = _get_model()
-        emb = model.encode(text.strip()[:500])
-        return json.dumps(emb.tolist())
-    except Exception:
-        return None
-
-
-def compute_similarity(embedding_json_a: str, embedding_json_b: str) -> float:
-    """두 임베딩 JSON 간 코사인 유사도 계산"""
+def compute_similarity(embedding_a: np.ndarray, embedding_b: np.ndarray) -> float:
+    """두 임베딩 벡터 간 코사인 유사도 계산"""
     try:
-        a = np.array(json.loads(embedding_json_a))
-        b = np.array(json.loads(embedding_json_b))
-        return float(cosine_similarity(a.reshape(1, -1), b.reshape(1, -1))[0][0])
+        return float(normalize(embedding_a) @ normalize(embedding_b))
     except Exception:
         return 0.0
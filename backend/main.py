@@ -3,13 +3,32 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from database import init_db
+from engines import tier2_embedding
 from routers import scan, files, rules, apply, settings
+from services.embedding_service import (
+    EMBEDDING_SERVICE_ENABLED, get_embedding_service, shutdown_embedding_service,
+)
+from services.embedding_store import migrate_json_embeddings
+from services.extraction_service import shutdown_extraction_pool
+from services.reclassify_service import stop_reclassifier
+from services.scan_jobs import get_scan_runner, shutdown_scan_runner
+from services.watch_service import stop_all_watches
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    migrate_json_embeddings()
+    if EMBEDDING_SERVICE_ENABLED:
+        # 모든 임베딩 요청을 전용 워커 프로세스 하나로 모아 마이크로 배치로 처리 (워커는 첫 요청 시 시작)
+        tier2_embedding.set_model_loader(get_embedding_service().connect)
+    get_scan_runner().start()
     yield
+    await stop_all_watches()
+    await stop_reclassifier()
+    await shutdown_scan_runner()
+    shutdown_extraction_pool()
+    shutdown_embedding_service()
 
 
 app = FastAPI(
@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey
+    Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Index, LargeBinary
 )
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
@@ -13,16 +13,28 @@ class File(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     path = Column(String, nullable=False, unique=True)
     filename = Column(String, nullable=False)
-    extension = Column(String, nullable=True)
+    extension = Column(String, nullable=True, index=True)
     created_at = Column(DateTime, nullable=True)
     modified_at = Column(DateTime, nullable=True)
     size = Column(Integer, nullable=True)
     extracted_text_summary = Column(Text, nullable=True)
+    # 신규·변경으로 갱신됐지만 아직 분류되지 않은 파일 — 스캔이 중단돼도 다음 스캔에서 반드시 재분류
+    needs_classification = Column(Boolean, nullable=True)
+    # 내용 지문 — 크기 + 앞·뒤 블록 해시, 같은 지문끼리 충돌할 때만 전체 해시를 계산
+    # 경로가 바뀐(이동·이름 변경) 파일을 이전 레코드에 다시 연결해 분류·표지·수동 수정 내역을 유지
+    quick_hash = Column(String, nullable=True)
+    full_hash = Column(String, nullable=True, index=True)
+    # 파일명에서 추출한 연도 (없으면 빈 문자열, NULL은 아직 계산 전) — date 규칙 변경 시 영향 파일 조회용
+    filename_year = Column(String, nullable=True, index=True)
 
     classifications = relationship("Classification", back_populates="file", cascade="all, delete-orphan")
     cover_page = relationship("CoverPage", back_populates="file", uselist=False, cascade="all, delete-orphan")
     similarity_groups = relationship("CoverSimilarityGroup", back_populates="file", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_files_size_quick_hash", "size", "quick_hash"),
+    )
+
 
 class Classification(Base):
     __tablename__ = "classifications"
@@ -46,8 +58,8 @@ class CoverPage(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     file_id = Column(Integer, ForeignKey("files.id"), nullable=False, unique=True)
     cover_text = Column(Text, nullable=True)
-    # JSON 직렬화된 임베딩 벡터
-    embedding = Column(Text, nullable=True)
+    # 표지 텍스트 해시 — TextEmbedding.text_hash로 임베딩 조회
+    text_hash = Column(String, nullable=True, index=True)
     detected_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     file = relationship("File", back_populates="cover_page")
@@ -65,6 +77,65 @@ class CoverSimilarityGroup(Base):
     file = relationship("File", back_populates="similarity_groups")
 
 
+class ExtractionCache(Base):
+    """
+    문서 추출 결과 캐시 — (path, size, modified_at)이 그대로면 재스캔 시 문서를 다시 열지 않음
+    본문/표지 텍스트를 보관해 추출을 건너뜀 (임베딩은 텍스트 해시로 TextEmbedding에서 조회)
+    """
+    __tablename__ = "extraction_cache"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    path = Column(String, nullable=False, unique=True)
+    size = Column(Integer, nullable=True)
+    modified_at = Column(DateTime, nullable=True)
+    body_text = Column(Text, nullable=True)
+    cover_text = Column(Text, nullable=True)
+    # 추출 예산 초과 사유 (timeout / memory / crashed) — 값이 있으면 파일이 바뀌기 전까지 재시도하지 않음
+    error = Column(String, nullable=True)
+    extracted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class TextEmbedding(Base):
+    """
+    텍스트 임베딩 저장소 — (모델 ID, 정규화한 텍스트 해시)당 한 벡터.
+    파일·재스캔 간에 같은 텍스트는 다시 인코딩하지 않음. vector는 little-endian float32 원시 바이트
+    """
+    __tablename__ = "text_embeddings"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    model_id = Column(String, nullable=False)
+    text_hash = Column(String, nullable=False)
+    vector = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_text_embeddings_model_hash", "model_id", "text_hash", unique=True),
+    )
+
+
+class ScanCheckpoint(Base):
+    """
+    스캔 진행 체크포인트 — 분류 배치 commit과 같은 트랜잭션으로 갱신되어
+    백엔드가 종료되거나 취소된 스캔을 같은 scan_id로 이어서 실행할 수 있게 함
+    """
+    __tablename__ = "scan_checkpoints"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    scan_id = Column(String, nullable=False, unique=True)
+    folder_path = Column(String, nullable=False, index=True)
+    # queued / running / cancelled / interrupted / completed / failed
+    status = Column(String, nullable=False)
+    # 마지막으로 commit된 진행 단계 (1~7)
+    stage = Column(Integer, default=1, nullable=False)
+    total = Column(Integer, default=0, nullable=False)
+    # 분류까지 commit된 파일 수와 그 마지막 파일 경로
+    files_done = Column(Integer, default=0, nullable=False)
+    last_file = Column(String, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 class ActionBatch(Base):
     """폴더별 정리 적용 배치 — 이력 조회 및 선택적 Undo의 단위"""
     __tablename__ = "action_batches"
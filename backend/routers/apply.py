@@ -1,9 +1,11 @@
+import asyncio
+
 from fastapi import APIRouter, Depends, Query
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import get_db, run_in_session
 from utils.response import ok
 from utils.errors import ErrorCode, raise_error
 from services.action_service import (
@@ -22,6 +24,8 @@ class ApplyRequest(BaseModel):
     scan_id: str
     conflict_resolution: str
     folder_path: str
+    # 내용이 같은 파일은 대표 하나만 이동
+    skip_duplicates: bool = False
 
 
 class UndoRequest(BaseModel):
@@ -29,25 +33,32 @@ class UndoRequest(BaseModel):
 
 
 @router.get("/apply/preview")
-async def preview(scan_id: str = Query(...), db: Session = Depends(get_db)):
+async def preview(
+    scan_id: str = Query(...),
+    skip_duplicates: bool = Query(False),
+):
     """UC-06: 정리 적용 미리보기"""
-    result = build_preview(db, scan_id)
+    # 중복 확인의 지문 계산이 이벤트 루프를 막지 않도록 스레드에서 전용 세션으로 실행
+    result = await asyncio.to_thread(run_in_session, build_preview, scan_id, skip_duplicates)
     return JSONResponse(content=ok(result))
 
 
 @router.post("/apply")
-async def apply(body: ApplyRequest, db: Session = Depends(get_db)):
+async def apply(body: ApplyRequest):
     """UC-06: 정리 적용 실행"""
     if body.conflict_resolution not in VALID_RESOLUTIONS:
         raise_error(
             ErrorCode.INVALID_TYPE,
             f"conflict_resolution은 overwrite/rename/skip 중 하나여야 합니다",
         )
-    result = apply_organize(
-        db,
+    # 파일 이동과 중복 확인의 지문 계산이 이벤트 루프를 막지 않도록 스레드에서 전용 세션으로 실행
+    result = await asyncio.to_thread(
+        run_in_session,
+        apply_organize,
         body.scan_id,
         body.conflict_resolution,
         body.folder_path,
+        body.skip_duplicates,
     )
     return JSONResponse(content=ok(result))
 
@@ -1,14 +1,17 @@
+import asyncio
+
 from fastapi import APIRouter, Depends, Query
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Optional
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import get_db, run_in_session
 from models.schema import File, Classification, CoverSimilarityGroup
 from utils.response import ok, fail
 from utils.errors import ErrorCode, raise_error
 from services.classify_service import update_manual_classification
+from services.duplicate_service import find_duplicate_groups
 
 router = APIRouter(prefix="/files", tags=["files"])
 
@@ -128,6 +131,57 @@ async def list_files(
     }))
 
 
+@router.get("/duplicates")
+async def list_duplicates(
+    scan_id: str = Query(...),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    """스캔 내 내용이 완전히 같은 파일 묶음 조회 (크기 → 빠른 지문 → 전체 해시 순으로 확인)"""
+    # 지문 계산이 이벤트 루프를 막지 않도록 스레드에서 전용 세션으로 실행
+    groups = await asyncio.to_thread(run_in_session, find_duplicate_groups, scan_id)
+
+    page_groups = groups[(page - 1) * page_size:page * page_size]
+    file_ids = [file_id for group in page_groups for file_id in group["file_ids"]]
+    files_map = {f.id: f for f in db.query(File).filter(File.id.in_(file_ids)).all()}
+
+    # 파일별 최우선 분류 (수동 > 최신 자동)
+    best_cls: dict[int, Classification] = {}
+    classifications = (
+        db.query(Classification)
+        .filter(
+            Classification.file_id.in_(file_ids),
+            (Classification.scan_id == scan_id) | (Classification.is_manual == True),
+        )
+        .order_by(Classification.is_manual.desc(), Classification.classified_at.desc())
+    )
+    for cls in classifications:
+        best_cls.setdefault(cls.file_id, cls)
+
+    items = [
+        {
+            "size": group["size"],
+            "full_hash": group["full_hash"],
+            "files": [
+                _build_file_item(files_map[file_id], best_cls.get(file_id))
+                for file_id in group["file_ids"]
+                if file_id in files_map
+            ],
+        }
+        for group in page_groups
+    ]
+
+    return JSONResponse(content=ok({
+        "total": len(groups),
+        "page": page,
+        "page_size": page_size,
+        "duplicate_files": sum(len(group["file_ids"]) - 1 for group in groups),
+        "wasted_bytes": sum(group["size"] * (len(group["file_ids"]) - 1) for group in groups),
+        "items": items,
+    }))
+
+
 @router.patch("/{file_id}")
 async def patch_file(
     file_id: int,
@@ -135,11 +189,9 @@ async def patch_file(
     db: Session = Depends(get_db),
 ):
     """UC-04: 수동 분류 수정"""
-    result = update_manual_classification(
-        db=db,
-        file_id=file_id,
-        category=body.category,
-        tag=body.tag,
+    # 피드백 임베딩 인코딩이 임베딩 서비스 응답을 기다리는 동안 이벤트 루프를 막지 않도록 스레드에서 실행
+    result = await asyncio.to_thread(
+        update_manual_classification, db, file_id, body.category, body.tag,
     )
     return JSONResponse(content=ok(result))
 
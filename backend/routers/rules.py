@@ -6,6 +6,8 @@ from sqlalchemy.orm import Session
 
 from database import get_db
 from models.schema import Rule
+from engines import tier1_rule
+from services.reclassify_service import affected_by_rule, find_affected, get_reclassifier
 from utils.response import ok, fail
 from utils.errors import ErrorCode, raise_error
 
@@ -95,6 +97,8 @@ async def create_rule(body: CreateRuleRequest, db: Session = Depends(get_db)):
     )
     db.add(rule)
     db.commit()
+    tier1_rule.invalidate_matcher()
+    get_reclassifier().submit(await find_affected(affected_by_rule, rule.type, rule.value))
     db.refresh(rule)
     return JSONResponse(content=ok(_rule_to_dict(rule)))
 
@@ -133,6 +137,8 @@ async def update_rule(
         rule.parent_id = body.parent_id
 
     db.commit()
+    tier1_rule.invalidate_matcher()
+    get_reclassifier().submit(await find_affected(affected_by_rule, rule.type, rule.value))
     db.refresh(rule)
     return JSONResponse(content=ok(_rule_to_dict(rule)))
 
@@ -149,6 +155,9 @@ async def delete_rule(rule_id: int, db: Session = Depends(get_db)):
     for child in children:
         child.parent_id = rule.parent_id
 
+    rule_type, value = rule.type, rule.value
     db.delete(rule)
     db.commit()
+    tier1_rule.invalidate_matcher()
+    get_reclassifier().submit(await find_affected(affected_by_rule, rule_type, value))
     return JSONResponse(content=ok({"deleted_id": rule_id}))
@@ -1,33 +1,20 @@
 import os
 import json
-import time
-import uuid
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Header
 from fastapi.responses import JSONResponse
 from sse_starlette.sse import EventSourceResponse
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
 
+from database import get_db
 from utils.response import ok, fail
-from utils.errors import ErrorCode
+from utils.errors import ErrorCode, raise_error
 from services import scan_service
+from services.scan_jobs import get_scan_runner
+from services import watch_service
 
 router = APIRouter(prefix="/scan", tags=["scan"])
 
-# 진행 중인 스캔 상태 저장 (메모리)
-_active_scans: dict[str, dict] = {}
-
-# TTL 기반 메모리 정리 (5분 초과 시 자동 제거)
-_SCAN_TTL_SECONDS = 300
-
-
-def _cleanup_stale_scans():
-    """TTL 초과 스캔 항목 정리"""
-    now = time.time()
-    stale = [sid for sid, info in _active_scans.items()
-             if now - info.get("created_at", 0) > _SCAN_TTL_SECONDS]
-    for sid in stale:
-        _active_scans.pop(sid, None)
-
 
 # Path Traversal 방지: 사용자 홈 디렉토리 하위만 허용
 _ALLOWED_ROOTS = [os.path.expanduser("~")]
@@ -72,50 +59,131 @@ async def start_scan(body: ScanStartRequest):
             content=fail(ErrorCode.PERMISSION_DENIED, "폴더 접근 권한 없음"),
         )
 
-    _cleanup_stale_scans()
-
-    # 동일 폴더에 대해 진행 중인 스캔이 있으면 해당 scan_id 반환 (중복 방지)
-    for sid, info in _active_scans.items():
-        if info["folder_path"] == folder_path and info["status"] == "started":
-            return JSONResponse(
-                content=ok({
-                    "scan_id": sid,
-                    "status": "already_running",
-                    "folder_path": folder_path,
-                })
-            )
-
-    scan_id = f"scan_{uuid.uuid4().hex[:12]}"
-    _active_scans[scan_id] = {
-        "folder_path": folder_path,
-        "status": "started",
-        "created_at": time.time(),
+    runner = get_scan_runner()
+
+    # 동일 폴더에 대해 대기 중이거나 진행 중인 스캔이 있으면 해당 scan_id 반환 (중복 방지)
+    job = runner.find_active(folder_path)
+    if job is not None:
+        return JSONResponse(
+            content=ok({
+                "scan_id": job.scan_id,
+                "status": "already_running",
+                "folder_path": folder_path,
+            })
+        )
+
+    # 같은 폴더의 최근 비정상 종료된 스캔이 있으면 같은 scan_id로 체크포인트부터 재개 (취소한 스캔은 새로 시작)
+    resumable_id = runner.find_resumable(folder_path)
+
+    # 스캔은 백그라운드 작업으로 실행 — SSE 연결이 끊겨도 계속 진행
+    job = runner.submit(folder_path, resumable_id)
+
+    return JSONResponse(
+        content=ok({
+            "scan_id": job.scan_id,
+            "status": "resumed" if resumable_id else "started",
+            "folder_path": folder_path,
+        })
+    )
+
+
+def _checkpoint_data(checkpoint) -> dict:
+    return {
+        "scan_id": checkpoint.scan_id,
+        "status": checkpoint.status,
+        "folder_path": checkpoint.folder_path,
+        "stage": checkpoint.stage,
+        "total": checkpoint.total,
+        "files_done": checkpoint.files_done,
+        "last_file": checkpoint.last_file,
     }
 
+
+@router.post("/{scan_id}/cancel")
+async def cancel_scan(scan_id: str, db: Session = Depends(get_db)):
+    """대기 중이거나 진행 중인 스캔 취소 — commit된 진행 상황은 남아 같은 scan_id로 재개 가능"""
+    if not await get_scan_runner().cancel(scan_id):
+        raise_error(ErrorCode.SCAN_NOT_FOUND, "진행 중인 해당 스캔 ID 없음")
+    db.expire_all()
+    return JSONResponse(content=ok(_checkpoint_data(scan_service.get_checkpoint(db, scan_id))))
+
+
+@router.post("/{scan_id}/resume")
+async def resume_scan(scan_id: str, db: Session = Depends(get_db)):
+    """취소되거나 비정상 종료된 스캔을 같은 scan_id로 체크포인트부터 재개"""
+    runner = get_scan_runner()
+    job = runner.get(scan_id)
+    if job is not None and job.active:
+        return JSONResponse(
+            content=ok({
+                "scan_id": scan_id,
+                "status": "already_running",
+                "folder_path": job.folder_path,
+            })
+        )
+
+    checkpoint = scan_service.get_checkpoint(db, scan_id)
+    if checkpoint is None or checkpoint.status not in scan_service.RESUMABLE_STATUSES:
+        raise_error(ErrorCode.SCAN_NOT_FOUND, "재개할 수 있는 해당 스캔 ID 없음")
+
+    runner.submit(checkpoint.folder_path, scan_id)
     return JSONResponse(
         content=ok({
             "scan_id": scan_id,
-            "status": "started",
-            "folder_path": folder_path,
+            "status": "resumed",
+            "folder_path": checkpoint.folder_path,
         })
     )
 
 
 @router.get("/progress")
-async def scan_progress(scan_id: str):
-    """UC-02: SSE 스캔 진행 상황 스트리밍"""
-    if scan_id not in _active_scans:
+async def scan_progress(scan_id: str, last_event_id: int = Header(0)):
+    """
+    UC-02: SSE 스캔 진행 상황 스트리밍
+    여러 클라이언트가 동시에 구독할 수 있으며, 재접속 시 Last-Event-ID 이후 이벤트부터 이어서 전송
+    """
+    job = get_scan_runner().get(scan_id)
+    if job is None:
         return JSONResponse(
             status_code=404,
             content=fail(ErrorCode.SCAN_NOT_FOUND, "해당 스캔 ID 없음"),
         )
 
-    folder_path = _active_scans[scan_id]["folder_path"]
-
     async def event_generator():
-        async for progress in scan_service.run_scan(scan_id, folder_path):
-            yield {"data": json.dumps(progress, ensure_ascii=False)}
-        # 스캔 완료 후 메모리에서 제거
-        _active_scans.pop(scan_id, None)
+        async for event_id, progress in job.subscribe(last_event_id):
+            yield {"id": str(event_id), "data": json.dumps(progress, ensure_ascii=False)}
 
     return EventSourceResponse(event_generator())
+
+
+@router.post("/{scan_id}/watch")
+async def start_watch(scan_id: str, db: Session = Depends(get_db)):
+    """
+    완료된 스캔의 폴더 실시간 감시 시작
+    새로 생기거나 바뀐 파일만 분류해 같은 scan_id 결과에 반영하고, 이동은 경로만 갱신
+    """
+    checkpoint = scan_service.get_checkpoint(db, scan_id)
+    if checkpoint is None or checkpoint.status != "completed":
+        raise_error(ErrorCode.SCAN_NOT_FOUND, "완료된 해당 스캔 ID 없음")
+    if not os.path.isdir(checkpoint.folder_path):
+        raise_error(ErrorCode.FOLDER_NOT_FOUND)
+
+    try:
+        watcher = await watch_service.start_watch(scan_id, checkpoint.folder_path)
+    except watch_service.WatchUnavailable:
+        raise_error(ErrorCode.WATCH_UNAVAILABLE)
+    return JSONResponse(content=ok(watcher.status()))
+
+
+@router.delete("/{scan_id}/watch")
+async def stop_watch(scan_id: str):
+    """폴더 실시간 감시 중지"""
+    if not await watch_service.stop_watch(scan_id):
+        raise_error(ErrorCode.SCAN_NOT_FOUND, "감시 중인 해당 스캔 ID 없음")
+    return JSONResponse(content=ok({"scan_id": scan_id, "watching": False}))
+
+
+@router.get("/watches")
+async def list_watches():
+    """감시 중인 폴더 목록과 처리 현황"""
+    return JSONResponse(content=ok([watcher.status() for watcher in watch_service.list_watchers()]))
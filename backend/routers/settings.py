@@ -9,7 +9,11 @@ from sqlalchemy.orm import Session
 from database import get_db
 from models.schema import CustomExtension, CustomCategory
 from engines.tier1_rule import _EXT_CATEGORY_MAP
-from engines import tier3_llm
+from engines import tier1_rule, tier2_embedding, tier3_llm
+from services import embedding_service
+from services.reclassify_service import (
+    affected_by_category, find_affected, find_affected_files, get_reclassifier,
+)
 from utils.response import ok
 from utils.errors import ErrorCode, raise_error
 
@@ -48,6 +52,17 @@ async def get_llm_status():
     }))
 
 
+@router.get("/embedding-status")
+async def get_embedding_status():
+    """임베딩 백엔드와 임베딩 서비스 큐 길이·배치 크기·지연 (서비스를 쓰지 않으면 service는 null)"""
+    service = embedding_service.get_embedding_service() if embedding_service.EMBEDDING_SERVICE_ENABLED else None
+    return JSONResponse(content=ok({
+        "model": tier2_embedding.MODEL_NAME,
+        "backend": tier2_embedding._backend,
+        "service": service.stats() if service else None,
+    }))
+
+
 @router.post("/api-key")
 async def set_api_key(body: ApiKeyRequest):
     """Electron 메인 프로세스에서 OpenAI API Key를 런타임에 설정"""
@@ -110,6 +125,8 @@ async def create_extension(body: CreateExtensionRequest, db: Session = Depends(g
     row = CustomExtension(extension=ext, category=cat)
     db.add(row)
     db.commit()
+    tier1_rule.invalidate_matcher()
+    get_reclassifier().submit(await find_affected(find_affected_files, extensions=[ext]))
     db.refresh(row)
 
     return JSONResponse(content=ok({
@@ -124,8 +141,11 @@ async def delete_extension(ext_id: int, db: Session = Depends(get_db)):
     if not row:
         raise_error(ErrorCode.EXTENSION_NOT_FOUND)
 
+    ext = row.extension
     db.delete(row)
     db.commit()
+    tier1_rule.invalidate_matcher()
+    get_reclassifier().submit(await find_affected(find_affected_files, extensions=[ext]))
     return JSONResponse(content=ok({"deleted_id": ext_id}))
 
 
@@ -170,6 +190,7 @@ async def create_category(body: CreateCategoryRequest, db: Session = Depends(get
     db.add(row)
     db.commit()
     db.refresh(row)
+    get_reclassifier().submit(await find_affected(affected_by_category, name, keywords))
 
     return JSONResponse(content=ok({
         "id": row.id,
@@ -186,6 +207,8 @@ async def delete_category(cat_id: int, db: Session = Depends(get_db)):
     if not row:
         raise_error(ErrorCode.CATEGORY_NOT_FOUND)
 
+    name, keywords = row.name, json.loads(row.keywords)
     db.delete(row)
     db.commit()
+    get_reclassifier().submit(await find_affected(affected_by_category, name, keywords))
     return JSONResponse(content=ok({"deleted_id": cat_id}))
@@ -2,9 +2,13 @@
 PyInstaller 번들 진입점
 uvicorn으로 FastAPI 앱 실행
 """
+import multiprocessing
+
 import uvicorn
 
 if __name__ == '__main__':
+    # PyInstaller 번들에서 추출 프로세스 풀(spawn) 워커가 앱을 다시 실행하지 않도록 처리
+    multiprocessing.freeze_support()
     uvicorn.run(
         'main:app',
         host='127.0.0.1',
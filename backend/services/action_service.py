@@ -6,6 +6,9 @@ import logging
 from sqlalchemy.orm import Session
 
 from models.schema import File, Classification, ActionLog, ActionBatch, Rule
+from engines import tier1_rule
+from services.duplicate_service import find_duplicate_groups, get_duplicate_copies
+from services.extraction_service import move_extraction
 from utils.errors import ErrorCode, raise_error
 
 logger = logging.getLogger(__name__)
@@ -36,21 +39,17 @@ def _find_common_base(file_paths: list[str]) -> str:
         return os.path.dirname(file_paths[0])
 
 
-def _match_rule(rule: Rule, file: File, cls: Classification | None) -> bool:
-    """규칙이 파일에 매칭되는지 판별"""
+def _match_rule(rule: Rule, file: File, content_hits: set[str]) -> bool:
+    """
+    규칙이 파일에 매칭되는지 판별
+    content_hits: 본문 요약·파일명·카테고리에서 찾은 content 규칙 키워드 (분류 엔진과 같은 오토마톤 사용)
+    """
     if rule.type == "date" and file.modified_at:
         return str(file.modified_at.year) == rule.value
     if rule.type == "extension" and file.extension:
         return file.extension.lstrip(".").lower() == rule.value.lower()
     if rule.type == "content":
-        keyword = rule.value.lower()
-        if file.extracted_text_summary and keyword in file.extracted_text_summary.lower():
-            return True
-        if keyword in file.filename.lower():
-            return True
-        if cls and cls.category and keyword in cls.category.lower():
-            return True
-        return False
+        return rule.value.lower() in content_hits
     return False
 
 
@@ -92,10 +91,13 @@ def _get_destination(
     """
     rule_map = {r.id: r for r in rules}
     sorted_rules = sorted(rules, key=lambda r: r.priority)
+    content_hits = tier1_rule.get_matcher().find_content_keywords(
+        file.extracted_text_summary, file.filename, cls.category if cls else None,
+    )
 
     best_match: Rule | None = None
     for rule in sorted_rules:
-        if _match_rule(rule, file, cls):
+        if _match_rule(rule, file, content_hits):
             if best_match is None:
                 best_match = rule
             elif rule.parent_id is not None:
@@ -195,10 +197,20 @@ def _get_best_classifications(db: Session, scan_id: str) -> list[tuple]:
     return [(files_map[fid], cls) for fid, cls in best_cls.items() if fid in files_map]
 
 
-def build_preview(db: Session, scan_id: str) -> dict:
+def _get_duplicate_copies(
+    db: Session, scan_id: str, rows: list[tuple], persist: bool = False,
+) -> dict[int, File]:
+    """내용이 같은 파일 묶음에서 대표를 제외한 사본의 {사본 file_id: 대표 File}"""
+    files_map = {f.id: f for f, _ in rows}
+    copies = get_duplicate_copies(db, list(files_map), find_duplicate_groups(db, scan_id, persist))
+    return {file_id: files_map[canonical] for file_id, canonical in copies.items()}
+
+
+def build_preview(db: Session, scan_id: str, skip_duplicates: bool = False) -> dict:
     """
     UC-06: 정리 적용 미리보기
     실제 파일 이동 없이 이동 계획 트리 반환
+    skip_duplicates: 내용이 같은 파일은 대표 하나만 이동 계획에 포함
     """
     rules = db.query(Rule).order_by(Rule.priority).all()
     rows = _get_best_classifications(db, scan_id)
@@ -206,6 +218,8 @@ def build_preview(db: Session, scan_id: str) -> dict:
     if not rows:
         raise_error(ErrorCode.SCAN_NOT_FOUND, "해당 스캔 ID의 분류 결과 없음")
 
+    duplicates = _get_duplicate_copies(db, scan_id, rows) if skip_duplicates else {}
+
     base_dir = _find_common_base([f.path for f, _ in rows])
 
     total_files = 0
@@ -215,7 +229,7 @@ def build_preview(db: Session, scan_id: str) -> dict:
     preview_tree: dict[str, list] = {}
 
     for file, cls in rows:
-        if not cls or cls.confidence_score < UNCLASSIFIED_THRESHOLD:
+        if not cls or cls.confidence_score < UNCLASSIFIED_THRESHOLD or file.id in duplicates:
             excluded_files += 1
             continue
 
@@ -248,6 +262,7 @@ def build_preview(db: Session, scan_id: str) -> dict:
     return {
         "total_files": total_files,
         "excluded_files": excluded_files,
+        "duplicate_files": len(duplicates),
         "folders_to_create": len(folders_to_create),
         "conflicts": conflicts,
         "preview_tree": tree_list,
@@ -259,10 +274,12 @@ def apply_organize(
     scan_id: str,
     conflict_resolution: str,
     folder_path: str,
+    skip_duplicates: bool = False,
 ) -> dict:
     """
     UC-06: 정리 적용 실행
     파일 이동 후 ActionBatch + ActionLog 저장
+    skip_duplicates: 내용이 같은 파일은 대표 하나만 이동하고 나머지 사본은 제자리에 둠 (action_type "duplicate")
     """
     rules = db.query(Rule).order_by(Rule.priority).all()
     rows = _get_best_classifications(db, scan_id)
@@ -270,6 +287,8 @@ def apply_organize(
     if not rows:
         raise_error(ErrorCode.SCAN_NOT_FOUND, "해당 스캔 ID의 분류 결과 없음")
 
+    duplicates = _get_duplicate_copies(db, scan_id, rows, persist=True) if skip_duplicates else {}
+
     base_dir = _find_common_base([f.path for f, _ in rows])
     action_log_id = f"log_{uuid.uuid4().hex[:12]}"
 
@@ -292,6 +311,19 @@ def apply_organize(
             skipped += 1
             continue
 
+        canonical = duplicates.get(file.id)
+        if canonical is not None:
+            skipped += 1
+            db.add(ActionLog(
+                action_log_id=action_log_id,
+                action_type="duplicate",
+                source_path=file.path,
+                destination_path=canonical.path,
+                is_undone=False,
+            ))
+            db.commit()
+            continue
+
         dest_path = _get_destination(file, cls, base_dir, rules)
         if os.path.normpath(dest_path) == os.path.normpath(file.path):
             skipped += 1
@@ -328,6 +360,7 @@ def apply_organize(
             continue
 
         file.path = final_dest
+        move_extraction(db, original_path, final_dest)
         db.add(ActionLog(
             action_log_id=action_log_id,
             action_type="move",
@@ -402,6 +435,7 @@ def undo_organize(db: Session, action_log_id: str) -> dict:
             file = db.query(File).filter(File.path == dest).first()
             if file:
                 file.path = src
+                move_extraction(db, dest, src)
                 db.commit()
 
             log.is_undone = True
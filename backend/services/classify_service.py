@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from models.schema import Classification, File
 from utils.errors import ErrorCode, raise_error
 from engines import tier2_embedding
+from services import embedding_store
 
 
 def update_manual_classification(
@@ -64,8 +65,13 @@ def update_manual_classification(
         raise_error(ErrorCode.SAVE_FAILED)
 
     # Tier 2 임베딩 피드백 반영 — 저장된 텍스트 요약과 수동 카테고리로 즉시 보정
+    # 임베딩 저장소에 같은 본문의 임베딩(번들 body)이 있으면 다시 인코딩하지 않음
     if category and file.extracted_text_summary:
-        tier2_embedding.apply_feedback(file.extracted_text_summary, category)
+        tier2_embedding.apply_feedback(
+            file.extracted_text_summary,
+            category,
+            embedding=embedding_store.get_body_embedding(db, file.extracted_text_summary),
+        )
 
     return {
         "id": file_id,
@@ -1,38 +1,33 @@
-import json
 import uuid
 
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity as _cosine_similarity_matrix
+from sqlalchemy import and_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
-from models.schema import CoverPage, CoverSimilarityGroup, Classification
-from engines.tier2_embedding import compute_embedding, infer_tag
+from models.schema import CoverPage, CoverSimilarityGroup, Classification, TextEmbedding
+from engines import tier2_embedding
+from engines.tier2_embedding import infer_tag
+from services import embedding_store
+from services.embedding_store import cover_hash
+from utils.embedding_matrix import normalize
 
 # 유사 그룹으로 묶는 최소 유사도 임계값
 SIMILARITY_THRESHOLD = 0.80
 
 
-def save_cover(db: Session, file_id: int, cover_text: str) -> CoverPage:
-    """표지 텍스트 임베딩 계산 후 DB 저장"""
-    embedding_json = compute_embedding(cover_text)
-
-    existing = db.query(CoverPage).filter(CoverPage.file_id == file_id).first()
-    if existing:
-        existing.cover_text = cover_text
-        existing.embedding = embedding_json
-        db.commit()
-        db.refresh(existing)
-        return existing
-
-    cover = CoverPage(
-        file_id=file_id,
-        cover_text=cover_text,
-        embedding=embedding_json,
+def save_cover(db: Session, file_id: int, cover_text: str) -> None:
+    """
+    표지 텍스트와 임베딩 키(텍스트 해시)를 file_id 기준으로 upsert (commit은 호출 측 배치 단위로 수행).
+    임베딩 벡터는 Stage 5에서 파일 임베딩 번들(head)을 계산할 때 임베딩 저장소에 함께 저장됨
+    """
+    values = {"file_id": file_id, "cover_text": cover_text, "text_hash": cover_hash(cover_text)}
+    stmt = sqlite_insert(CoverPage).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CoverPage.file_id],
+        set_={"cover_text": stmt.excluded.cover_text, "text_hash": stmt.excluded.text_hash},
     )
-    db.add(cover)
-    db.commit()
-    db.refresh(cover)
-    return cover
+    db.execute(stmt)
 
 
 def compute_similarity_groups(db: Session) -> None:
@@ -40,37 +35,51 @@ def compute_similarity_groups(db: Session) -> None:
     모든 표지 임베딩 간 유사도 계산 → 그룹 생성
     유사도 >= SIMILARITY_THRESHOLD 인 파일끼리 같은 group_id 부여
 
-    최적화: 임베딩 JSON을 한 번씩만 역직렬화해 (n×384) 행렬을 구성하고,
-    sklearn cosine_similarity(matrix, matrix)로 전체 유사도를 1회 일괄 계산.
-    기존 O(n²) JSON 역직렬화 + sklearn 호출을 O(n) 역직렬화 + 1회 행렬 연산으로 단축.
+    최적화: 임베딩 저장소의 float32 원시 바이트를 이어 붙여 파싱 없이 (n×384) 행렬을 만들고,
+    정규화 후 행렬 곱 1회로 전체 유사도를 일괄 계산.
     """
-    covers: list[CoverPage] = db.query(CoverPage).filter(
-        CoverPage.embedding.isnot(None)
-    ).all()
-
-    if len(covers) < 2:
+    if db.query(CoverPage.id).filter(CoverPage.text_hash.isnot(None)).limit(2).count() < 2:
         return
 
-    db.query(CoverSimilarityGroup).delete()
-    db.commit()
+    model_id = tier2_embedding.model_id()
+    vector_join = and_(TextEmbedding.text_hash == CoverPage.text_hash, TextEmbedding.model_id == model_id)
 
-    # 임베딩 JSON → numpy 벡터 일괄 변환, 파싱 실패 항목 제외
-    valid_covers: list[CoverPage] = []
-    vectors: list[np.ndarray] = []
-    for cover in covers:
-        try:
-            vec = np.array(json.loads(cover.embedding), dtype=np.float32)
-            valid_covers.append(cover)
-            vectors.append(vec)
-        except Exception:
-            continue
+    # 현재 모델의 벡터가 없는 표지 (모델 변경 후 다시 분류되지 않은 파일 등)는 여기서 인코딩해 저장
+    missing = (
+        db.query(CoverPage.cover_text)
+        .outerjoin(TextEmbedding, vector_join)
+        .filter(CoverPage.text_hash.isnot(None), TextEmbedding.id.is_(None))
+        .all()
+    )
+    if missing:
+        embedding_store.embed_texts_sync(
+            db, [tier2_embedding.cover_window(row.cover_text) for row in missing if row.cover_text],
+        )
+        db.commit()
+
+    rows = db.query(CoverPage, TextEmbedding.vector).join(TextEmbedding, vector_join).all()
 
-    if len(valid_covers) < 2:
+    if len(rows) < 2:
         return
 
+    # 이번에 다시 묶는 표지와 표지가 없어진 파일의 그룹만 교체 — 벡터를 만들지 못한 표지의 기존 그룹은 유지
+    left_out = {
+        row.file_id for row in (
+            db.query(CoverPage.file_id)
+            .outerjoin(TextEmbedding, vector_join)
+            .filter(CoverPage.text_hash.isnot(None), TextEmbedding.id.is_(None))
+        )
+    }
+    db.query(CoverSimilarityGroup).filter(
+        CoverSimilarityGroup.file_id.notin_(left_out)
+    ).delete(synchronize_session=False)
+    db.commit()
+
+    valid_covers: list[CoverPage] = [cover for cover, _ in rows]
+
     # (n × 384) 행렬 구성 후 전체 유사도 행렬 1회 계산
-    matrix = np.stack(vectors)                              # shape: (n, 384)
-    sim_matrix = _cosine_similarity_matrix(matrix, matrix)  # shape: (n, n)
+    matrix = normalize(np.frombuffer(b"".join(vector for _, vector in rows), dtype="<f4").reshape(len(rows), -1))
+    sim_matrix = matrix @ matrix.T                          # shape: (n, n)
 
     n = len(valid_covers)
     idx_map = {cover.file_id: i for i, cover in enumerate(valid_covers)}
@@ -0,0 +1,166 @@
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from models.schema import File, Classification
+from utils.fingerprint import full_hash, is_fully_hashed, quick_hash
+
+# 지문 계산 스레드 수 — 해시 계산 중에는 GIL이 풀리므로 디스크 대기와 해시 계산을 겹칠 수 있음
+DUPLICATE_HASH_WORKERS = min(8, os.cpu_count() or 4)
+
+
+def _scan_file_ids(db: Session, scan_id: str):
+    return (
+        db.query(Classification.file_id)
+        .filter(Classification.scan_id == scan_id)
+        .distinct()
+    )
+
+
+def _size_candidates(db: Session, scan_id: str) -> list:
+    """1단계: 크기가 같은 파일이 둘 이상인 크기의 파일만 (빈 파일 제외) — 파일을 읽지 않음"""
+    scan_files = _scan_file_ids(db, scan_id)
+    shared_sizes = (
+        db.query(File.size)
+        .filter(File.id.in_(scan_files), File.size > 0)
+        .group_by(File.size)
+        .having(func.count(File.id) > 1)
+    )
+    return (
+        db.query(File.id, File.path, File.size, File.modified_at, File.quick_hash, File.full_hash)
+        .filter(File.id.in_(scan_files), File.size.in_(shared_sizes))
+        .all()
+    )
+
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _verify_rows(rows: list[dict], executor: ThreadPoolExecutor) -> list[dict]:
+    """
+    후보 파일을 다시 stat — 사라진 파일은 제외하고, 크기·수정 시각이 File 행과 다르면
+    저장된 지문을 버리고 현재 크기로 다시 계산하도록 표시 (stale)
+    """
+    verified = []
+    for row, stat in zip(rows, executor.map(_stat_or_none, [row["path"] for row in rows])):
+        if stat is None:
+            continue
+        row["stale"] = (
+            stat.st_size != row["size"]
+            or row["modified_at"] != datetime.fromtimestamp(stat.st_mtime)
+        )
+        if row["stale"]:
+            row["size"] = stat.st_size
+            row["quick_hash"] = row["full_hash"] = None
+        if row["size"] > 0:
+            verified.append(row)
+    return verified
+
+
+def _fill_hashes(
+    rows: list[dict],
+    key: str,
+    compute: Callable[[str, Optional[int]], Optional[str]],
+    executor: ThreadPoolExecutor,
+) -> list[dict]:
+    """저장된 해시가 없는 행만 스레드 풀에서 계산 — 새로 계산한 행 반환"""
+    missing = [row for row in rows if row[key] is None]
+    digests = executor.map(compute, [row["path"] for row in missing], [row["size"] for row in missing])
+    computed = []
+    for row, digest in zip(missing, digests):
+        if digest is not None:
+            row[key] = digest
+            computed.append(row)
+    return computed
+
+
+def _group(rows: list[dict], key: str) -> list[list[dict]]:
+    """(size, key)가 같은 행끼리 묶어 2개 이상인 그룹만 반환 — 해시를 계산하지 못한 행은 제외"""
+    groups: dict[tuple, list[dict]] = defaultdict(list)
+    for row in rows:
+        if row[key] is not None:
+            groups[(row["size"], row[key])].append(row)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def find_duplicate_groups(db: Session, scan_id: str, persist: bool = False) -> list[dict]:
+    """
+    스캔에 포함된 파일 중 내용이 완전히 같은 파일 묶음 {size, full_hash, file_ids(오름차순)}.
+    크기 → 빠른 지문(앞·뒤 블록) → 전체 해시 순으로 후보를 좁혀, 대부분의 파일은 끝까지 읽지 않음.
+    스캔 중 이미 계산된 지문은 파일의 크기·수정 시각이 그대로일 때만 재사용.
+    persist: 새로 계산한 지문을 File에 저장 — 조회(GET)에서는 끄고 정리 적용에서만 저장
+    """
+    rows = [row._asdict() for row in _size_candidates(db, scan_id)]
+    if not rows:
+        return []
+
+    with ThreadPoolExecutor(max_workers=DUPLICATE_HASH_WORKERS, thread_name_prefix="clasp-dup") as executor:
+        rows = _verify_rows(rows, executor)
+        computed = _fill_hashes(rows, "quick_hash", quick_hash, executor)
+        partial_groups = _group(rows, "quick_hash")
+
+        # 앞·뒤 블록이 파일 전체를 덮는 작은 파일은 빠른 지문이 곧 전체 해시
+        needs_full: list[dict] = []
+        for group in partial_groups:
+            for row in group:
+                if row["full_hash"] is None and is_fully_hashed(row["size"]):
+                    row["full_hash"] = row["quick_hash"]
+                    computed.append(row)
+                else:
+                    needs_full.append(row)
+        computed += _fill_hashes(needs_full, "full_hash", full_hash, executor)
+
+    # 내용이 바뀐 파일은 File 행의 크기·수정 시각과 맞지 않으므로 저장하지 않음 (다음 스캔에서 갱신)
+    computed = [row for row in computed if not row["stale"]]
+    if persist and computed:
+        unique = {row["id"]: row for row in computed}
+        db.execute(update(File), [
+            {"id": row["id"], "quick_hash": row["quick_hash"], "full_hash": row["full_hash"]}
+            for row in unique.values()
+        ])
+        db.commit()
+
+    confirmed = _group([row for group in partial_groups for row in group], "full_hash")
+    groups = [
+        {
+            "size": group[0]["size"],
+            "full_hash": group[0]["full_hash"],
+            "file_ids": sorted(row["id"] for row in group),
+        }
+        for group in confirmed
+    ]
+    groups.sort(key=lambda group: group["file_ids"][0])
+    return groups
+
+
+def get_duplicate_copies(db: Session, file_ids: list[int], groups: list[dict]) -> dict[int, int]:
+    """
+    묶음별 대표 파일을 하나 고르고 나머지 사본의 {사본 file_id: 대표 file_id} 반환.
+    file_ids에 포함된 파일만 대상 — 수동 분류가 있는 파일을 우선, 그다음 먼저 등록된 파일이 대표.
+    """
+    targets = set(file_ids)
+    manual_ids = {
+        file_id for (file_id,) in
+        db.query(Classification.file_id)
+        .filter(Classification.file_id.in_(targets), Classification.is_manual == True)
+        .distinct()
+    }
+    copies: dict[int, int] = {}
+    for group in groups:
+        members = [file_id for file_id in group["file_ids"] if file_id in targets]
+        if len(members) < 2:
+            continue
+        canonical = min(members, key=lambda file_id: (file_id not in manual_ids, file_id))
+        for file_id in members:
+            if file_id != canonical:
+                copies[file_id] = canonical
+    return copies
@@ -0,0 +1,349 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Optional
+
+import numpy as np
+
+from engines import embedding_backend
+
+logger = logging.getLogger(__name__)
+
+# 임베딩 서비스 프로세스 사용 여부 — 0이면 기존처럼 요청한 스레드에서 직접 인코딩
+EMBEDDING_SERVICE_ENABLED = os.environ.get("CLASP_EMBEDDING_SERVICE", "1") != "0"
+# 마이크로 배치 하나에 묶는 최대 텍스트 수
+EMBED_MAX_BATCH = int(os.environ.get("CLASP_EMBED_MAX_BATCH", "64"))
+# 첫 요청 이후 다른 요청을 기다리는 최대 시간 (ms) — 짧을수록 지연↓, 길수록 배치 크기↑
+EMBED_MAX_WAIT_MS = float(os.environ.get("CLASP_EMBED_MAX_WAIT_MS", "10"))
+# 배치 하나의 최대 인코딩 시간 (초) — 넘기면 워커가 멈춘 것으로 보고 종료 후 다음 배치에서 새로 띄움
+EMBED_TIMEOUT_SECONDS = float(os.environ.get("CLASP_EMBED_TIMEOUT_SECONDS", "120"))
+# 워커 시작(모델 로드) 응답을 기다리는 최대 시간 (초) — 넘기면 워커를 종료하고 현재 프로세스에서 인코딩
+# 첫 실행에는 모델 다운로드가 포함될 수 있어 배치 제한 시간보다 길게 잡음
+EMBED_START_TIMEOUT_SECONDS = float(os.environ.get("CLASP_EMBED_START_TIMEOUT_SECONDS", "300"))
+# 호출 측 대기 시간에 더하는 여유 (초) — 멈춘 워커 종료·새 워커 시작 시간
+_RESULT_GRACE_SECONDS = 10
+# 지연 통계에 사용하는 최근 배치 수
+_STATS_WINDOW = 200
+
+
+def _worker_main(conn, model_name: str) -> None:
+    """
+    임베딩 워커 프로세스 진입점 — 모델을 한 번 로드하고 ("ready", 백엔드)를 보낸 뒤
+    (텍스트 목록, batch_size)를 받아 임베딩 배열을 돌려줌. None을 받으면 종료.
+    """
+    try:
+        model, backend = embedding_backend.load_encoder(model_name)
+    except Exception as e:
+        conn.send(("error", repr(e)))
+        return
+    conn.send(("ready", backend))
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        texts, batch_size = task
+        try:
+            conn.send(("ok", np.asarray(model.encode(texts, batch_size=batch_size), dtype=np.float32)))
+        except Exception as e:
+            conn.send(("error", repr(e)))
+
+
+class _Request:
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class EmbeddingService:
+    """
+    모델을 소유하는 전용 워커 프로세스 1개와 요청을 묶어 보내는 디스패처 스레드.
+    스캔·수동 분류 피드백·표지 저장 등 모든 호출 측의 encode 요청을 큐 하나로 받아
+    EMBED_MAX_BATCH개 또는 첫 요청 후 EMBED_MAX_WAIT_MS가 지날 때까지 모아 한 번에 인코딩.
+    SentenceTransformer.encode와 같은 호출 방식이라 tier2_embedding의 인코더로 그대로 사용 (set_model_loader)
+    """
+
+    def __init__(
+        self,
+        max_batch: int = EMBED_MAX_BATCH,
+        max_wait_ms: float = EMBED_MAX_WAIT_MS,
+        timeout: float = EMBED_TIMEOUT_SECONDS,
+        start_timeout: float = EMBED_START_TIMEOUT_SECONDS,
+    ):
+        # fork는 이벤트 루프·DB 커넥션 등 부모 상태를 복제하므로 spawn 사용
+        self._ctx = multiprocessing.get_context("spawn")
+        self._max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000
+        self._timeout = timeout
+        self._start_timeout = start_timeout
+        self._queue: queue.Queue[Optional[_Request]] = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._model_name: Optional[str] = None
+        self._process = None
+        self._conn = None
+        self._dispatcher: Optional[threading.Thread] = None
+        # 워커를 시작하지 못해 대신 쓰는 현재 프로세스의 (인코더, 백엔드)
+        self._fallback: Optional[tuple[object, str]] = None
+        self.backend: Optional[str] = None
+
+        self._batches = 0
+        self._texts = 0
+        self._timeouts = 0
+        self._batch_sizes: deque[int] = deque(maxlen=_STATS_WINDOW)
+        self._latencies: deque[float] = deque(maxlen=_STATS_WINDOW)
+        self._waits: deque[float] = deque(maxlen=_STATS_WINDOW)
+
+    # ── 워커 프로세스 ─────────────────────────────────────────────────────────
+
+    def _spawn_worker(self) -> None:
+        """
+        워커 프로세스를 띄우고 모델 로드가 끝날 때까지 최대 start_timeout초 대기.
+        로드 실패·시간 초과면 워커를 종료하고 RuntimeError
+        """
+        conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main, args=(child_conn, self._model_name), daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        try:
+            if conn.poll(self._start_timeout):
+                status, payload = conn.recv()
+            else:
+                status, payload = "error", f"모델 로드 응답 없음 ({self._start_timeout:.0f}초 초과)"
+        except (EOFError, OSError):
+            process.join(timeout=1)
+            status, payload = "error", f"exit code {process.exitcode}"
+        if status != "ready":
+            process.kill()
+            process.join(timeout=1)
+            conn.close()
+            raise RuntimeError(f"임베딩 워커 시작 실패: {payload}")
+        self._process, self._conn, self.backend = process, conn, payload
+        logger.info("임베딩 워커 시작: pid=%s backend=%s", process.pid, payload)
+
+    def _stop_worker(self) -> None:
+        """워커 종료 — 디스패처 스레드 안에서, 또는 디스패처가 끝난 뒤에만 호출 (연결을 닫으므로)"""
+        if self._process is None:
+            return
+        try:
+            self._conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self._process.join(timeout=1)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join(timeout=1)
+        self._conn.close()
+        self._process = self._conn = None
+
+    def connect(self, model_name: str) -> tuple["EmbeddingService", str]:
+        """
+        tier2_embedding 모델 로더 — 워커와 디스패처를 (처음 한 번) 시작하고 (인코더, 백엔드) 반환.
+        embedding_backend.load_encoder와 같은 형태.
+        워커를 시작하지 못하면 (모델 로드 실패·시간 초과) 현재 프로세스에서 로드한 인코더를 대신 반환
+        """
+        with self._start_lock:
+            if self._fallback is not None:
+                return self._fallback
+            if self._process is None:
+                self._model_name = model_name
+                try:
+                    self._spawn_worker()
+                except RuntimeError as e:
+                    logger.warning("%s — 현재 프로세스에서 직접 인코딩", e)
+                    self._fallback = embedding_backend.load_encoder(model_name)
+                    self.backend = self._fallback[1]
+                    return self._fallback
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch, name="clasp-embedding", daemon=True,
+                )
+                self._dispatcher.start()
+        return self, self.backend
+
+    # ── 마이크로 배치 ─────────────────────────────────────────────────────────
+
+    def encode(self, sentences, batch_size: int = 32, **kwargs) -> np.ndarray:
+        """큐에 요청을 넣고 결과를 기다림 (이벤트 루프가 아닌 스레드에서 호출)"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        if self._dispatcher is None:
+            raise RuntimeError("임베딩 서비스가 시작되지 않았습니다")
+        request = _Request(texts)
+        self._queue.put(request)
+        try:
+            # 앞선 배치 하나와 자기 배치가 각각 제한 시간까지 걸리는 경우까지 대기
+            embeddings = request.future.result(timeout=self._timeout * 2 + _RESULT_GRACE_SECONDS)
+        except FutureTimeoutError:
+            # 아직 배치에 들어가지 않았으면 취소 — 디스패처가 건너뜀
+            request.future.cancel()
+            raise RuntimeError("임베딩 요청 시간 초과") from None
+        return embeddings[0] if single else embeddings
+
+    def _dispatch(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            size = len(first.texts)
+            deadline = time.perf_counter() + self._max_wait
+            stop = False
+            while size < self._max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+                size += len(request.texts)
+            self._run_batch(batch)
+            if stop:
+                return
+
+    def _run_batch(self, batch: list[_Request]) -> None:
+        # 시간 초과로 호출 측이 취소한 요청은 제외
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        texts = [text for request in batch for text in request.texts]
+        started = time.perf_counter()
+        try:
+            if self._process is None or not self._process.is_alive():
+                # 워커가 비정상 종료된 경우 새 프로세스로 교체
+                self._stop_worker()
+                self._spawn_worker()
+            self._conn.send((texts, self._max_batch))
+            if self._conn.poll(self._timeout):
+                status, payload = self._conn.recv()
+            else:
+                # 멈춘 워커는 바로 종료 — 다음 배치에서 새 워커로 교체
+                self._process.kill()
+                self._stop_worker()
+                self._timeouts += 1
+                status, payload = "error", f"임베딩 워커 응답 없음 ({self._timeout:.0f}초 초과)"
+        except (EOFError, OSError) as e:
+            # 다음 배치에서 새 워커로 교체
+            self._stop_worker()
+            status, payload = "error", f"임베딩 워커 종료: {e!r}"
+        except RuntimeError as e:
+            status, payload = "error", str(e)
+        latency = time.perf_counter() - started
+
+        with self._stats_lock:
+            self._batches += 1
+            self._texts += len(texts)
+            self._batch_sizes.append(len(texts))
+            self._latencies.append(latency)
+            self._waits.extend(started - request.enqueued_at for request in batch)
+
+        if status != "ok":
+            logger.warning("임베딩 배치 실패 (%d개): %s", len(texts), payload)
+            for request in batch:
+                request.future.set_exception(RuntimeError(payload))
+            return
+        offset = 0
+        for request in batch:
+            request.future.set_result(payload[offset:offset + len(request.texts)])
+            offset += len(request.texts)
+
+    # ── 상태 ─────────────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        """큐 길이와 최근 배치의 크기·지연 (ms)"""
+        with self._stats_lock:
+            sizes = list(self._batch_sizes)
+            latencies = np.array(self._latencies) * 1000
+            waits = np.array(self._waits) * 1000
+            batches, texts, timeouts = self._batches, self._texts, self._timeouts
+
+        def summary(values: np.ndarray) -> Optional[dict]:
+            if not len(values):
+                return None
+            return {
+                "avg": round(float(values.mean()), 2),
+                "p95": round(float(np.percentile(values, 95)), 2),
+                "max": round(float(values.max()), 2),
+            }
+
+        return {
+            "running": self._process is not None and self._process.is_alive(),
+            "in_process_fallback": self._fallback is not None,
+            "backend": self.backend,
+            "queue_depth": self._queue.qsize(),
+            "max_batch": self._max_batch,
+            "max_wait_ms": self._max_wait * 1000,
+            "batches": batches,
+            "texts": texts,
+            "timeouts": timeouts,
+            "avg_batch_size": round(sum(sizes) / len(sizes), 1) if sizes else None,
+            "batch_latency_ms": summary(latencies),
+            "queue_wait_ms": summary(waits),
+        }
+
+    def shutdown(self) -> None:
+        dispatcher_stopped = True
+        if self._dispatcher is not None:
+            self._queue.put(None)
+            self._dispatcher.join(timeout=5)
+            if self._dispatcher.is_alive():
+                # 배치 인코딩 중 — 워커를 종료해 디스패처의 poll/recv를 끝내고 디스패처가 정리하도록 대기
+                process = self._process
+                if process is not None:
+                    process.kill()
+                self._dispatcher.join(timeout=5)
+            dispatcher_stopped = not self._dispatcher.is_alive()
+            self._dispatcher = None
+        # 남은 요청은 실패 처리 — 대기 중인 호출 측이 멈추지 않도록
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                request.future.set_exception(RuntimeError("임베딩 서비스 종료"))
+        if dispatcher_stopped:
+            self._stop_worker()
+        else:
+            # 디스패처가 아직 연결을 쓰고 있으므로 닫지 않음 (데몬 스레드·프로세스라 앱 종료 시 함께 정리)
+            logger.warning("임베딩 디스패처가 종료되지 않아 워커 연결을 닫지 않음")
+
+
+_service: Optional[EmbeddingService] = None
+
+
+def get_embedding_service() -> EmbeddingService:
+    """모델 로드 비용이 크므로 앱 전체에서 1개만 생성"""
+    global _service
+    if _service is None:
+        _service = EmbeddingService()
+        logger.info(
+            "임베딩 서비스 생성: max_batch=%d max_wait_ms=%.1f", EMBED_MAX_BATCH, EMBED_MAX_WAIT_MS,
+        )
+    return _service
+
+
+def shutdown_embedding_service() -> None:
+    global _service
+    if _service is not None:
+        _service.shutdown()
+        _service = None
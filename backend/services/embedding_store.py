@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, engine
+from engines import tier2_embedding
+from models.schema import TextEmbedding
+
+logger = logging.getLogger(__name__)
+
+# IN 절 하나에 넣는 해시 수 (SQLite 바인드 변수 제한 대비)
+_LOOKUP_CHUNK = 500
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def text_hash(text: str) -> str:
+    """NFC 정규화·공백 축약 후 텍스트 해시 — 공백만 다른 같은 텍스트는 같은 키"""
+    normalized = _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def cover_hash(cover_text: str) -> str:
+    """표지 임베딩 키 — 표지 앞 500자(cover_window)의 해시, 표지가 있는 파일의 번들 head와 같은 키"""
+    return text_hash(tier2_embedding.cover_window(cover_text))
+
+
+def to_blob(vector: np.ndarray) -> bytes:
+    return np.asarray(vector, dtype="<f4").tobytes()
+
+
+def from_blob(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype="<f4")
+
+
+def load_vectors(db: Session, hashes: Iterable[str], model_id: Optional[str] = None) -> dict[str, np.ndarray]:
+    """저장된 임베딩 {text_hash: 벡터} — 없는 해시는 결과에 없음"""
+    model_id = model_id or tier2_embedding.model_id()
+    hashes = list(set(hashes))
+    vectors: dict[str, np.ndarray] = {}
+    for start in range(0, len(hashes), _LOOKUP_CHUNK):
+        rows = (
+            db.query(TextEmbedding.text_hash, TextEmbedding.vector)
+            .filter(
+                TextEmbedding.model_id == model_id,
+                TextEmbedding.text_hash.in_(hashes[start:start + _LOOKUP_CHUNK]),
+            )
+        )
+        vectors.update((row.text_hash, from_blob(row.vector)) for row in rows)
+    return vectors
+
+
+def save_vectors(db: Session, vectors: dict[str, np.ndarray], model_id: Optional[str] = None) -> None:
+    """임베딩 저장 — 이미 있는 (모델, 해시)는 그대로 둠 (commit은 호출 측에서 수행)"""
+    if not vectors:
+        return
+    model_id = model_id or tier2_embedding.model_id()
+    stmt = sqlite_insert(TextEmbedding).on_conflict_do_nothing(
+        index_elements=[TextEmbedding.model_id, TextEmbedding.text_hash],
+    )
+    db.execute(stmt, [
+        {"model_id": model_id, "text_hash": digest, "vector": to_blob(vector)}
+        for digest, vector in vectors.items()
+    ])
+
+
+def _lookup(db: Session, texts: Iterable[str]) -> tuple[dict[str, str], dict[str, np.ndarray], dict[str, str]]:
+    """(텍스트→해시, 저장된 {해시: 벡터}, 인코딩이 필요한 {해시: 텍스트})"""
+    hashes = {text: text_hash(text) for text in set(texts) if text}
+    stored = load_vectors(db, hashes.values()) if hashes else {}
+    missing: dict[str, str] = {}
+    for text, digest in hashes.items():
+        if digest not in stored:
+            missing.setdefault(digest, text)
+    return hashes, stored, missing
+
+
+def _store(db: Session, stored: dict[str, np.ndarray], missing: dict[str, str], encoded: np.ndarray) -> None:
+    new_vectors = dict(zip(missing, encoded))
+    save_vectors(db, new_vectors)
+    stored.update(new_vectors)
+
+
+async def embed_texts(db: Session, texts: Iterable[str]) -> dict[str, np.ndarray]:
+    """
+    {텍스트: 임베딩} — 저장소에 있는 텍스트는 그대로 읽고, 없는 텍스트만 배치 인코딩 후 저장.
+    파일·재스캔 간에 같은 텍스트는 다시 인코딩하지 않음
+    """
+    hashes, stored, missing = _lookup(db, texts)
+    if missing:
+        encoded = await asyncio.to_thread(tier2_embedding.encode_texts, list(missing.values()))
+        _store(db, stored, missing, encoded)
+    return {text: stored[digest] for text, digest in hashes.items()}
+
+
+def embed_texts_sync(db: Session, texts: Iterable[str]) -> dict[str, np.ndarray]:
+    """embed_texts의 동기 버전 — 이미 워커 스레드에서 실행 중인 코드용 (Stage 6 표지 그룹화)"""
+    hashes, stored, missing = _lookup(db, texts)
+    if missing:
+        _store(db, stored, missing, tier2_embedding.encode_texts(list(missing.values())))
+    return {text: stored[digest] for text, digest in hashes.items()}
+
+
+async def encode_bundles(
+    db: Session,
+    texts: list[Optional[str]],
+    tag_sources: list[Optional[str]],
+) -> list[Optional[dict]]:
+    """tier2_embedding.encode_bundles와 같은 번들 {body, head} — 저장소를 거쳐 처음 보는 텍스트만 인코딩"""
+    pairs = [tier2_embedding.bundle_texts(text, source) for text, source in zip(texts, tag_sources)]
+    vectors = await embed_texts(db, [text for pair in pairs for text in pair])
+    return [
+        {"body": vectors[body], "head": vectors.get(head)} if body else None
+        for body, head in pairs
+    ]
+
+
+def get_body_embedding(db: Session, text: Optional[str]) -> Optional[np.ndarray]:
+    """저장된 본문 임베딩 (번들 body와 같은 키) — 없으면 None"""
+    body = tier2_embedding.bundle_texts(text)[0]
+    if not body:
+        return None
+    digest = text_hash(body)
+    return load_vectors(db, [digest]).get(digest)
+
+
+# ── JSON 임베딩 이전 ─────────────────────────────────────────────────────────────
+
+def _legacy_columns(table: str, names: set[str]) -> set[str]:
+    return names & {col["name"] for col in inspect(engine).get_columns(table)}
+
+
+def _loads(embedding_json: Optional[str]) -> Optional[np.ndarray]:
+    if not embedding_json:
+        return None
+    try:
+        return np.asarray(json.loads(embedding_json), dtype=np.float32)
+    except (ValueError, TypeError):
+        return None
+
+
+def migrate_json_embeddings() -> None:
+    """
+    이전 버전이 JSON 텍스트로 저장한 임베딩(cover_pages.embedding, extraction_cache의 *_embedding)을
+    저장소로 한 번 옮기고 원래 컬럼은 비움 — 값이 남아 있는 행이 없으면 아무 일도 하지 않음.
+    이전 벡터는 모두 기본 PyTorch 모델로 계산한 값이므로 그 모델 ID로 저장
+    """
+    model_id = tier2_embedding.MODEL_NAME
+    db = SessionLocal()
+    try:
+        vectors: dict[str, np.ndarray] = {}
+
+        if _legacy_columns("cover_pages", {"embedding"}):
+            rows = db.execute(text(
+                "SELECT id, cover_text, embedding FROM cover_pages WHERE embedding IS NOT NULL"
+            )).all()
+            for row in rows:
+                vector = _loads(row.embedding)
+                if vector is not None and row.cover_text:
+                    vectors[cover_hash(row.cover_text)] = vector
+            if rows:
+                db.execute(text("UPDATE cover_pages SET embedding = NULL WHERE embedding IS NOT NULL"))
+
+        legacy = _legacy_columns("extraction_cache", {"cover_embedding", "body_embedding", "head_embedding"})
+        if legacy:
+            columns = ", ".join(sorted(legacy))
+            condition = " OR ".join(f"{name} IS NOT NULL" for name in sorted(legacy))
+            rows = db.execute(text(
+                f"SELECT body_text, cover_text, {columns} FROM extraction_cache WHERE {condition}"
+            )).mappings().all()
+            for row in rows:
+                body, head = tier2_embedding.bundle_texts(
+                    row["body_text"] or row["cover_text"], row["cover_text"] or row["body_text"],
+                )
+                for key, source in (("body_embedding", body), ("head_embedding", head)):
+                    vector = _loads(row.get(key))
+                    if vector is not None and source:
+                        vectors[text_hash(source)] = vector
+                vector = _loads(row.get("cover_embedding"))
+                if vector is not None and row["cover_text"]:
+                    vectors[cover_hash(row["cover_text"])] = vector
+            if rows:
+                assignments = ", ".join(f"{name} = NULL" for name in sorted(legacy))
+                db.execute(text(f"UPDATE extraction_cache SET {assignments} WHERE {condition}"))
+
+        save_vectors(db, vectors, model_id)
+
+        # 표지 해시는 텍스트에서 계산 — 해시가 없는 이전 표지 행 보충
+        covers = db.execute(text(
+            "SELECT id, cover_text FROM cover_pages WHERE text_hash IS NULL AND cover_text IS NOT NULL"
+        )).all()
+        if covers:
+            db.execute(
+                text("UPDATE cover_pages SET text_hash = :text_hash WHERE id = :id"),
+                [{"id": row.id, "text_hash": cover_hash(row.cover_text)} for row in covers],
+            )
+        db.commit()
+        if vectors:
+            logger.info("JSON 임베딩 %d개를 임베딩 저장소로 이전", len(vectors))
+    except Exception as e:
+        db.rollback()
+        logger.warning("JSON 임베딩 이전 실패 (다음 실행 시 재시도): %s", e)
+    finally:
+        db.close()
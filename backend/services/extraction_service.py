@@ -0,0 +1,328 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models.schema import ExtractionCache, File
+
+logger = logging.getLogger(__name__)
+
+# 문서 파싱(PyMuPDF, python-docx)은 CPU 바운드라 GIL에 묶이므로 프로세스 풀로 분산
+EXTRACT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+# 워커 하나가 처리할 최대 파일 수 — 파서 내부 누수·단편화된 메모리를 주기적으로 회수
+MAX_TASKS_PER_WORKER = 200
+# 동시에 풀에 제출되는 작업 수 상한 — 제출 대기 중인 결과가 메모리에 쌓이지 않도록 제한
+MAX_IN_FLIGHT = EXTRACT_WORKERS * 2
+
+# 파일당 추출 예산 — 손상된 PDF나 zip bomb DOCX가 스캔 전체를 붙잡지 않도록 제한 (환경변수로 조정 가능)
+EXTRACT_TIMEOUT_SECONDS = float(os.environ.get("CLASP_EXTRACT_TIMEOUT_SECONDS", "30"))
+EXTRACT_MEMORY_LIMIT_MB = int(os.environ.get("CLASP_EXTRACT_MEMORY_LIMIT_MB", "1024"))
+# 이 크기를 넘는 파일은 열지 않음 (메타데이터·Tier 1 분류만 수행)
+MAX_EXTRACT_FILE_MB = int(os.environ.get("CLASP_MAX_EXTRACT_FILE_MB", "200"))
+
+# 메모리 예산 초과로 워커가 스스로 종료할 때의 exit code
+_EXIT_MEMORY = 75
+_MEMORY_CHECK_INTERVAL = 0.2
+
+
+class ExtractionBudgetExceeded(Exception):
+    """파일 하나가 시간/메모리 예산을 넘기거나 워커를 죽게 만든 경우"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        # timeout / memory / crashed — extraction_cache.error에 그대로 기록
+        self.reason = reason
+
+
+def _peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _watch_memory(limit_bytes: int) -> None:
+    """워커 내부 감시 스레드 — 최대 RSS가 예산을 넘으면 즉시 프로세스 종료"""
+    import time
+    while True:
+        peak = _peak_rss_bytes()
+        if peak is None:
+            return
+        if peak > limit_bytes:
+            os._exit(_EXIT_MEMORY)
+        time.sleep(_MEMORY_CHECK_INTERVAL)
+
+
+def _worker_main(conn, memory_limit_bytes: int) -> None:
+    """
+    추출 워커 프로세스 진입점 — (fn, args)를 받아 실행 결과를 돌려줌. None을 받으면 종료.
+    C 확장이 GIL을 잡고 있어 감시 스레드가 돌지 못하는 경우에도 부모의 시간 예산으로 종료됨.
+    """
+    if memory_limit_bytes > 0:
+        threading.Thread(target=_watch_memory, args=(memory_limit_bytes,), daemon=True).start()
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        fn, args = task
+        try:
+            conn.send(("ok", fn(*args)))
+        except MemoryError:
+            os._exit(_EXIT_MEMORY)
+        except Exception as e:
+            conn.send(("error", repr(e)))
+
+
+class _Worker:
+    def __init__(self, ctx, memory_limit_bytes: int):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, memory_limit_bytes),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.tasks_done = 0
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+
+class ExtractionPool:
+    """
+    문서 추출 전용 워커 프로세스 풀 (강제 종료 가능).
+    utils.document_reader 등 추출 함수를 워커 프로세스에서 실행하고,
+    파일마다 시간 예산(EXTRACT_TIMEOUT_SECONDS)과 메모리 예산(EXTRACT_MEMORY_LIMIT_MB)을 적용.
+    예산을 넘긴 워커는 kill 후 새 프로세스로 교체되고 호출 측에는 ExtractionBudgetExceeded 발생.
+    워커는 MAX_TASKS_PER_WORKER건 처리 후에도 새 프로세스로 교체됨.
+    """
+
+    def __init__(
+        self,
+        workers: int = EXTRACT_WORKERS,
+        max_tasks_per_worker: int = MAX_TASKS_PER_WORKER,
+        timeout_seconds: float = EXTRACT_TIMEOUT_SECONDS,
+        memory_limit_mb: int = EXTRACT_MEMORY_LIMIT_MB,
+    ):
+        # fork는 이벤트 루프·DB 커넥션 등 부모 상태를 복제하므로 spawn 사용
+        self._ctx = multiprocessing.get_context("spawn")
+        self._size = workers
+        self._max_tasks = max_tasks_per_worker
+        self._timeout = timeout_seconds
+        self._memory_limit = memory_limit_mb * 1024 * 1024
+        # 워커 파이프 응답 대기(poll)를 이벤트 루프 밖에서 수행
+        self._waiters = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clasp-extract")
+        self._all: set[_Worker] = set()
+        self._idle: asyncio.Queue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._ctx, self._memory_limit)
+        self._all.add(worker)
+        return worker
+
+    def _retire(self, worker: _Worker, kill: bool) -> None:
+        self._all.discard(worker)
+        if kill:
+            worker.kill()
+        else:
+            worker.stop()
+
+    def _ensure_loop(self, loop: asyncio.AbstractEventLoop) -> asyncio.Queue:
+        # 유휴 워커 큐는 이벤트 루프에 귀속되므로 루프가 바뀌면 (테스트·재시작) 새로 구성
+        if self._loop is not loop:
+            for worker in list(self._all):
+                self._retire(worker, kill=True)
+            self._idle = asyncio.Queue()
+            for _ in range(self._size):
+                self._idle.put_nowait(self._spawn())
+            self._loop = loop
+        return self._idle
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """
+        fn(*args)를 워커 프로세스에서 실행 — 유휴 워커가 없으면 자리가 날 때까지 대기.
+        예산 초과·워커 비정상 종료 시 ExtractionBudgetExceeded 발생.
+        """
+        loop = asyncio.get_running_loop()
+        idle = self._ensure_loop(loop)
+        worker: _Worker = await idle.get()
+        replacement: _Worker | None = None
+        try:
+            worker.conn.send((fn, args))
+            ready = await loop.run_in_executor(self._waiters, worker.conn.poll, self._timeout)
+            if not ready:
+                self._retire(worker, kill=True)
+                replacement = self._spawn()
+                raise ExtractionBudgetExceeded("timeout")
+            try:
+                status, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.process.join(timeout=1)
+                reason = "memory" if worker.process.exitcode == _EXIT_MEMORY else "crashed"
+                self._retire(worker, kill=True)
+                replacement = self._spawn()
+                raise ExtractionBudgetExceeded(reason)
+
+            worker.tasks_done += 1
+            if worker.tasks_done >= self._max_tasks:
+                self._retire(worker, kill=False)
+                replacement = self._spawn()
+            else:
+                replacement = worker
+            if status == "error":
+                raise RuntimeError(payload)
+            return payload
+        except asyncio.CancelledError:
+            # 스캔 취소 시 작업 중인 워커는 결과를 기다리지 않고 교체 → 취소 지연 최소화
+            if replacement is None:
+                self._retire(worker, kill=True)
+                replacement = self._spawn()
+            raise
+        finally:
+            if replacement is not None:
+                idle.put_nowait(replacement)
+
+    def shutdown(self) -> None:
+        for worker in list(self._all):
+            self._retire(worker, kill=True)
+        self._waiters.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: ExtractionPool | None = None
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """프로세스 풀은 기동 비용이 크므로 앱 전체에서 1개만 생성해 스캔 간 재사용"""
+    global _pool
+    if _pool is None:
+        _pool = ExtractionPool()
+        logger.info("추출 프로세스 풀 생성: workers=%d", EXTRACT_WORKERS)
+    return _pool
+
+
+def shutdown_extraction_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+async def extract_document(pool: ExtractionPool, fn: Callable, path: str, size: int | None) -> dict:
+    """
+    예산을 적용한 문서 추출.
+    반환: fn 결과 dict + error (None / too_large / timeout / memory / crashed / failed)
+    """
+    if size is not None and size > MAX_EXTRACT_FILE_MB * 1024 * 1024:
+        return {"cover_text": None, "body_text": None, "error": "too_large"}
+    try:
+        return {**await pool.run(fn, path), "error": None}
+    except ExtractionBudgetExceeded as e:
+        logger.warning("추출 예산 초과 (%s): %s", e.reason, path)
+        return {"cover_text": None, "body_text": None, "error": e.reason}
+    except RuntimeError as e:
+        logger.warning("추출 실패: %s (%s)", path, e)
+        return {"cover_text": None, "body_text": None, "error": "failed"}
+
+
+def get_cached_extraction(
+    db: Session,
+    path: str,
+    size: int | None,
+    modified_at: datetime | None,
+) -> ExtractionCache | None:
+    """
+    추출 캐시 조회 — path의 size·modified_at이 캐시 시점과 같을 때만 적중.
+    파일이 바뀌었으면 None 반환 → 호출 측에서 다시 추출.
+    """
+    if size is None or modified_at is None:
+        return None
+    return (
+        db.query(ExtractionCache)
+        .filter(
+            ExtractionCache.path == path,
+            ExtractionCache.size == size,
+            ExtractionCache.modified_at == modified_at,
+        )
+        .first()
+    )
+
+
+def save_extraction(
+    db: Session,
+    path: str,
+    size: int | None,
+    modified_at: datetime | None,
+    body_text: str | None,
+    cover_text: str | None,
+    error: str | None = None,
+) -> None:
+    """
+    추출 결과를 path 기준으로 upsert (commit은 호출 측 배치 단위로 수행)
+    error: 예산 초과 사유 — 기록해 두면 파일이 바뀌기 전까지 다음 스캔에서 재시도하지 않음
+    """
+    if size is None or modified_at is None:
+        return
+    values = {
+        "path": path,
+        "size": size,
+        "modified_at": modified_at,
+        "body_text": body_text,
+        "cover_text": cover_text,
+        "error": error,
+        "extracted_at": datetime.utcnow(),
+    }
+    stmt = sqlite_insert(ExtractionCache).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ExtractionCache.path],
+        set_={key: stmt.excluded[key] for key in values if key != "path"},
+    )
+    db.execute(stmt)
+
+
+def move_extraction(db: Session, src: str, dest: str) -> None:
+    """파일 이동에 맞춰 캐시 경로 변경 — dest에 있던 캐시는 덮어쓰인 파일의 것이므로 삭제"""
+    db.query(ExtractionCache).filter(ExtractionCache.path == dest).delete(synchronize_session=False)
+    db.query(ExtractionCache).filter(ExtractionCache.path == src).update(
+        {ExtractionCache.path: dest}, synchronize_session=False,
+    )
+
+
+def prune_extraction_cache(db: Session) -> int:
+    """
+    File 레코드가 없는 경로의 캐시 삭제 — 삭제된 파일·감시 밖에서 옮겨진 파일의 이전 경로.
+    삭제한 행 수 반환 (commit은 호출 측에서 수행)
+    """
+    return (
+        db.query(ExtractionCache)
+        .filter(ExtractionCache.path.notin_(select(File.path)))
+        .delete(synchronize_session=False)
+    )
+
@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, run_in_session
+from engines import pipeline, tier1_rule
+from models.schema import File, Classification, ExtractionCache
+from services import embedding_store, scan_service
+from services.scan_jobs import get_scan_runner
+
+logger = logging.getLogger(__name__)
+
+
+def _backfill_filename_years(db: Session) -> None:
+    """filename_year 컬럼 추가 전에 저장된 레코드의 연도를 한 번만 채움"""
+    rows = db.query(File.id, File.filename).filter(File.filename_year.is_(None)).all()
+    if not rows:
+        return
+    db.execute(update(File), [
+        {"id": row.id, "filename_year": tier1_rule.extract_year(row.filename) or ""}
+        for row in rows
+    ])
+    db.commit()
+
+
+def _keyword_conditions(keywords: Iterable[str]) -> list:
+    """
+    키워드가 파일명 또는 저장된 본문에 들어 있는 파일 조건 (후보를 넓게 잡고 재분류에서 확정).
+    부분 문자열 검색이라 인덱스를 쓰지 못하고 테이블을 훑음 — find_affected로 이벤트 루프 밖에서 실행
+    """
+    conditions = []
+    for keyword in {keyword.strip().lower() for keyword in keywords if keyword.strip()}:
+        pattern = f"%{keyword}%"
+        conditions.append(File.filename.ilike(pattern))
+        conditions.append(File.extracted_text_summary.ilike(pattern))
+        conditions.append(
+            File.path.in_(select(ExtractionCache.path).where(ExtractionCache.body_text.ilike(pattern)))
+        )
+    return conditions
+
+
+def find_affected_files(
+    db: Session,
+    extensions: Iterable[str] = (),
+    years: Iterable[str] = (),
+    keywords: Iterable[str] = (),
+    categories: Iterable[str] = (),
+) -> set[int]:
+    """
+    규칙·확장자·카테고리 변경의 영향을 받는 파일 (자동 분류 결과가 있는 파일만).
+    - extensions: File.extension 인덱스
+    - years: File.filename_year 인덱스
+    - keywords: 파일명·저장된 본문에 키워드가 포함된 파일
+    - categories: 현재 자동 분류가 해당 카테고리인 파일
+    """
+    conditions = []
+    extensions = {"." + ext.strip().lstrip(".").lower() for ext in extensions if ext.strip()}
+    if extensions:
+        conditions.append(File.extension.in_(extensions))
+    years = {year for year in years if year}
+    if years:
+        _backfill_filename_years(db)
+        conditions.append(File.filename_year.in_(years))
+    conditions += _keyword_conditions(keywords)
+    categories = {category for category in categories if category}
+    if categories:
+        conditions.append(
+            File.id.in_(
+                db.query(Classification.file_id).filter(
+                    Classification.category.in_(categories),
+                    Classification.is_manual == False,
+                )
+            )
+        )
+    if not conditions:
+        return set()
+
+    classified = db.query(Classification.file_id).filter(Classification.is_manual == False)
+    rows = db.query(File.id).filter(or_(*conditions), File.id.in_(classified)).all()
+    return {row.id for row in rows}
+
+
+def affected_by_category(db: Session, name: str, keywords: list[str]) -> set[int]:
+    """커스텀 카테고리 추가·삭제의 영향을 받는 파일 — 키워드(또는 이름)가 포함된 파일 + 현재 그 카테고리인 파일"""
+    return find_affected_files(db, keywords=[*keywords, name], categories=[name])
+
+
+def affected_by_rule(db: Session, rule_type: str, value: str) -> set[int]:
+    """규칙 추가·수정·삭제의 영향을 받는 파일 — 규칙 유형에 맞는 인덱스로 조회"""
+    if rule_type == "extension":
+        return find_affected_files(db, extensions=[value])
+    if rule_type == "date":
+        return find_affected_files(db, years=[value])
+    if rule_type == "content":
+        return find_affected_files(db, keywords=[value])
+    return set()
+
+
+async def find_affected(finder: Callable[..., set[int]], *args, **kwargs) -> set[int]:
+    """
+    영향받는 파일 조회(find_affected_files·affected_by_*)를 스레드에서 전용 세션으로 실행.
+    키워드 조회는 파일명·본문 전체를 훑으므로 라우터의 이벤트 루프를 막지 않도록 함
+    """
+    return await asyncio.to_thread(run_in_session, finder, *args, **kwargs)
+
+
+async def reclassify_files(file_ids: Iterable[int]) -> int:
+    """
+    파일을 저장된 본문·표지·임베딩 번들로 다시 분류해 가장 최근 자동 분류 결과를 갱신 (문서를 다시 열지 않음).
+    Stage 5와 같은 방식으로 Tier 1과 Tier 2 인코딩은 배치 단위, 본문이 있는 파일만 Tier 2/3를 거침. 갱신한 파일 수 반환
+    """
+    ids = sorted(file_ids)
+    if not ids:
+        return 0
+    db = SessionLocal()
+    updated = 0
+    try:
+        custom_category_names = await scan_service.load_custom_categories(db)
+        for start in range(0, len(ids), scan_service.BATCH_SIZE):
+            chunk = ids[start:start + scan_service.BATCH_SIZE]
+            latest = scan_service._latest_classifications(db, chunk, False)
+            manual = scan_service._latest_classifications(db, chunk, True)
+            rows = (
+                db.query(File, ExtractionCache)
+                .outerjoin(ExtractionCache, ExtractionCache.path == File.path)
+                .filter(File.id.in_(list(latest)))
+                .all()
+            )
+            manual_categories = [manual[file.id].category if file.id in manual else None for file, _ in rows]
+            texts = [(cached.body_text if cached else None) or file.extracted_text_summary for file, cached in rows]
+            covers = [cached.cover_text if cached else None for _, cached in rows]
+            t1_results = await pipeline.classify_tier1_batch(
+                [file.filename for file, _ in rows],
+                [file.extension or "" for file, _ in rows],
+                texts,
+                manual_categories,
+            )
+            inputs = [
+                pipeline.tier2_inputs(file.extension or "", text, cover_text, t1)
+                for (file, _), text, cover_text, t1 in zip(rows, texts, covers, t1_results)
+            ]
+            needed = [i for i, t2_input in enumerate(inputs) if t2_input is not None]
+            # 스캔 때 임베딩 저장소에 저장한 번들을 그대로 사용 — 처음 보는 텍스트만 인코딩
+            bundles = await embedding_store.encode_bundles(
+                db,
+                [inputs[i][0] for i in needed],
+                [inputs[i][1] for i in needed],
+            )
+            t2_results = dict(zip(needed, await pipeline.classify_tier2_batch(
+                [inputs[i][0] for i in needed],
+                [inputs[i][1] for i in needed],
+                bundles,
+            )))
+            now = datetime.utcnow()
+            for i, ((file, _), text, cover_text, manual_category, t1) in enumerate(
+                zip(rows, texts, covers, manual_categories, t1_results)
+            ):
+                result = await pipeline.classify(
+                    file_path=file.path,
+                    filename=file.filename,
+                    extension=file.extension or "",
+                    extracted_text=text,
+                    cover_text=cover_text,
+                    manual_category=manual_category,
+                    custom_category_names=custom_category_names,
+                    t1=t1,
+                    t2=t2_results.get(i),
+                )
+                cls = latest[file.id]
+                cls.category = result["category"]
+                cls.tag = result["tag"]
+                cls.tier_used = result["tier_used"]
+                cls.confidence_score = result["confidence_score"]
+                cls.classified_at = now
+                updated += 1
+            db.commit()
+    finally:
+        db.close()
+    return updated
+
+
+class Reclassifier:
+    """
+    규칙·설정 변경 후 영향받는 파일의 백그라운드 재분류 대기열.
+    변경이 연달아 들어와도 대기 중인 파일 집합에 합쳐 한 번에 처리하며,
+    DB 쓰기가 스캔과 겹치지 않도록 스캔 실행 슬롯 안에서 실행.
+    """
+
+    def __init__(self):
+        self._pending: set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.files_reclassified = 0
+        self.last_run_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit(self, file_ids: Iterable[int]) -> int:
+        """재분류할 파일 추가 — 추가된 파일 수 반환"""
+        file_ids = set(file_ids) - self._pending
+        if not file_ids:
+            return 0
+        self._pending |= file_ids
+        if not self.running:
+            self._task = asyncio.create_task(self._run(), name="clasp-reclassify")
+        return len(file_ids)
+
+    async def _run(self) -> None:
+        async with get_scan_runner().slots:
+            while self._pending:
+                file_ids, self._pending = self._pending, set()
+                try:
+                    updated = await reclassify_files(file_ids)
+                except Exception as e:
+                    logger.error("재분류 실패 (%d개 파일): %s", len(file_ids), e, exc_info=True)
+                    continue
+                self.files_reclassified += updated
+                self.last_run_at = time.time()
+                logger.info("규칙·설정 변경으로 %d개 파일 재분류", updated)
+
+    async def stop(self) -> None:
+        if self.running:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._pending.clear()
+
+
+_reclassifier: Optional[Reclassifier] = None
+
+
+def get_reclassifier() -> Reclassifier:
+    global _reclassifier
+    if _reclassifier is None:
+        _reclassifier = Reclassifier()
+    return _reclassifier
+
+
+async def stop_reclassifier() -> None:
+    global _reclassifier
+    if _reclassifier is not None:
+        await _reclassifier.stop()
+        _reclassifier = None
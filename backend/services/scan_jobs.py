@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from contextlib import aclosing
+from typing import AsyncIterator, Optional
+
+from database import SessionLocal
+from services import scan_service
+
+logger = logging.getLogger(__name__)
+
+# 동시에 실행할 수 있는 스캔 수 — 스캔끼리 CPU·추출 프로세스 풀·임베딩 모델을 나눠 쓰지 않도록 기본 1개
+SCAN_MAX_CONCURRENT = max(1, int(os.environ.get("CLASP_MAX_CONCURRENT_SCANS", "1")))
+
+# 끝난 스캔을 보관하는 시간 (초) — 창을 새로고침한 뒤 다시 붙어도 최종 이벤트를 받을 수 있도록
+SCAN_JOB_RETENTION_SECONDS = 600
+
+# 스캔당 보관하는 진행 이벤트 수 — 스냅샷이 누적값이라 오래된 이벤트는 버려도 재접속 시 손실 없음
+SCAN_EVENT_LOG_SIZE = 512
+
+# 취소 요청 후 실행 중인 스캔이 멈출 때까지 기다리는 최대 시간 (초)
+SCAN_CANCEL_TIMEOUT_SECONDS = 10
+
+# 종료 상태를 나타내는 stage 값 (7: 완료, -1: 오류)
+_FINAL_STAGES = {7: "completed", -1: "failed"}
+
+
+def _cancelled_event() -> dict:
+    return {
+        "stage": -1,
+        "message": "스캔이 취소되었습니다",
+        "total": 0,
+        "completed": 0,
+        "current_file": "",
+        "resumable": True,
+    }
+
+
+class ScanJob:
+    """
+    스캔 작업 하나의 상태와 진행 이벤트 로그.
+    이벤트 ID는 1부터 증가하는 정수로, SSE id 필드와 Last-Event-ID 재접속에 그대로 사용.
+    같은 scan_id로 재개한 작업은 이전 작업의 마지막 ID에서 이어서 번호를 매김.
+    """
+
+    def __init__(self, scan_id: str, folder_path: str, last_event_id: int = 0):
+        self.scan_id = scan_id
+        self.folder_path = folder_path
+        self.status = "queued"
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._events: deque[tuple[int, dict]] = deque(maxlen=SCAN_EVENT_LOG_SIZE)
+        self._last_id = last_event_id
+        self._updated = asyncio.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    @property
+    def last_event_id(self) -> int:
+        return self._last_id
+
+    def publish(self, event: dict) -> None:
+        self._last_id += 1
+        self._events.append((self._last_id, event))
+        status = _FINAL_STAGES.get(event.get("stage"))
+        if status:
+            self.finish(status)
+        self._wake()
+
+    def finish(self, status: str) -> None:
+        if not self.active:
+            return
+        self.status = status
+        self.finished_at = time.time()
+        self._wake()
+
+    def _wake(self) -> None:
+        # 대기 중인 구독자를 모두 깨우고, 다음 대기를 위해 새 Event로 교체
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def subscribe(self, last_event_id: int = 0) -> AsyncIterator[tuple[int, dict]]:
+        """
+        last_event_id 이후의 이벤트를 (id, event)로 yield하고, 스캔이 끝날 때까지 새 이벤트를 기다림.
+        보관 범위보다 오래된 ID로 재접속하면 남아 있는 가장 오래된 이벤트부터 전달.
+        """
+        cursor = last_event_id
+        while True:
+            updated = self._updated
+            for event_id, event in list(self._events):
+                if event_id > cursor:
+                    cursor = event_id
+                    yield event_id, event
+            if not self.active:
+                return
+            await updated.wait()
+
+
+class ScanJobRunner:
+    """
+    백그라운드 스캔 실행기.
+    /scan/start는 작업을 큐에 넣기만 하고, SCAN_MAX_CONCURRENT개의 워커가 순서대로 꺼내 실행.
+    스캔은 SSE 연결과 무관하게 끝까지 진행되며, 진행 이벤트는 ScanJob 로그에 기록되어
+    여러 구독자가 언제든 붙거나(Last-Event-ID로) 다시 붙을 수 있음.
+    취소·비정상 종료된 스캔은 DB 체크포인트(ScanCheckpoint)를 근거로 같은 scan_id로 재개.
+    """
+
+    def __init__(self, max_concurrent: int = SCAN_MAX_CONCURRENT):
+        self._max_concurrent = max_concurrent
+        self._jobs: dict[str, ScanJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._slots = asyncio.Semaphore(max_concurrent)
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        """스캔과 같은 동시 실행 한도를 공유하는 실행 슬롯 — 감시 모드 증분 처리도 이 슬롯 안에서 실행"""
+        return self._slots
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        # 이전 프로세스가 실행 중에 종료된 스캔은 재개 가능 상태로 전환
+        db = SessionLocal()
+        try:
+            interrupted = scan_service.mark_interrupted_checkpoints(db)
+        finally:
+            db.close()
+        if interrupted:
+            logger.info("중단된 스캔 %d개를 재개 가능 상태로 표시", interrupted)
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"clasp-scan-{i}")
+            for i in range(self._max_concurrent)
+        ]
+
+    async def stop(self) -> None:
+        """
+        앱 종료 — 대기·실행 중인 스캔을 취소한 뒤 체크포인트를 interrupted로 표시.
+        사용자 취소(cancel)와 달리 다음 /scan/start에서 자동으로 이어서 실행됨.
+        실행 중인 스캔 세션이 쓰기 트랜잭션을 rollback한 뒤에 기록해야 SQLite 잠금을 기다리지 않음
+        """
+        active_ids = [job.scan_id for job in self._jobs.values() if job.active]
+        running = [job.task for job in self._jobs.values() if job.task and not job.task.done()]
+        for task in self._workers + running:
+            task.cancel()
+        await asyncio.gather(*self._workers, *running, return_exceptions=True)
+        self._workers = []
+        if active_ids:
+            db = SessionLocal()
+            try:
+                scan_service.mark_interrupted_checkpoints(db, active_ids)
+            finally:
+                db.close()
+        for job in self._jobs.values():
+            job.finish("cancelled")
+
+    def get(self, scan_id: str) -> Optional[ScanJob]:
+        return self._jobs.get(scan_id)
+
+    def find_active(self, folder_path: str) -> Optional[ScanJob]:
+        return next(
+            (job for job in self._jobs.values() if job.active and job.folder_path == folder_path),
+            None,
+        )
+
+    def find_resumable(self, folder_path: str) -> Optional[str]:
+        """폴더의 자동 재개 대상 스캔 scan_id (없으면 None) — scan_service.find_resumable_checkpoint 참고"""
+        db = SessionLocal()
+        try:
+            checkpoint = scan_service.find_resumable_checkpoint(db, folder_path)
+            return checkpoint.scan_id if checkpoint else None
+        finally:
+            db.close()
+
+    def submit(self, folder_path: str, scan_id: Optional[str] = None) -> ScanJob:
+        """
+        스캔 작업 생성 후 실행 대기열에 추가
+        scan_id: 중단된 스캔을 재개할 때 기존 ID — 체크포인트 이후부터 이어서 실행
+        """
+        self.start()
+        self._cleanup()
+        previous = self._jobs.get(scan_id) if scan_id else None
+        scan_id = scan_id or f"scan_{uuid.uuid4().hex[:12]}"
+        db = SessionLocal()
+        try:
+            scan_service.create_checkpoint(db, scan_id, folder_path)
+        finally:
+            db.close()
+        job = ScanJob(scan_id, folder_path, previous.last_event_id if previous else 0)
+        self._jobs[scan_id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    async def cancel(self, scan_id: str) -> bool:
+        """
+        대기 중이거나 실행 중인 스캔 취소 — 실행 중이면 최대 SCAN_CANCEL_TIMEOUT_SECONDS 동안 종료를 기다림.
+        commit된 진행 상황은 체크포인트로 남아 같은 scan_id로 재개 가능. 취소할 작업이 없으면 False.
+        """
+        job = self._jobs.get(scan_id)
+        if job is None or not job.active:
+            return False
+        if job.task is None:
+            # 아직 실행 전 — 워커가 꺼낼 때 건너뜀
+            db = SessionLocal()
+            try:
+                scan_service.save_checkpoint(db, scan_id, status="cancelled")
+                db.commit()
+            finally:
+                db.close()
+            job.finish("cancelled")
+            job.publish(_cancelled_event())
+            return True
+        job.task.cancel()
+        await asyncio.wait({job.task}, timeout=SCAN_CANCEL_TIMEOUT_SECONDS)
+        return True
+
+    def _cleanup(self) -> None:
+        """보관 시간이 지난 종료 작업 정리"""
+        now = time.time()
+        stale = [
+            sid for sid, job in self._jobs.items()
+            if not job.active and now - job.finished_at > SCAN_JOB_RETENTION_SECONDS
+        ]
+        for sid in stale:
+            self._jobs.pop(sid, None)
+
+    async def _worker(self) -> None:
+        while True:
+            job: ScanJob = await self._queue.get()
+            try:
+                if job.active:
+                    # 취소 요청이 워커가 아닌 스캔 작업만 멈추도록 별도 Task로 실행
+                    job.task = asyncio.create_task(self._run(job), name=f"clasp-{job.scan_id}")
+                    await asyncio.wait({job.task})
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: ScanJob) -> None:
+        try:
+            async with self._slots:
+                job.status = "running"
+                async with aclosing(scan_service.run_scan(job.scan_id, job.folder_path)) as events:
+                    async for event in events:
+                        job.publish(event)
+        except asyncio.CancelledError:
+            job.finish("cancelled")
+            job.publish(_cancelled_event())
+        except Exception as e:
+            # run_scan은 오류를 stage -1 이벤트로 보고하므로 여기까지 오는 경우는 드묾
+            logger.error("스캔 작업 실패: %s", e, exc_info=True)
+            job.publish({"stage": -1, "message": f"스캔 중 오류 발생: {e}", "total": 0, "completed": 0, "current_file": ""})
+        finally:
+            job.finish("failed")
+
+
+_runner: Optional[ScanJobRunner] = None
+
+
+def get_scan_runner() -> ScanJobRunner:
+    global _runner
+    if _runner is None:
+        _runner = ScanJobRunner()
+    return _runner
+
+
+async def shutdown_scan_runner() -> None:
+    global _runner
+    if _runner is not None:
+        await _runner.stop()
+        _runner = None
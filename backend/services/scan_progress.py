@@ -0,0 +1,128 @@
+import asyncio
+import os
+import time
+from typing import AsyncIterator
+
+# SSE 진행 이벤트 최대 전송 빈도 (스캔당 초당 이벤트 수)
+PROGRESS_MAX_EVENTS_PER_SECOND = float(os.environ.get("CLASP_PROGRESS_EVENTS_PER_SECOND", "4"))
+
+# 처리량(files/s) 지수 이동 평균 가중치 — 값이 클수록 최근 구간을 더 반영
+_THROUGHPUT_ALPHA = 0.3
+
+STAGE_MESSAGES = {
+    1: "파일 목록 수집 중",
+    2: "메타데이터 분석 중",
+    3: "표지 탐지 중",
+    4: "본문 추출 중",
+    5: "분류 엔진 처리 중",
+    6: "유사도 계산 중",
+    7: "완료",
+}
+
+# 파일 단위 스트리밍으로 처리되는 단계 (목록 수집 → 메타데이터 → 표지 → 본문 → 분류)
+PIPELINE_STAGES = (1, 2, 3, 4, 5)
+
+
+def progress_event(stage: int, total: int, completed: int, current_file: str) -> dict:
+    return {
+        "stage": stage,
+        "message": STAGE_MESSAGES[stage],
+        "total": total,
+        "completed": completed,
+        "current_file": current_file,
+    }
+
+
+class ScanProgress:
+    """
+    스캔 진행 상황 집계기 — 워커는 update()로 카운터만 올리고 (await 없음),
+    SSE 측은 stream()으로 초당 최대 PROGRESS_MAX_EVENTS_PER_SECOND개의 스냅샷만 받음.
+    단계 전환 이벤트는 빈도 제한과 무관하게 항상 전달.
+    스냅샷에는 최종 분류 단계 기준 처리량(throughput, files/s)과 예상 남은 시간(eta_seconds)을 포함.
+    """
+
+    def __init__(self, max_events_per_second: float = PROGRESS_MAX_EVENTS_PER_SECOND):
+        self.completed = {stage: 0 for stage in PIPELINE_STAGES}
+        self.walking = True
+        self._interval = 1.0 / max_events_per_second
+        self._current_file = ""
+        self._stage = PIPELINE_STAGES[0]
+        self._changed = False
+        # 빈도 제한 사이에 발생한 단계 전환 — 다음 전송 시 먼저 내보냄
+        self._transitions: list[dict] = []
+        self._rate_sample = (time.monotonic(), 0)
+        self._throughput = 0.0
+
+    @property
+    def total(self) -> int:
+        return self.completed[1]
+
+    @property
+    def stage(self) -> int:
+        return self._current_stage()
+
+    def _current_stage(self) -> int:
+        if self.walking:
+            return 1
+        total = self.total
+        return next((s for s in PIPELINE_STAGES if self.completed[s] < total), PIPELINE_STAGES[-1])
+
+    def update(self, stage: int, filename: str) -> None:
+        """파일 하나가 stage를 통과했음을 기록"""
+        self.completed[stage] += 1
+        self._current_file = filename
+        self._changed = True
+        self._check_transition()
+
+    def finish_walk(self) -> None:
+        self.walking = False
+        self._changed = True
+        self._check_transition()
+
+    def _check_transition(self) -> None:
+        current = self._current_stage()
+        if current != self._stage:
+            self._stage = current
+            self._transitions.append(self.snapshot())
+
+    def _update_throughput(self) -> None:
+        now = time.monotonic()
+        last_time, last_done = self._rate_sample
+        elapsed = now - last_time
+        if elapsed <= 0:
+            return
+        instant = (self.completed[5] - last_done) / elapsed
+        self._throughput = (
+            instant if self._throughput == 0
+            else _THROUGHPUT_ALPHA * instant + (1 - _THROUGHPUT_ALPHA) * self._throughput
+        )
+        self._rate_sample = (now, self.completed[5])
+
+    def snapshot(self) -> dict:
+        stage = self._current_stage()
+        total = self.total
+        event = progress_event(stage, total, self.completed[stage], self._current_file)
+        event["stages"] = {str(s): self.completed[s] for s in PIPELINE_STAGES}
+        event["throughput"] = round(self._throughput, 1)
+        remaining = total - self.completed[5]
+        event["eta_seconds"] = (
+            round(remaining / self._throughput)
+            if not self.walking and self._throughput > 0
+            else None
+        )
+        return event
+
+    async def stream(self, until: asyncio.Future) -> AsyncIterator[dict]:
+        """until이 끝날 때까지 빈도 제한된 진행 스냅샷을 yield (마지막 상태는 종료 직전에 한 번 더 전송)"""
+        while not until.done():
+            await asyncio.wait({until}, timeout=self._interval)
+            self._update_throughput()
+            pending, self._transitions = self._transitions, []
+            for event in pending:
+                yield event
+            if self._changed:
+                self._changed = False
+                event = self.snapshot()
+                # 방금 보낸 단계 전환 이벤트와 같으면 중복 전송 생략
+                if not pending or event != pending[-1]:
+                    yield event
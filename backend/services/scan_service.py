@@ -2,17 +2,33 @@ import json
 import os
 import asyncio
 import logging
-from datetime import datetime
-from typing import AsyncGenerator
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import AsyncGenerator, AsyncIterator
+from sqlalchemy import insert, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from database import SessionLocal
-from models.schema import File, Classification, CoverSimilarityGroup, CustomCategory
-from utils.text_extractor import extract_text
-from utils.cover_detector import extract_cover_text
+from models.schema import File, Classification, CoverSimilarityGroup, CustomCategory, ScanCheckpoint
+from utils.document_reader import read_document
+from utils.dir_walker import walk_files
+from utils.fingerprint import full_hash, is_fully_hashed, quick_hash
 from services.cover_service import save_cover, compute_similarity_groups
+from services import embedding_store
+from services.scan_progress import ScanProgress, progress_event
+from services.extraction_service import (
+    MAX_IN_FLIGHT,
+    ExtractionPool,
+    extract_document,
+    get_cached_extraction,
+    get_extraction_pool,
+    move_extraction,
+    prune_extraction_cache,
+    save_extraction,
+)
 from engines import pipeline
-from engines import tier2_embedding
+from engines import tier1_rule, tier2_embedding
 
 logger = logging.getLogger(__name__)
 
@@ -28,32 +44,32 @@ EXCLUDED_EXTENSIONS = {".pyc", ".pyo", ".pyd", ".so", ".dylib", ".dll", ".exe"}
 
 BATCH_SIZE = 50
 
+# 단계 간 큐 크기 — 동시에 메모리에 머무는 파일 수의 상한
+PIPELINE_QUEUE_SIZE = 64
 
-def _collect_files(folder_path: str) -> list[str]:
-    """
-    폴더 재귀 탐색으로 파일 경로 목록 수집 (시스템/빌드 디렉토리 제외)
-    followlinks=False: 심볼릭 링크를 따라가지 않아 순환 참조로 인한 무한 루프 방지
-    """
-    result = []
-    for root, dirs, files in os.walk(folder_path, followlinks=False):
-        dirs[:] = [
-            d for d in dirs
-            if d not in EXCLUDED_DIRS and not d.startswith(".")
-        ]
-        for fname in files:
-            if fname.startswith("."):
-                continue
-            ext = os.path.splitext(fname)[1].lower()
-            if ext in EXCLUDED_EXTENSIONS:
-                continue
-            result.append(os.path.join(root, fname))
-    return result
+# Stage 5가 배치를 채우려고 추가로 기다리는 시간 (초) — 파일마다 DB 조회·스레드 전환을 반복하지 않도록
+CLASSIFY_GATHER_SECONDS = 0.005
+
+# 워커 종료 신호
+_DONE = object()
+
+# 경로 목록 IN 조회 한 번에 넣는 경로 수 (SQLite 바인드 변수 한도 이하)
+_PATH_CHUNK_SIZE = 500
+
+# 같은 scan_id로 이어서 실행할 수 있는 체크포인트 상태 (POST /scan/{scan_id}/resume)
+RESUMABLE_STATUSES = ("cancelled", "interrupted")
+# /scan/start가 자동으로 이어서 실행하는 중단 스캔의 최대 경과 시간 (시간) — 사용자가 취소한 스캔은 자동 재개하지 않음
+AUTO_RESUME_MAX_AGE_HOURS = float(os.environ.get("CLASP_AUTO_RESUME_MAX_AGE_HOURS", "24"))
 
 
-def _get_metadata(file_path: str) -> dict:
-    """파일 메타데이터 수집"""
+def _get_metadata(file_path: str, stat: os.stat_result | None = None) -> dict:
+    """
+    파일 메타데이터 수집
+    stat: 디렉토리 탐색 시 DirEntry.stat()으로 얻은 결과 — 있으면 재사용해 중복 stat 방지
+    """
     try:
-        stat = os.stat(file_path)
+        if stat is None:
+            stat = os.stat(file_path)
         return {
             "size": stat.st_size,
             "created_at": datetime.fromtimestamp(stat.st_birthtime if hasattr(stat, "st_birthtime") else stat.st_ctime),
@@ -63,207 +79,916 @@ def _get_metadata(file_path: str) -> dict:
         return {"size": None, "created_at": None, "modified_at": None}
 
 
-async def run_scan(
-    scan_id: str,
+def _path_range(folder_path: str) -> tuple[str, str]:
+    """
+    폴더 하위 경로 조회용 접두사 범위 (prefix <= path < upper).
+    LIKE 대신 범위 조건을 사용해 path UNIQUE 인덱스를 그대로 탐색.
+    """
+    prefix = folder_path.rstrip(os.sep) + os.sep
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return prefix, upper
+
+
+def get_checkpoint(db: Session, scan_id: str) -> ScanCheckpoint | None:
+    return db.query(ScanCheckpoint).filter(ScanCheckpoint.scan_id == scan_id).first()
+
+
+def create_checkpoint(db: Session, scan_id: str, folder_path: str) -> ScanCheckpoint:
+    """스캔 체크포인트 생성 — 이미 있으면 (재개) 대기 상태로 되돌림"""
+    checkpoint = get_checkpoint(db, scan_id)
+    if checkpoint is None:
+        checkpoint = ScanCheckpoint(scan_id=scan_id, folder_path=folder_path, status="queued")
+        db.add(checkpoint)
+    else:
+        checkpoint.status = "queued"
+        checkpoint.updated_at = datetime.utcnow()
+    db.commit()
+    return checkpoint
+
+
+def find_resumable_checkpoint(db: Session, folder_path: str) -> ScanCheckpoint | None:
+    """
+    /scan/start가 자동으로 이어서 실행할 체크포인트 — 백엔드 종료로 중단(interrupted)되고
+    AUTO_RESUME_MAX_AGE_HOURS 안에 갱신된 폴더의 가장 최근 스캔.
+    사용자가 취소한 스캔은 새로 시작하며, 명시적으로 이어서 하려면 POST /scan/{scan_id}/resume 사용
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=AUTO_RESUME_MAX_AGE_HOURS)
+    return (
+        db.query(ScanCheckpoint)
+        .filter(
+            ScanCheckpoint.folder_path == folder_path,
+            ScanCheckpoint.status == "interrupted",
+            ScanCheckpoint.updated_at >= cutoff,
+        )
+        .order_by(ScanCheckpoint.updated_at.desc())
+        .first()
+    )
+
+
+def save_checkpoint(db: Session, scan_id: str, **fields) -> None:
+    """체크포인트 필드 갱신 — commit은 호출 측에서 (분류 배치 commit과 같은 트랜잭션으로 묶기 위함)"""
+    fields["updated_at"] = datetime.utcnow()
+    db.query(ScanCheckpoint).filter(ScanCheckpoint.scan_id == scan_id).update(
+        fields, synchronize_session=False,
+    )
+
+
+def mark_interrupted_checkpoints(db: Session, scan_ids: list[str] | None = None) -> int:
+    """
+    이전 프로세스에서 대기·실행 중이던 스캔을 interrupted로 표시 (백엔드 시작 시 1회)
+    scan_ids: 앱 종료로 취소한 스캔 — 종료 과정에서 cancelled로 기록된 체크포인트도 interrupted로 바꿈
+    """
+    query = db.query(ScanCheckpoint)
+    if scan_ids is None:
+        query = query.filter(ScanCheckpoint.status.in_(("queued", "running")))
+    else:
+        query = query.filter(
+            ScanCheckpoint.scan_id.in_(scan_ids),
+            ScanCheckpoint.status.in_(("queued", "running", "cancelled")),
+        )
+    count = query.update({"status": "interrupted"}, synchronize_session=False)
+    db.commit()
+    return count
+
+
+def _path_conditions(folder_path: str, paths: list[str] | None) -> list[list]:
+    """
+    File.path 조회 조건 목록 — paths가 없으면 폴더 접두사 범위 하나,
+    있으면 SQLite 바인드 변수 한도를 넘지 않도록 IN 조건을 나눠서 반환
+    """
+    if paths is None:
+        prefix, upper = _path_range(folder_path)
+        return [[File.path >= prefix, File.path < upper]]
+    return [
+        [File.path.in_(paths[i:i + _PATH_CHUNK_SIZE])]
+        for i in range(0, len(paths), _PATH_CHUNK_SIZE)
+    ]
+
+
+def _load_existing_files(
+    db: Session,
     folder_path: str,
-) -> AsyncGenerator[dict, None]:
+    paths: list[str] | None = None,
+) -> dict[str, tuple[int, int | None, datetime | None, bool | None, str | None]]:
     """
-    스캔 전체 파이프라인 실행 — SSE 이벤트 yield
-    stage 1~7 순서로 진행 상황 전달
+    스캔 루트 하위의 기존 File 레코드를 1회 조회해
+    {path: (id, size, modified_at, needs_classification, quick_hash)} 맵 구성
+    paths: 주어지면 해당 경로만 조회 (감시 모드 증분 처리용)
     """
-    db: Session = SessionLocal()
+    existing = {}
+    for conditions in _path_conditions(folder_path, paths):
+        rows = (
+            db.query(File.id, File.path, File.size, File.modified_at, File.needs_classification, File.quick_hash)
+            .filter(*conditions)
+            .all()
+        )
+        existing.update({
+            row.path: (row.id, row.size, row.modified_at, row.needs_classification, row.quick_hash)
+            for row in rows
+        })
+    return existing
 
+
+def _load_classified_file_ids(db: Session, folder_path: str, paths: list[str] | None = None) -> set[int]:
+    """스캔 루트 하위(또는 paths)에서 이전 자동 분류 결과가 있는 file_id 집합 (1회 조회)"""
+    classified = set()
+    for conditions in _path_conditions(folder_path, paths):
+        rows = (
+            db.query(Classification.file_id)
+            .join(File, File.id == Classification.file_id)
+            .filter(*conditions, Classification.is_manual == False)
+            .distinct()
+            .all()
+        )
+        classified.update(row.file_id for row in rows)
+    return classified
+
+
+def _compute_similarity_groups_in_thread() -> None:
+    """
+    Stage 6 — 스레드 전용 세션으로 실행.
+    스캔이 취소되면 스레드는 계속 도는 동안 run_scan이 자기 세션을 rollback·close하므로 세션을 공유하지 않음
+    """
+    db = SessionLocal()
     try:
-        # Stage 1: 파일 목록 수집
-        yield {"stage": 1, "message": "파일 목록 수집 중", "total": 0, "completed": 0, "current_file": ""}
-
-        file_paths = await asyncio.to_thread(_collect_files, folder_path)
-        total = len(file_paths)
-
-        # 커스텀 카테고리 로드 후 Tier 2 임베딩에 반영
-        custom_cat_rows = db.query(CustomCategory).all()
-        custom_cat_list = [
-            {"name": row.name, "keywords": json.loads(row.keywords)}
-            for row in custom_cat_rows
-        ]
-        await asyncio.to_thread(tier2_embedding.load_custom_categories, custom_cat_list)
-        custom_category_names = [row.name for row in custom_cat_rows] or None
-
-        # Stage 2: 메타데이터 분석 + DB 저장 (배치 commit)
-        yield {"stage": 2, "message": "메타데이터 분석 중", "total": total, "completed": 0, "current_file": ""}
-
-        file_records: dict[str, File] = {}
-        pending_new: list[File] = []
-        # mtime/size가 변경된 파일만 재분류 대상으로 표시
-        dirty_files: set[str] = set()
-        for i, fpath in enumerate(file_paths):
-            filename = os.path.basename(fpath)
-            extension = os.path.splitext(filename)[1].lower()
-            meta = await asyncio.to_thread(_get_metadata, fpath)
-
-            existing = db.query(File).filter(File.path == fpath).first()
-            if existing:
-                # mtime 또는 size가 달라진 파일만 dirty 표시 → Stage 5에서 재분류
-                if existing.modified_at != meta["modified_at"] or existing.size != meta["size"]:
-                    dirty_files.add(fpath)
-                existing.filename = filename
-                existing.extension = extension
-                existing.size = meta["size"]
-                existing.modified_at = meta["modified_at"]
-                file_record = existing
-            else:
-                # 신규 파일은 항상 분류 필요
-                dirty_files.add(fpath)
-                file_record = File(
-                    path=fpath,
-                    filename=filename,
-                    extension=extension,
-                    created_at=meta["created_at"],
-                    modified_at=meta["modified_at"],
-                    size=meta["size"],
+        compute_similarity_groups(db)
+    finally:
+        db.close()
+
+
+def _load_scan_file_ids(db: Session, scan_id: str, paths: list[str] | None = None) -> set[int]:
+    """
+    재개하는 스캔에서 이미 분류까지 commit된 file_id 집합
+    paths: 주어지면 해당 경로의 파일만 조회 (감시 모드 증분 처리용)
+    """
+    if paths is None:
+        rows = (
+            db.query(Classification.file_id)
+            .filter(Classification.scan_id == scan_id, Classification.is_manual == False)
+            .all()
+        )
+        return {row.file_id for row in rows}
+    done = set()
+    for conditions in _path_conditions("", paths):
+        rows = (
+            db.query(Classification.file_id)
+            .join(File, File.id == Classification.file_id)
+            .filter(*conditions, Classification.scan_id == scan_id, Classification.is_manual == False)
+            .all()
+        )
+        done.update(row.file_id for row in rows)
+    return done
+
+
+def _upsert_files(db: Session, rows: list[dict]) -> dict[str, int]:
+    """
+    신규·변경 파일을 INSERT ... ON CONFLICT(path) DO UPDATE 한 문장으로 일괄 반영하고 {path: id} 반환.
+    created_at은 최초 생성 시에만 기록 (기존 레코드 갱신 시 유지).
+    needs_classification은 분류 결과가 commit될 때 해제됨.
+    """
+    stmt = sqlite_insert(File).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[File.path],
+        set_={
+            "filename": stmt.excluded.filename,
+            "extension": stmt.excluded.extension,
+            "size": stmt.excluded.size,
+            "modified_at": stmt.excluded.modified_at,
+            "needs_classification": stmt.excluded.needs_classification,
+            "quick_hash": stmt.excluded.quick_hash,
+            "full_hash": stmt.excluded.full_hash,
+            "filename_year": stmt.excluded.filename_year,
+        },
+    ).returning(File.id, File.path)
+    return {row.path: row.id for row in db.execute(stmt)}
+
+
+async def _metadata_stage(
+    db: Session,
+    folder_path: str,
+    entries: AsyncIterator[tuple[str, os.stat_result | None]],
+    outbox: asyncio.Queue,
+    progress: ScanProgress,
+    done_ids: set[int],
+    paths: list[str] | None = None,
+) -> None:
+    """
+    Stage 2 워커: 메타데이터 분석 + File 레코드 생성/갱신 (배치 upsert)
+    기존 레코드는 시작 시 1회 조회한 맵과 비교하고, 신규·변경 파일만 배치 단위로 upsert해
+    파일마다 SELECT/refresh하던 왕복을 배치당 1회로 줄임
+    done_ids: 재개한 스캔에서 이미 분류까지 끝난 file_id — 미변경이면 Stage 3~5를 건너뜀
+    paths: 처리할 경로가 미리 정해진 경우 (감시 모드) 기존 레코드를 해당 경로만 조회
+    """
+    existing_files = _load_existing_files(db, folder_path, paths)
+    classified_ids = _load_classified_file_ids(db, folder_path, paths)
+    batch: list[dict] = []
+    async for fpath, stat in entries:
+        filename = os.path.basename(fpath)
+        extension = os.path.splitext(filename)[1].lower()
+        existing = existing_files.pop(fpath, None)
+        meta = _get_metadata(fpath, stat) if stat is not None else await asyncio.to_thread(_get_metadata, fpath)
+
+        if existing:
+            # mtime 또는 size가 달라진 파일만 dirty 표시 → Stage 5에서 재분류
+            # 이전 스캔이 갱신만 하고 분류 전에 중단된 파일도 dirty로 취급
+            file_id, size, modified_at, pending, _ = existing
+            dirty = bool(pending) or modified_at != meta["modified_at"] or size != meta["size"]
+        else:
+            # 신규 파일은 항상 분류 필요
+            file_id = None
+            dirty = True
+
+        batch.append({
+            "path": fpath,
+            "filename": filename,
+            "extension": extension,
+            "size": meta["size"],
+            "modified_at": meta["modified_at"],
+            "created_at": meta["created_at"],
+            "file_id": file_id,
+            "dirty": dirty,
+            # 미변경 + 이전 분류 존재 → 추출·분류 모두 생략하고 이전 결과 복사
+            "reuse": not dirty and file_id in classified_ids,
+            "done": not dirty and file_id in done_ids,
+            # 지문 도입 전에 저장된 미변경 파일 — 이번에 지문만 채움
+            "needs_hash": not dirty and existing is not None and existing[4] is None,
+        })
+
+        if len(batch) >= BATCH_SIZE:
+            await _flush_metadata_batch(db, batch, outbox, progress)
+            batch = []
+
+    if batch:
+        await _flush_metadata_batch(db, batch, outbox, progress)
+    await outbox.put(_DONE)
+
+
+async def _flush_metadata_batch(
+    db: Session,
+    batch: list[dict],
+    outbox: asyncio.Queue,
+    progress: ScanProgress,
+) -> None:
+    """
+    배치 내 신규·변경 파일만 upsert 후 commit — 미변경 파일은 DB 쓰기 없이 기존 id로 다음 단계 전달
+    upsert 전에 내용 지문을 계산해 이동·이름 변경된 파일은 이전 레코드에 다시 연결
+    """
+    await _fingerprint_batch(db, batch)
+
+    upsert_rows = [
+        {
+            "path": item["path"],
+            "filename": item["filename"],
+            "extension": item["extension"],
+            "created_at": item["created_at"],
+            "modified_at": item["modified_at"],
+            "size": item["size"],
+            "needs_classification": True,
+            "quick_hash": item["quick_hash"],
+            "full_hash": item["full_hash"],
+            "filename_year": tier1_rule.extract_year(item["filename"]) or "",
+        }
+        for item in batch
+        if item["dirty"]
+    ]
+    if upsert_rows:
+        ids = _upsert_files(db, upsert_rows)
+        db.commit()
+        for item in batch:
+            if item["dirty"]:
+                item["file_id"] = ids[item["path"]]
+
+    for item in batch:
+        del item["created_at"]
+        del item["needs_hash"]
+        if item["done"]:
+            for stage in (2, 3, 4, 5):
+                progress.update(stage, item["filename"])
+            continue
+        await outbox.put(item)
+        progress.update(2, item["filename"])
+
+
+def _fingerprint_matches(db: Session, size: int, digest: str, exclude_id: int | None) -> list:
+    """같은 크기 + 빠른 지문을 가진 다른 File 레코드 (size, quick_hash 인덱스 조회)"""
+    query = db.query(File.id, File.path, File.full_hash, File.needs_classification).filter(
+        File.size == size, File.quick_hash == digest,
+    )
+    if exclude_id is not None:
+        query = query.filter(File.id != exclude_id)
+    return query.all()
+
+
+async def _item_full_hash(item: dict) -> str | None:
+    if item["full_hash"] is None:
+        item["full_hash"] = await asyncio.to_thread(full_hash, item["path"], item["size"])
+    return item["full_hash"]
+
+
+async def _find_moved_file(item: dict, matches: list):
+    """
+    새 경로의 파일과 같은 지문이면서 원래 경로에서 사라진 레코드 (없으면 None).
+    후보가 하나뿐이고 전체 해시가 없으면 빠른 지문만으로 판단하고,
+    지문 충돌이 있었던 후보(전체 해시 보유)는 전체 해시까지 같아야 같은 파일로 봄
+    """
+    vanished = [
+        match for match in matches
+        if not await asyncio.to_thread(os.path.exists, match.path)
+    ]
+    # 내용이 같은 후보가 여럿이면 (복사본을 함께 옮긴 경우) 파일명이 같은 레코드를 우선
+    vanished.sort(key=lambda match: os.path.basename(match.path) != item["filename"])
+    if len(vanished) == 1 and vanished[0].full_hash is None:
+        return vanished[0]
+    if not vanished:
+        return None
+    digest = await _item_full_hash(item)
+    return next((match for match in vanished if match.full_hash == digest), None)
+
+
+def _relink_moved_file(db: Session, item: dict, moved) -> None:
+    """이동된 파일을 이전 레코드에 연결 — 경로만 바꾸고 분류·표지·수동 수정·추출 캐시는 그대로 유지"""
+    move_extraction(db, moved.path, item["path"])
+    db.query(File).filter(File.id == moved.id).update(
+        {
+            File.path: item["path"],
+            File.filename: item["filename"],
+            File.extension: item["extension"],
+            File.size: item["size"],
+            File.modified_at: item["modified_at"],
+            File.quick_hash: item["quick_hash"],
+            File.full_hash: item["full_hash"] or moved.full_hash,
+            File.filename_year: tier1_rule.extract_year(item["filename"]) or "",
+        },
+        synchronize_session=False,
+    )
+    has_auto_classification = db.query(
+        db.query(Classification)
+        .filter(Classification.file_id == moved.id, Classification.is_manual == False)
+        .exists()
+    ).scalar()
+    # 분류 전에 중단됐던 레코드면 그대로 재분류 대상
+    item["file_id"] = moved.id
+    item["dirty"] = bool(moved.needs_classification)
+    item["reuse"] = not item["dirty"] and has_auto_classification
+    logger.info("이동된 파일 연결: %s → %s", moved.path, item["path"])
+
+
+async def _fingerprint_batch(db: Session, batch: list[dict]) -> None:
+    """
+    배치 내 신규·변경 파일(과 지문이 없는 기존 파일)의 내용 지문을 병렬로 계산.
+    - 새 경로인데 같은 지문의 레코드가 원래 경로에서 사라졌으면 그 레코드로 다시 연결 (추출·분류 생략)
+    - 같은 지문의 다른 파일이 있으면 (충돌) 양쪽 전체 해시를 계산해 저장 — 이후 이동 감지·중복 탐지에 사용
+    """
+    targets = [item for item in batch if item["dirty"] or item["needs_hash"]]
+    digests = await asyncio.gather(*(
+        asyncio.to_thread(quick_hash, item["path"], item["size"]) for item in targets
+    ))
+    # 배치 안에서 지문이 겹치는 파일 (같은 다운로드의 사본 등) — DB 조회로는 보이지 않으므로 따로 집계
+    batch_counts = Counter((item["size"], digest) for item, digest in zip(targets, digests) if digest)
+    backfill: list[dict] = []
+    for item, digest in zip(targets, digests):
+        item["quick_hash"] = digest
+        item["full_hash"] = digest if digest and is_fully_hashed(item["size"]) else None
+        if digest is None:
+            continue
+
+        matches = _fingerprint_matches(db, item["size"], digest, item["file_id"])
+        if item["file_id"] is None and matches:
+            moved = await _find_moved_file(item, matches)
+            if moved is not None:
+                _relink_moved_file(db, item, moved)
+                continue
+
+        for match in matches:
+            if match.full_hash is None and await asyncio.to_thread(os.path.exists, match.path):
+                db.query(File).filter(File.id == match.id).update(
+                    {File.full_hash: await asyncio.to_thread(full_hash, match.path, item["size"])},
+                    synchronize_session=False,
                 )
-                db.add(file_record)
-                pending_new.append(file_record)
+        if matches or batch_counts[(item["size"], digest)] > 1:
+            await _item_full_hash(item)
 
-            if (i + 1) % BATCH_SIZE == 0 or i == total - 1:
-                db.commit()
-                for rec in pending_new:
-                    db.refresh(rec)
-                pending_new.clear()
+        if item["needs_hash"]:
+            backfill.append({"id": item["file_id"], "quick_hash": digest, "full_hash": item["full_hash"]})
+
+    if backfill:
+        db.execute(update(File), backfill)
+
+
+async def _fan_out(inbox: asyncio.Queue, handler, limit: int) -> None:
+    """
+    inbox 항목마다 handler를 최대 limit개까지 동시에 실행 — 결과는 끝나는 순서대로 다음 단계로 흘러감.
+    handler 예외는 즉시 다시 발생시켜 파이프라인 전체를 중단.
+    """
+    slots = asyncio.Semaphore(limit)
+    running: set[asyncio.Task] = set()
+    failures: list[BaseException] = []
+
+    def on_done(task: asyncio.Task) -> None:
+        running.discard(task)
+        slots.release()
+        if not task.cancelled() and task.exception() is not None:
+            failures.append(task.exception())
+
+    try:
+        while (item := await inbox.get()) is not _DONE:
+            await slots.acquire()
+            if failures:
+                raise failures[0]
+            task = asyncio.create_task(handler(item))
+            running.add(task)
+            task.add_done_callback(on_done)
+        await asyncio.gather(*running)
+    finally:
+        for task in list(running):
+            task.cancel()
 
-            file_records[fpath] = file_record
 
-            yield {"stage": 2, "message": "메타데이터 분석 중", "total": total, "completed": i + 1, "current_file": filename}
-            await asyncio.sleep(0)
+async def _cover_stage(
+    db: Session,
+    pool: ExtractionPool,
+    inbox: asyncio.Queue,
+    outbox: asyncio.Queue,
+    progress: ScanProgress,
+) -> None:
+    """
+    Stage 3 워커: 문서 읽기 + 표지 탐지·저장
+    추출 캐시 적중 시 문서를 열지 않고 캐시된 본문·표지를 그대로 사용,
+    캐시 미스는 추출 프로세스 풀에서 read_document로 한 번만 열어 표지·본문을 함께 얻음.
+    표지 임베딩은 Stage 5에서 파일 임베딩 번들과 함께 임베딩 저장소에서 가져오거나 계산.
+    파일당 시간·메모리 예산을 넘긴 파일은 본문 없이 진행 (이전에 예산을 넘긴 파일은 캐시로 재시도 생략)
+    표지는 BATCH_SIZE개마다 한 번 commit
+    """
+    saved = 0
 
-        # 잔여 미 refresh 레코드 보정
-        if pending_new:
+    def store_cover(file_id: int, cover_text: str) -> None:
+        nonlocal saved
+        save_cover(db, file_id, cover_text)
+        saved += 1
+        if saved % BATCH_SIZE == 0:
             db.commit()
-            for rec in pending_new:
-                db.refresh(rec)
-            pending_new.clear()
-
-        # Stage 3: 표지 탐지
-        yield {"stage": 3, "message": "표지 탐지 중", "total": total, "completed": 0, "current_file": ""}
-
-        cover_texts: dict[str, str | None] = {}
-        cover_count = 0
-        for i, fpath in enumerate(file_paths):
-            filename = os.path.basename(fpath)
-            cover_text = await asyncio.to_thread(extract_cover_text, fpath)
-            cover_texts[fpath] = cover_text
-            if cover_text:
-                file_record = file_records[fpath]
-                save_cover(db, file_record.id, cover_text)
-                cover_count += 1
-
-            yield {"stage": 3, "message": "표지 탐지 중", "total": total, "completed": i + 1, "current_file": filename}
-            await asyncio.sleep(0)
-
-        # Stage 4: 본문 추출 (배치 commit)
-        yield {"stage": 4, "message": "본문 추출 중", "total": total, "completed": 0, "current_file": ""}
-
-        extracted_texts: dict[str, str | None] = {}
-        for i, fpath in enumerate(file_paths):
-            filename = os.path.basename(fpath)
-            extension = os.path.splitext(filename)[1].lower()
-
-            text = None
-            if extension in TEXT_EXTRACTABLE:
-                text = await asyncio.to_thread(extract_text, fpath)
-                if text:
-                    file_record = file_records[fpath]
-                    file_record.extracted_text_summary = text[:2000]
-
-            extracted_texts[fpath] = text
-
-            if (i + 1) % BATCH_SIZE == 0 or i == total - 1:
-                db.commit()
 
-            yield {"stage": 4, "message": "본문 추출 중", "total": total, "completed": i + 1, "current_file": filename}
-            await asyncio.sleep(0)
-
-        # Stage 5: 분류 엔진 처리
-        yield {"stage": 5, "message": "분류 엔진 처리 중", "total": total, "completed": 0, "current_file": ""}
-
-        for i, fpath in enumerate(file_paths):
-            filename = os.path.basename(fpath)
-            extension = os.path.splitext(filename)[1].lower()
-            file_record = file_records[fpath]
-            text = extracted_texts.get(fpath)
-
-            # 파일 내용 미변경 + 이전 분류 결과 존재 → 재분류 없이 결과 복사
-            if fpath not in dirty_files:
-                prev_cls = (
-                    db.query(Classification)
-                    .filter(
-                        Classification.file_id == file_record.id,
-                        Classification.is_manual == False,
-                    )
-                    .order_by(Classification.classified_at.desc())
-                    .first()
+    async def process(item: dict) -> None:
+        # 추출할 수 없는 확장자는 캐시도 남기지 않으므로 조회 없이 통과
+        if not item["reuse"] and item["extension"] in TEXT_EXTRACTABLE:
+            cached = get_cached_extraction(db, item["path"], item["size"], item["modified_at"])
+            if cached:
+                item["cached"] = True
+                item["cover_text"] = cached.cover_text
+                item["text"] = cached.body_text
+                if cached.cover_text:
+                    store_cover(item["file_id"], cached.cover_text)
+            else:
+                document = await extract_document(pool, read_document, item["path"], item["size"])
+                item["cover_text"] = document["cover_text"]
+                item["text"] = document["body_text"]
+                item["extract_error"] = document["error"]
+                if document["cover_text"]:
+                    store_cover(item["file_id"], document["cover_text"])
+        await outbox.put(item)
+        progress.update(3, item["filename"])
+
+    await _fan_out(inbox, process, MAX_IN_FLIGHT)
+    db.commit()
+    await outbox.put(_DONE)
+
+
+async def _text_stage(
+    db: Session,
+    inbox: asyncio.Queue,
+    outbox: asyncio.Queue,
+    progress: ScanProgress,
+) -> None:
+    """
+    Stage 4 워커: 본문 저장 + 추출 캐시 저장 (배치 commit)
+    본문은 Stage 3에서 표지와 함께 읽었으므로 문서를 다시 열지 않음
+    """
+    processed = 0
+    while (item := await inbox.get()) is not _DONE:
+        if not item["reuse"] and item["extension"] in TEXT_EXTRACTABLE:
+            text = item.get("text")
+            # 크기 제한은 설정값에 따라 달라지므로 캐시에 남기지 않고 매 스캔 판정
+            if not item.get("cached") and item.get("extract_error") != "too_large":
+                save_extraction(
+                    db,
+                    item["path"],
+                    item["size"],
+                    item["modified_at"],
+                    body_text=text,
+                    cover_text=item.get("cover_text"),
+                    error=item.get("extract_error"),
+                )
+            if text:
+                db.query(File).filter(File.id == item["file_id"]).update(
+                    {File.extracted_text_summary: text[:2000]},
+                    synchronize_session=False,
                 )
-                if prev_cls:
-                    db.add(Classification(
-                        file_id=file_record.id,
-                        scan_id=scan_id,
-                        category=prev_cls.category,
-                        tag=prev_cls.tag,
-                        tier_used=prev_cls.tier_used,
-                        confidence_score=prev_cls.confidence_score,
-                        is_manual=False,
-                    ))
-                    if (i + 1) % BATCH_SIZE == 0 or i == total - 1:
-                        db.commit()
-                    yield {"stage": 5, "message": "분류 엔진 처리 중", "total": total, "completed": i + 1, "current_file": filename}
-                    await asyncio.sleep(0)
-                    continue
 
-            manual_cls = (
-                db.query(Classification)
-                .filter(Classification.file_id == file_record.id, Classification.is_manual == True)
-                .order_by(Classification.classified_at.desc())
-                .first()
+            processed += 1
+            if processed % BATCH_SIZE == 0:
+                db.commit()
+
+        await outbox.put(item)
+        progress.update(4, item["filename"])
+    db.commit()
+    await outbox.put(_DONE)
+
+
+async def _classify_stage(
+    db: Session,
+    scan_id: str,
+    inbox: asyncio.Queue,
+    progress: ScanProgress,
+    custom_category_names: list[str] | None,
+    checkpoint: bool = True,
+) -> None:
+    """
+    Stage 5 워커: 분류 엔진 처리 — 분류가 끝난 항목은 즉시 버려 텍스트를 메모리에 남기지 않음
+    Tier 1은 컴파일된 규칙 매처를 사용하므로 분류 중에는 DB를 읽지 않음
+    배치 commit마다 체크포인트(분류 완료 수, 마지막 파일)를 같은 트랜잭션으로 기록
+    checkpoint: False면 체크포인트를 갱신하지 않음 (감시 모드의 증분 처리)
+    """
+    classified: list[int] = []
+    last_file: str | None = None
+    # 이번 실행에서 분류한 결과 (전체 해시 → 분류) — 내용이 같은 사본은 다시 분류하지 않고 공유
+    shared: dict[str, dict] = {}
+
+    def commit() -> None:
+        if classified:
+            db.query(File).filter(File.id.in_(classified)).update(
+                {File.needs_classification: None}, synchronize_session=False,
             )
-            manual_category = manual_cls.category if manual_cls else None
-
-            result = await pipeline.classify(
-                file_path=fpath,
-                filename=filename,
-                extension=extension,
-                extracted_text=text,
-                cover_text=cover_texts.get(fpath),
-                db=db,
-                manual_category=manual_category,
-                custom_category_names=custom_category_names,
+            classified.clear()
+        if checkpoint:
+            save_checkpoint(
+                db, scan_id,
+                stage=progress.stage, total=progress.total,
+                files_done=progress.completed[5], last_file=last_file,
             )
+        db.commit()
+
+    processed = 0
+    committed = 0
+    finished = False
+    while not finished:
+        batch = await _take_batch(inbox)
+        if batch[-1] is _DONE:
+            batch.pop()
+            finished = True
+        if not batch:
+            continue
+
+        await _classify_batch(db, scan_id, batch, custom_category_names, shared)
+        for item in batch:
+            if item["dirty"]:
+                classified.append(item["file_id"])
+            last_file = item["path"]
+            progress.update(5, item["filename"])
+        processed += len(batch)
+        if processed - committed >= BATCH_SIZE:
+            commit()
+            committed = processed
+    commit()
+
+
+async def _take_batch(inbox: asyncio.Queue) -> list:
+    """
+    대기 중인 항목을 BATCH_SIZE까지 모아 반환 (_DONE은 항상 마지막).
+    배치가 덜 찼으면 CLASSIFY_GATHER_SECONDS만큼 한 번 더 기다렸다가 도착한 만큼으로 끝냄
+    """
+    batch = [await inbox.get()]
+    if batch[-1] is not _DONE and inbox.qsize() < BATCH_SIZE - 1:
+        await asyncio.sleep(CLASSIFY_GATHER_SECONDS)
+    while len(batch) < BATCH_SIZE and batch[-1] is not _DONE and not inbox.empty():
+        batch.append(inbox.get_nowait())
+    return batch
+
+
+def _latest_classifications(db: Session, file_ids: list[int], is_manual: bool) -> dict[int, Classification]:
+    """파일별 가장 최근 분류 (수동 또는 자동) — 배치 전체를 한 번에 조회"""
+    if not file_ids:
+        return {}
+    latest: dict[int, Classification] = {}
+    rows = (
+        db.query(Classification)
+        .filter(Classification.file_id.in_(file_ids), Classification.is_manual == is_manual)
+        .order_by(Classification.classified_at.desc())
+    )
+    for cls in rows:
+        latest.setdefault(cls.file_id, cls)
+    return latest
+
+
+async def _ensure_bundles(db: Session, items: list[dict]) -> None:
+    """
+    텍스트(본문 또는 표지)가 있는 파일의 임베딩 번들을 item["bundle"]에 채움.
+    임베딩 저장소에 있는 텍스트는 읽기만 하고, 처음 보는 텍스트만 배치로 한 번 인코딩해 저장
+    (표지가 있으면 head가 곧 표지 임베딩 — Stage 6 그룹화가 같은 키로 조회)
+    """
+    targets = [
+        item for item in items
+        if item.get("bundle") is None and (item.get("text") or item.get("cover_text"))
+    ]
+    bundles = await embedding_store.encode_bundles(
+        db,
+        [item.get("text") or item.get("cover_text") for item in targets],
+        [item.get("cover_text") or item.get("text") for item in targets],
+    )
+    for item, bundle in zip(targets, bundles):
+        item["bundle"] = bundle
+
+
+async def _classify_batch(
+    db: Session,
+    scan_id: str,
+    batch: list[dict],
+    custom_category_names: list[str] | None,
+    shared: dict[str, dict],
+) -> None:
+    """
+    항목 묶음 분류 — 이전 결과·수동 분류 조회와 Tier 1은 배치 단위로 한 번씩만 실행.
+    텍스트가 없는 파일은 Tier 1 결과로 바로 끝나고, 텍스트가 있는 파일은 Tier 2 배치 인코딩 후 파일별로 결과 조합·Tier 3
+    """
+    # 파일 내용 미변경 + 이전 분류 결과 존재 → 재분류 없이 결과 복사
+    previous = _latest_classifications(db, [item["file_id"] for item in batch if item["reuse"]], False)
+    reused = {
+        item["file_id"]: {
+            "category": prev_cls.category,
+            "tag": prev_cls.tag,
+            "tier_used": prev_cls.tier_used,
+            "confidence_score": prev_cls.confidence_score,
+        }
+        for item in batch
+        if item["reuse"] and (prev_cls := previous.get(item["file_id"])) is not None
+    }
+    pending = [item for item in batch if item["file_id"] not in reused]
+
+    manual = _latest_classifications(db, [item["file_id"] for item in pending], True)
+    manual_categories = [
+        manual[item["file_id"]].category if item["file_id"] in manual else None
+        for item in pending
+    ]
+    t1_results = await pipeline.classify_tier1_batch(
+        [item["filename"] for item in pending],
+        [item["extension"] for item in pending],
+        [item.get("text") for item in pending],
+        manual_categories,
+    )
+
+    # 내용이 같은 파일은 묶음마다 한 파일만 분류하고 나머지는 그 결과를 복사
+    results: dict[int, dict] = {}
+    todo: list[tuple[dict, str | None, dict]] = []
+    copies: dict[str, list[int]] = {}
+    for item, manual_category, t1 in zip(pending, manual_categories, t1_results):
+        # 지문은 신규·변경 파일만 계산됨 — 미변경인데 분류가 없는 파일은 묶지 않고 각자 분류
+        digest = item.get("full_hash") if manual_category is None else None
+        if digest:
+            result = shared.get(digest) or _duplicate_classification(db, scan_id, item["file_id"], digest)
+            if result is not None:
+                results[item["file_id"]] = result
+                continue
+            if digest in copies:
+                copies[digest].append(item["file_id"])
+                continue
+            copies[digest] = []
+        todo.append((item, manual_category, t1))
+
+    # 파일 임베딩 번들을 한 번만 계산 — Tier 2 분류·태그 추론·표지 그룹화가 모두 재사용
+    await _ensure_bundles(db, pending)
+    inputs = [
+        pipeline.tier2_inputs(item["extension"], item.get("text"), item.get("cover_text"), t1)
+        for item, _, t1 in todo
+    ]
+    needed = [i for i, t2_input in enumerate(inputs) if t2_input is not None]
+    t2_results = dict(zip(needed, await pipeline.classify_tier2_batch(
+        [inputs[i][0] for i in needed],
+        [inputs[i][1] for i in needed],
+        [todo[i][0].get("bundle") for i in needed],
+    )))
+
+    for i, (item, manual_category, t1) in enumerate(todo):
+        result = await pipeline.classify(
+            file_path=item["path"],
+            filename=item["filename"],
+            extension=item["extension"],
+            extracted_text=item.get("text"),
+            cover_text=item.get("cover_text"),
+            manual_category=manual_category,
+            custom_category_names=custom_category_names,
+            t1=t1,
+            t2=t2_results.get(i),
+        )
+        results[item["file_id"]] = result
+        digest = item.get("full_hash") if manual_category is None else None
+        if digest:
+            shared[digest] = result
+            for file_id in copies[digest]:
+                results[file_id] = result
+
+    # 재개한 스캔에서 이미 기록된 이번 스캔 결과는 교체
+    results.update(reused)
+    db.query(Classification).filter(
+        Classification.file_id.in_(list(results)),
+        Classification.scan_id == scan_id,
+        Classification.is_manual == False,
+    ).delete(synchronize_session=False)
+    db.execute(insert(Classification), [
+        {
+            "file_id": file_id,
+            "scan_id": scan_id,
+            "category": result["category"],
+            "tag": result["tag"],
+            "tier_used": result["tier_used"],
+            "confidence_score": result["confidence_score"],
+            "is_manual": False,
+        }
+        for file_id, result in results.items()
+    ])
+
 
-            db.query(Classification).filter(
-                Classification.file_id == file_record.id,
-                Classification.scan_id == scan_id,
-                Classification.is_manual == False,
-            ).delete()
-
-            cls = Classification(
-                file_id=file_record.id,
-                scan_id=scan_id,
-                category=result["category"],
-                tag=result["tag"],
-                tier_used=result["tier_used"],
-                confidence_score=result["confidence_score"],
-                is_manual=False,
+def _duplicate_classification(db: Session, scan_id: str, file_id: int, digest: str) -> dict | None:
+    """이번 스캔에서 이미 분류된, 내용이 같은 다른 파일의 자동 분류 결과 (재개한 스캔의 이전 실행분 포함)"""
+    cls = (
+        db.query(Classification)
+        .join(File, File.id == Classification.file_id)
+        .filter(
+            File.full_hash == digest,
+            File.id != file_id,
+            Classification.scan_id == scan_id,
+            Classification.is_manual == False,
+        )
+        .order_by(Classification.classified_at.desc())
+        .first()
+    )
+    if cls is None:
+        return None
+    return {
+        "category": cls.category,
+        "tag": cls.tag,
+        "tier_used": cls.tier_used,
+        "confidence_score": cls.confidence_score,
+    }
+
+
+def _finish_checkpoint(db: Session, scan_id: str, status: str) -> None:
+    """중단된 스캔의 체크포인트 상태 기록 — DB 오류로 중단된 경우에도 원래 예외를 가리지 않음"""
+    try:
+        db.rollback()
+        save_checkpoint(db, scan_id, status=status)
+        db.commit()
+    except Exception:
+        logger.warning("스캔 체크포인트 저장 실패: %s", scan_id, exc_info=True)
+
+
+async def _supervise(workers: list[asyncio.Task]) -> None:
+    """워커 하나라도 실패하면 나머지를 취소"""
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+
+
+async def load_custom_categories(db: Session) -> list[str] | None:
+    """커스텀 카테고리 로드 후 Tier 2 임베딩에 반영 — 분류에 넘길 카테고리 이름 목록 반환"""
+    custom_cat_rows = db.query(CustomCategory).all()
+    custom_cat_list = [
+        {"name": row.name, "keywords": json.loads(row.keywords)}
+        for row in custom_cat_rows
+    ]
+    await asyncio.to_thread(tier2_embedding.load_custom_categories, custom_cat_list)
+    return [row.name for row in custom_cat_rows] or None
+
+
+def _start_pipeline(
+    db: Session,
+    scan_id: str,
+    folder_path: str,
+    entries: AsyncIterator[tuple[str, os.stat_result | None]],
+    progress: ScanProgress,
+    custom_category_names: list[str] | None,
+    done_ids: set[int],
+    paths: list[str] | None = None,
+) -> list[asyncio.Task]:
+    """Stage 2~5 워커를 크기 제한 큐로 연결해 시작 — entries가 끝나면 차례로 종료"""
+    pool = get_extraction_pool()
+    to_cover: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    to_text: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    to_classify: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    return [
+        asyncio.create_task(_metadata_stage(db, folder_path, entries, to_cover, progress, done_ids, paths)),
+        asyncio.create_task(_cover_stage(db, pool, to_cover, to_text, progress)),
+        asyncio.create_task(_text_stage(db, to_text, to_classify, progress)),
+        asyncio.create_task(_classify_stage(
+            db, scan_id, to_classify, progress, custom_category_names, checkpoint=paths is None,
+        )),
+    ]
+
+
+async def classify_paths(scan_id: str, folder_path: str, paths: list[str]) -> int:
+    """
+    주어진 파일들만 Stage 2~5로 처리 (감시 모드 증분 처리) — 분류 결과는 scan_id로 기록.
+    전체 스캔과 같은 워커를 재사용하므로 미변경 파일은 이전 분류 복사, 추출 캐시도 그대로 적용.
+    처리 중 사라진 파일은 건너뛰고, 처리한 파일 수를 반환.
+    """
+    db: Session = SessionLocal()
+    workers: list[asyncio.Task] = []
+    try:
+        custom_category_names = await load_custom_categories(db)
+        progress = ScanProgress()
+
+        async def entries() -> AsyncIterator[tuple[str, os.stat_result | None]]:
+            for fpath in paths:
+                try:
+                    stat = await asyncio.to_thread(os.stat, fpath)
+                except OSError:
+                    continue
+                progress.update(1, os.path.basename(fpath))
+                yield fpath, stat
+            progress.finish_walk()
+
+        # 이미 이 scan_id로 분류된 미변경 파일은 건너뜀 (변경 없는 modify 이벤트 등)
+        done_ids = _load_scan_file_ids(db, scan_id, paths)
+        workers = _start_pipeline(
+            db, scan_id, folder_path, entries(), progress, custom_category_names, done_ids, paths,
+        )
+        await _supervise(workers)
+        return progress.total
+    finally:
+        for task in workers:
+            task.cancel()
+        db.close()
+
+
+async def run_scan(
+    scan_id: str,
+    folder_path: str,
+) -> AsyncGenerator[dict, None]:
+    """
+    스캔 전체 파이프라인 실행 — SSE 이벤트 yield
+    stage 1~7 순서로 진행 상황 전달
+
+    Stage 1~5는 파일 단위 스트리밍 파이프라인으로 동시에 동작:
+    병렬 디렉토리 탐색(walk_files)이 발견한 파일을 곧바로
+    메타데이터 → 표지 → 본문 → 분류 워커가 크기 제한 큐(PIPELINE_QUEUE_SIZE)로 이어받아
+    파일 하나가 끝나는 즉시 텍스트·레코드를 해제하므로 폴더 크기와 무관하게 메모리 사용량이 일정함.
+    SQLite 쓰기 잠금 경합을 피하기 위해 모든 워커는 이벤트 루프 위에서 하나의 쓰기 세션(db)을 공유.
+    진행 상황의 stage는 아직 끝나지 않은 가장 앞 단계로 보고해 단조 증가를 유지하고,
+    단계별 완료 수는 stages 필드로 함께 전달. 탐색 중에는 total이 발견된 파일 수만큼 계속 증가.
+    워커는 ScanProgress 카운터만 갱신하고, SSE 이벤트는 초당 횟수가 제한된 스냅샷으로 전송
+    (단계 전환·최종 상태는 항상 전송, throughput·eta_seconds 포함).
+
+    진행 상황은 ScanCheckpoint에 분류 배치 commit과 함께 기록되어, 취소·비정상 종료된 스캔을
+    같은 scan_id로 다시 실행하면 이미 분류된 미변경 파일은 Stage 3~5를 건너뛰고,
+    파이프라인이 끝난 뒤 중단된 경우 Stage 6부터 이어서 실행.
+    """
+    db: Session = SessionLocal()
+    workers: list[asyncio.Task] = []
+    supervisor: asyncio.Task | None = None
+
+    try:
+        checkpoint = get_checkpoint(db, scan_id) or create_checkpoint(db, scan_id, folder_path)
+        resuming = checkpoint.started_at is not None
+        pipeline_done = resuming and checkpoint.stage >= 6
+        total = checkpoint.total
+        save_checkpoint(db, scan_id, status="running", started_at=checkpoint.started_at or datetime.utcnow())
+        db.commit()
+
+        custom_category_names = await load_custom_categories(db)
+
+        if not pipeline_done:
+            # Stage 1~5: 스트리밍 파이프라인 — 디렉토리 탐색이 끝나기 전에 발견된 파일부터 처리 시작
+            yield progress_event(1, 0, 0, "")
+
+            progress = ScanProgress()
+            done_ids = _load_scan_file_ids(db, scan_id) if resuming else set()
+
+            async def discovered() -> AsyncIterator[tuple[str, os.stat_result | None]]:
+                async for fpath, stat in walk_files(folder_path, EXCLUDED_DIRS, EXCLUDED_EXTENSIONS):
+                    progress.update(1, os.path.basename(fpath))
+                    yield fpath, stat
+                progress.finish_walk()
+
+            workers = _start_pipeline(
+                db, scan_id, folder_path, discovered(), progress, custom_category_names, done_ids,
             )
-            db.add(cls)
+            supervisor = asyncio.create_task(_supervise(workers))
 
-            if (i + 1) % BATCH_SIZE == 0 or i == total - 1:
-                db.commit()
+            async for event in progress.stream(supervisor):
+                yield event
+            # 워커 예외를 여기서 다시 발생시켜 stage -1로 보고
+            await supervisor
+            total = progress.total
 
-            yield {"stage": 5, "message": "분류 엔진 처리 중", "total": total, "completed": i + 1, "current_file": filename}
-            await asyncio.sleep(0)
+            pruned_cache = prune_extraction_cache(db)
+            if pruned_cache:
+                logger.info("File 레코드가 없는 추출 캐시 %d개 삭제", pruned_cache)
+            save_checkpoint(db, scan_id, stage=6, total=total, files_done=total)
+            db.commit()
 
         # Stage 6: 유사도 계산
-        yield {"stage": 6, "message": "유사도 계산 중", "total": total, "completed": total, "current_file": ""}
-        await asyncio.to_thread(compute_similarity_groups, db)
+        yield progress_event(6, total, total, "")
+        await asyncio.to_thread(_compute_similarity_groups_in_thread)
 
         # 유사도 그룹 auto_tag를 classification tag에 반영
         # 이미 태그가 있는 파일은 덮어쓰지 않고, 태그 없는 파일에만 auto_tag 부여
@@ -283,13 +1008,24 @@ async def run_scan(
             )
             if cls and not cls.tag:
                 cls.tag = group_entry.auto_tag
+        save_checkpoint(db, scan_id, status="completed", stage=7)
         db.commit()
 
         # Stage 7: 완료
-        yield {"stage": 7, "message": "완료", "total": total, "completed": total, "current_file": ""}
+        yield progress_event(7, total, total, "")
 
+    except (asyncio.CancelledError, GeneratorExit):
+        # 취소 — commit되지 않은 배치만 버리고 체크포인트는 재개 가능한 상태로 남김
+        _finish_checkpoint(db, scan_id, "cancelled")
+        raise
     except Exception as e:
         logger.error("스캔 실패: %s", e, exc_info=True)
+        _finish_checkpoint(db, scan_id, "failed")
         yield {"stage": -1, "message": f"스캔 중 오류 발생: {e}", "total": 0, "completed": 0, "current_file": ""}
     finally:
+        # 클라이언트 연결 종료 등으로 중단되면 남은 워커 정리
+        if supervisor:
+            supervisor.cancel()
+        for task in workers:
+            task.cancel()
         db.close()
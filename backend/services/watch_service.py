@@ -0,0 +1,335 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.schema import File, ExtractionCache
+from services import scan_service
+from services.scan_jobs import get_scan_runner
+from utils.dir_walker import walk_files
+
+logger = logging.getLogger(__name__)
+
+# 마지막 이벤트 이후 이 시간(초) 동안 조용하면 모인 변경을 한 번에 처리
+WATCH_DEBOUNCE_SECONDS = float(os.environ.get("CLASP_WATCH_DEBOUNCE_SECONDS", "1.0"))
+
+# 이벤트가 계속 들어와도 (압축 해제 등) 첫 이벤트 후 이 시간(초)이 지나면 처리 시작
+WATCH_MAX_DELAY_SECONDS = float(os.environ.get("CLASP_WATCH_MAX_DELAY_SECONDS", "5.0"))
+
+
+class WatchUnavailable(Exception):
+    """watchdog 패키지가 설치되지 않아 감시 모드를 사용할 수 없음"""
+
+
+class FolderWatcher:
+    """
+    스캔한 루트 폴더 하나의 실시간 감시기.
+    watchdog 옵저버 스레드가 받은 생성·수정·이동·삭제 이벤트를 모아 두었다가
+    디바운스 후 한 번에 처리:
+    - 이동: 분류를 다시 하지 않고 File·추출 캐시의 경로만 갱신 (디렉토리 이동은 하위 경로 일괄 갱신)
+    - 삭제: File 레코드와 분류·표지 정보 삭제
+    - 생성·수정: scan_service.classify_paths로 Stage 2~5만 처리 (분류 결과는 원래 scan_id로 기록)
+    같은 경로의 이벤트는 하나로 합쳐지므로 이벤트가 몰려도 처리 횟수는 디바운스 주기당 한 번.
+    """
+
+    def __init__(self, scan_id: str, folder_path: str):
+        self.scan_id = scan_id
+        self.folder_path = folder_path
+        self.started_at = time.time()
+        self.last_flush_at: Optional[float] = None
+        self.files_classified = 0
+        self.files_moved = 0
+        self.files_deleted = 0
+        self._observer = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 옵저버 스레드 → 이벤트 루프로 넘기는 원시 이벤트 (kind, src, dest, is_dir)
+        self._raw: list[tuple[str, str, Optional[str], bool]] = []
+        self._raw_lock = threading.Lock()
+        self._wake = asyncio.Event()
+        # 디바운스 동안 합쳐진 변경
+        self._changed: set[str] = set()
+        self._deleted: set[str] = set()
+        self._moves: list[tuple[str, str, bool]] = []
+        self._new_dirs: set[str] = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._changed) + len(self._deleted) + len(self._moves) + len(self._new_dirs) + len(self._raw)
+
+    def start(self) -> None:
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError as e:
+            raise WatchUnavailable(str(e)) from e
+
+        watcher = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                kind = event.event_type
+                if kind not in ("created", "modified", "moved", "deleted"):
+                    return
+                if kind == "modified" and event.is_directory:
+                    return
+                watcher._push(kind, _as_str(event.src_path), _as_str(getattr(event, "dest_path", None)), event.is_directory)
+
+        self._loop = asyncio.get_running_loop()
+        self._observer = Observer()
+        self._observer.schedule(_Handler(), self.folder_path, recursive=True)
+        self._observer.daemon = True
+        self._observer.start()
+        self._task = asyncio.create_task(self._run(), name=f"clasp-watch-{self.scan_id}")
+
+    async def stop(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            await asyncio.to_thread(self._observer.join, 5)
+            self._observer = None
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _push(self, kind: str, src: str, dest: Optional[str], is_dir: bool) -> None:
+        """옵저버 스레드에서 호출 — 목록에 쌓고, 비어 있던 경우에만 이벤트 루프를 깨움"""
+        with self._raw_lock:
+            first = not self._raw
+            self._raw.append((kind, src, dest, is_dir))
+        if first:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _is_tracked(self, path: Optional[str]) -> bool:
+        """전체 스캔과 같은 제외 규칙 (숨김 경로, 제외 디렉토리·확장자, 루트 밖 경로)"""
+        if not path:
+            return False
+        try:
+            rel = os.path.relpath(path, self.folder_path)
+        except ValueError:
+            # Windows에서 다른 드라이브 경로
+            return False
+        if rel == os.curdir or rel.startswith(os.pardir):
+            return False
+        parts = rel.split(os.sep)
+        if any(part.startswith(".") or part in scan_service.EXCLUDED_DIRS for part in parts):
+            return False
+        return os.path.splitext(path)[1].lower() not in scan_service.EXCLUDED_EXTENSIONS
+
+    def _drain(self) -> None:
+        """원시 이벤트를 경로 단위 변경 집합으로 합침"""
+        with self._raw_lock:
+            raw, self._raw = self._raw, []
+        for kind, src, dest, is_dir in raw:
+            if kind == "moved":
+                self._on_moved(src, dest, is_dir)
+            elif not self._is_tracked(src):
+                continue
+            elif kind == "deleted":
+                self._on_deleted(src, is_dir)
+            elif is_dir:
+                self._new_dirs.add(src)
+            else:
+                self._deleted.discard(src)
+                self._changed.add(src)
+
+    def _on_deleted(self, path: str, is_dir: bool) -> None:
+        self._changed.discard(path)
+        if is_dir:
+            prefix = path.rstrip(os.sep) + os.sep
+            self._changed = {p for p in self._changed if not p.startswith(prefix)}
+            self._new_dirs = {p for p in self._new_dirs if p != path and not p.startswith(prefix)}
+        self._deleted.add(path)
+
+    def _on_moved(self, src: str, dest: Optional[str], is_dir: bool) -> None:
+        src_tracked, dest_tracked = self._is_tracked(src), self._is_tracked(dest)
+        if not dest_tracked:
+            # 감시 대상 밖(숨김 경로 등)으로 이동 → 삭제로 취급
+            if src_tracked:
+                self._on_deleted(src, is_dir)
+            return
+        if not src_tracked:
+            # 임시 파일(.part 등)이 제자리로 이름이 바뀐 경우 → 새 파일로 처리
+            if is_dir:
+                self._new_dirs.add(dest)
+            else:
+                self._changed.add(dest)
+            return
+        self._deleted.discard(dest)
+        if not is_dir and src in self._changed:
+            # 아직 처리하지 않은 새 파일이 이동 → 이동 대상 경로만 처리하면 됨
+            self._changed.discard(src)
+            self._changed.add(dest)
+            return
+        if is_dir:
+            prefix = src.rstrip(os.sep) + os.sep
+            moved = {p for p in self._changed if p.startswith(prefix)}
+            self._changed -= moved
+            self._changed |= {dest + p[len(src):] for p in moved}
+        self._moves.append((src, dest, is_dir))
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            first_event = time.monotonic()
+            # 디바운스: 조용해지거나 최대 지연에 도달할 때까지 이벤트를 계속 합침
+            while True:
+                self._drain()
+                remaining = min(WATCH_DEBOUNCE_SECONDS, first_event + WATCH_MAX_DELAY_SECONDS - time.monotonic())
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._wake.wait(), remaining)
+                    self._wake.clear()
+                except asyncio.TimeoutError:
+                    break
+            try:
+                # 스캔과 같은 동시 실행 한도 안에서 처리 (SQLite 쓰기·추출 풀 경합 방지)
+                async with get_scan_runner().slots:
+                    self._drain()
+                    await self._flush()
+            except Exception as e:
+                logger.error("감시 변경 처리 실패 (%s): %s", self.folder_path, e, exc_info=True)
+
+    async def _flush(self) -> None:
+        moves, self._moves = self._moves, []
+        deleted, self._deleted = self._deleted, set()
+        new_dirs, self._new_dirs = self._new_dirs, set()
+        changed, self._changed = self._changed, set()
+
+        # 새로 생긴(또는 밖에서 옮겨 온) 디렉토리는 하위 파일을 직접 탐색
+        for directory in new_dirs:
+            async for fpath, _ in walk_files(directory, scan_service.EXCLUDED_DIRS, scan_service.EXCLUDED_EXTENSIONS):
+                changed.add(fpath)
+
+        if moves or deleted:
+            db: Session = SessionLocal()
+            try:
+                for src, dest, is_dir in moves:
+                    # 이동 대상이 DB에 없으면 (이전 이동이 반영되기 전 등) 새 파일로 처리
+                    if not self._apply_move(db, src, dest, is_dir) and not is_dir:
+                        changed.add(dest)
+                for path in deleted:
+                    self._apply_delete(db, path)
+                db.commit()
+            finally:
+                db.close()
+
+        if changed:
+            self.files_classified += await scan_service.classify_paths(
+                self.scan_id, self.folder_path, sorted(changed),
+            )
+        self.last_flush_at = time.time()
+
+    def _apply_move(self, db: Session, src: str, dest: str, is_dir: bool) -> bool:
+        """File·추출 캐시 경로 갱신 (분류 유지) — 옮길 레코드가 없으면 False"""
+        if is_dir:
+            prefix, upper = scan_service._path_range(src)
+            files = db.query(File).filter(File.path >= prefix, File.path < upper).all()
+            caches = db.query(ExtractionCache).filter(ExtractionCache.path >= prefix, ExtractionCache.path < upper).all()
+        else:
+            files = db.query(File).filter(File.path == src).all()
+            caches = db.query(ExtractionCache).filter(ExtractionCache.path == src).all()
+        if not files:
+            return False
+
+        renames = {f.path: dest + f.path[len(src):] for f in files}
+        # 이동 대상 경로에 있던 레코드는 덮어쓰여졌으므로 삭제
+        for path in renames.values():
+            self._apply_delete(db, path, recursive=False)
+        moving_cache_ids = [cache.id for cache in caches]
+        for cache in caches:
+            db.query(ExtractionCache).filter(
+                ExtractionCache.path == dest + cache.path[len(src):],
+                ExtractionCache.id.notin_(moving_cache_ids),
+            ).delete(synchronize_session=False)
+        db.flush()
+        for file in files:
+            file.path = renames[file.path]
+            file.filename = os.path.basename(file.path)
+            file.extension = os.path.splitext(file.filename)[1].lower()
+        for cache in caches:
+            cache.path = dest + cache.path[len(src):]
+        self.files_moved += len(files)
+        return True
+
+    def _apply_delete(self, db: Session, path: str, recursive: bool = True) -> None:
+        """File 레코드(분류·표지 포함)와 추출 캐시 삭제 — 디렉토리 경로면 하위 전체"""
+        prefix, upper = scan_service._path_range(path)
+        file_filter = (File.path == path) | ((File.path >= prefix) & (File.path < upper)) if recursive else (File.path == path)
+        for file in db.query(File).filter(file_filter).all():
+            db.delete(file)
+            self.files_deleted += 1
+        cache_filter = (
+            (ExtractionCache.path == path) | ((ExtractionCache.path >= prefix) & (ExtractionCache.path < upper))
+            if recursive else (ExtractionCache.path == path)
+        )
+        db.query(ExtractionCache).filter(cache_filter).delete(synchronize_session=False)
+        # autoflush가 꺼져 있으므로 같은 트랜잭션의 다음 조회에 삭제가 보이도록 반영
+        db.flush()
+
+    def status(self) -> dict:
+        return {
+            "scan_id": self.scan_id,
+            "folder_path": self.folder_path,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(),
+            "last_flush_at": datetime.fromtimestamp(self.last_flush_at).isoformat() if self.last_flush_at else None,
+            "pending": self.pending,
+            "files_classified": self.files_classified,
+            "files_moved": self.files_moved,
+            "files_deleted": self.files_deleted,
+        }
+
+
+def _as_str(path) -> Optional[str]:
+    # watchdog은 경로를 bytes로 줄 수도 있음
+    if isinstance(path, bytes):
+        return os.fsdecode(path)
+    return path or None
+
+
+_watchers: dict[str, FolderWatcher] = {}
+
+
+def get_watcher(scan_id: str) -> Optional[FolderWatcher]:
+    return _watchers.get(scan_id)
+
+
+def list_watchers() -> list[FolderWatcher]:
+    return list(_watchers.values())
+
+
+async def start_watch(scan_id: str, folder_path: str) -> FolderWatcher:
+    """
+    scan_id로 스캔한 폴더 감시 시작 — 같은 폴더를 이미 감시 중이면 기존 감시기를 새 scan_id로 교체.
+    watchdog이 없으면 WatchUnavailable.
+    """
+    for existing in list(_watchers.values()):
+        if existing.folder_path == folder_path and existing.scan_id != scan_id:
+            await stop_watch(existing.scan_id)
+    watcher = _watchers.get(scan_id)
+    if watcher is None:
+        watcher = FolderWatcher(scan_id, folder_path)
+        watcher.start()
+        _watchers[scan_id] = watcher
+    return watcher
+
+
+async def stop_watch(scan_id: str) -> bool:
+    watcher = _watchers.pop(scan_id, None)
+    if watcher is None:
+        return False
+    await watcher.stop()
+    return True
+
+
+async def stop_all_watches() -> None:
+    for scan_id in list(_watchers):
+        await stop_watch(scan_id)
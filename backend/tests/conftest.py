@@ -0,0 +1,75 @@
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+# database.py가 import 시점에 앱 데이터 폴더에 DB를 만들므로, 테스트는 임시 폴더를 사용
+os.environ["XDG_DATA_HOME"] = tempfile.mkdtemp(prefix="clasp-test-")
+os.environ["APPDATA"] = os.environ["XDG_DATA_HOME"]
+os.environ["CLASP_EMBEDDING_SERVICE"] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def db():
+    """임시 DB 세션 — 테스트가 끝나면 모든 테이블을 비움"""
+    from database import Base, SessionLocal, init_db
+
+    init_db()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.commit()
+        session.close()
+
+
+class FakeEncoder:
+    """텍스트로 정해지는 384차원 벡터를 돌려주는 인코더 — 모델 없이 결정적인 임베딩"""
+
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def encode(self, sentences, batch_size: int = 32, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        self.calls.append(texts)
+        vectors = np.stack([
+            np.random.default_rng(int(hashlib.md5(text.encode()).hexdigest()[:8], 16))
+            .standard_normal(384).astype(np.float32)
+            for text in texts
+        ]) if texts else np.zeros((0, 384), dtype=np.float32)
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def fake_encoder():
+    from engines import embedding_backend, tier2_embedding
+
+    encoder = FakeEncoder()
+    tier2_embedding.set_model_loader(lambda model_name: (encoder, "torch"))
+    yield encoder
+    tier2_embedding.set_model_loader(embedding_backend.load_encoder)
+
+
+@pytest.fixture
+def run_scan(db, fake_encoder):
+    """scan_service.run_scan을 끝까지 실행하고 이벤트 목록을 돌려주는 함수"""
+    from services import scan_service
+    from services.extraction_service import shutdown_extraction_pool
+
+    def run(scan_id: str, folder_path: str) -> list[dict]:
+        async def collect():
+            return [event async for event in scan_service.run_scan(scan_id, folder_path)]
+        return asyncio.run(collect())
+
+    yield run
+    shutdown_extraction_pool()
@@ -0,0 +1,46 @@
+import asyncio
+import os
+
+from utils.dir_walker import walk_files
+
+
+def walk(root, excluded_dirs=frozenset(), excluded_extensions=frozenset(), max_workers=4):
+    async def collect():
+        return {
+            path: stat
+            async for path, stat in walk_files(root, set(excluded_dirs), set(excluded_extensions), max_workers)
+        }
+    return asyncio.run(collect())
+
+
+def test_walk_finds_nested_files_with_stat(tmp_path):
+    expected = set()
+    for i in range(5):
+        sub = tmp_path / f"d{i}" / "inner"
+        sub.mkdir(parents=True)
+        for name in ("a.txt", "b.pdf"):
+            (sub / name).write_text(name * (i + 1))
+            expected.add(str(sub / name))
+
+    result = walk(str(tmp_path), max_workers=2)
+    assert set(result) == expected
+    for path, stat in result.items():
+        assert stat.st_size == os.path.getsize(path)
+
+
+def test_walk_skips_excluded_hidden_and_symlinked_dirs(tmp_path):
+    (tmp_path / "keep").mkdir()
+    (tmp_path / "keep" / "doc.txt").write_text("x")
+    (tmp_path / "keep" / "app.exe").write_text("x")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "lib.txt").write_text("x")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "HEAD.txt").write_text("x")
+    (tmp_path / ".hidden.txt").write_text("x")
+    try:
+        os.symlink(tmp_path / "keep", tmp_path / "link", target_is_directory=True)
+    except OSError:
+        pass
+
+    result = walk(str(tmp_path), {"node_modules"}, {".exe"})
+    assert set(result) == {str(tmp_path / "keep" / "doc.txt")}
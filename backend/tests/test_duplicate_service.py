@@ -0,0 +1,78 @@
+import os
+from datetime import datetime
+
+from models.schema import Classification, File
+from services import duplicate_service
+from services.duplicate_service import find_duplicate_groups, get_duplicate_copies
+from utils.fingerprint import FINGERPRINT_BLOCK_SIZE
+
+SCAN_ID = "scan_dup"
+HEAD = b"h" * FINGERPRINT_BLOCK_SIZE
+TAIL = b"t" * FINGERPRINT_BLOCK_SIZE
+
+
+def add_file(db, path, content: bytes) -> int:
+    path.write_bytes(content)
+    stat = os.stat(path)
+    record = File(
+        path=str(path), filename=path.name, extension=path.suffix, size=stat.st_size,
+        modified_at=datetime.fromtimestamp(stat.st_mtime),
+    )
+    db.add(record)
+    db.flush()
+    db.add(Classification(file_id=record.id, scan_id=SCAN_ID, category="문서", tier_used=1, confidence_score=1.0))
+    db.commit()
+    return record.id
+
+
+def test_groups_narrow_by_size_then_quick_then_full_hash(tmp_path, db, monkeypatch):
+    a = add_file(db, tmp_path / "a.bin", HEAD + b"m" * 1000 + TAIL)
+    b = add_file(db, tmp_path / "b.bin", HEAD + b"m" * 1000 + TAIL)
+    # 앞·뒤 블록은 같고 가운데만 다름 — 빠른 지문은 같고 전체 해시에서 갈림
+    add_file(db, tmp_path / "c.bin", HEAD + b"x" * 1000 + TAIL)
+    # 크기는 같고 뒤 블록이 다름 — 빠른 지문에서 제외되어 전체 해시를 계산하지 않음
+    add_file(db, tmp_path / "d.bin", HEAD + b"m" * 1000 + b"z" * FINGERPRINT_BLOCK_SIZE)
+    # 크기가 다른 파일은 읽지 않음
+    add_file(db, tmp_path / "e.bin", HEAD + TAIL)
+
+    quick_read, full_read = [], []
+    quick, full = duplicate_service.quick_hash, duplicate_service.full_hash
+
+    def counting_quick(path, size):
+        quick_read.append(os.path.basename(path))
+        return quick(path, size)
+
+    def counting_full(path, size):
+        full_read.append(os.path.basename(path))
+        return full(path, size)
+
+    monkeypatch.setattr(duplicate_service, "quick_hash", counting_quick)
+    monkeypatch.setattr(duplicate_service, "full_hash", counting_full)
+
+    groups = find_duplicate_groups(db, SCAN_ID)
+    assert [group["file_ids"] for group in groups] == [[a, b]]
+    assert sorted(quick_read) == ["a.bin", "b.bin", "c.bin", "d.bin"]
+    assert sorted(full_read) == ["a.bin", "b.bin", "c.bin"]
+    assert get_duplicate_copies(db, [a, b], groups) == {b: a}
+
+
+def test_persist_and_stale_fingerprints(tmp_path, db):
+    a = add_file(db, tmp_path / "a.txt", b"same content")
+    b = add_file(db, tmp_path / "b.txt", b"same content")
+    assert db.get(File, a).quick_hash is None
+
+    # 조회만 하면 저장하지 않고, 정리 적용(persist)에서만 저장
+    assert [group["file_ids"] for group in find_duplicate_groups(db, SCAN_ID)] == [[a, b]]
+    db.expire_all()
+    assert db.get(File, a).quick_hash is None
+    find_duplicate_groups(db, SCAN_ID, persist=True)
+    db.expire_all()
+    assert db.get(File, a).full_hash == db.get(File, b).full_hash is not None
+
+    # 스캔 뒤 내용이 바뀐 파일은 저장된 지문을 믿지 않고 다시 계산, File 행에는 쓰지 않음
+    stored = db.get(File, b).quick_hash
+    (tmp_path / "b.txt").write_bytes(b"edit content")
+    os.utime(tmp_path / "b.txt", (1, 1))
+    assert find_duplicate_groups(db, SCAN_ID, persist=True) == []
+    db.expire_all()
+    assert db.get(File, b).quick_hash == stored
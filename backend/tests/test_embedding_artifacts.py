@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pytest
+
+from engines import tier2_embedding
+
+
+@pytest.fixture
+def artifact_dir(tmp_path, monkeypatch, fake_encoder):
+    """임베딩 행렬 캐시를 비운 상태에서 임시 디렉토리에 아티팩트를 만듦 — 테스트 뒤 원래 캐시로 복원"""
+    monkeypatch.setattr(tier2_embedding, "_get_artifact_dir", lambda: str(tmp_path))
+    monkeypatch.setattr(tier2_embedding, "_get_feedback_path", lambda: str(tmp_path / "feedback_embeddings.json"))
+    monkeypatch.setattr(tier2_embedding, "_category_embeddings", None)
+    monkeypatch.setattr(tier2_embedding, "_tag_embeddings", {})
+    monkeypatch.setattr(tier2_embedding, "_custom_tag_candidates", {})
+    monkeypatch.setattr(tier2_embedding, "_custom_category_keywords", {})
+    return tmp_path
+
+
+def reload_embeddings(monkeypatch):
+    """프로세스를 새로 시작한 것처럼 메모리의 행렬만 비움"""
+    monkeypatch.setattr(tier2_embedding, "_category_embeddings", None)
+    monkeypatch.setattr(tier2_embedding, "_tag_embeddings", {})
+    return tier2_embedding._get_category_embeddings()
+
+
+def encoded_texts(encoder) -> list[str]:
+    return [text for call in encoder.calls for text in call]
+
+
+def test_artifact_is_reloaded_by_mmap_and_rebuilt_on_key_change(artifact_dir, fake_encoder, monkeypatch):
+    built = tier2_embedding._get_category_embeddings()
+    key = tier2_embedding._artifact_key()
+    assert sorted(os.listdir(artifact_dir)) == [f"tier2-{key}.json", f"tier2-{key}.npy"]
+    # 키워드·태그 후보는 중복 없이 한 번씩만 인코딩
+    encoded = encoded_texts(fake_encoder)
+    assert len(encoded) == len(set(encoded))
+
+    fake_encoder.calls.clear()
+    loaded = reload_embeddings(monkeypatch)
+    assert fake_encoder.calls == []
+    assert loaded.names == built.names
+    np.testing.assert_allclose(loaded.matrix, built.matrix, atol=1e-6)
+    assert isinstance(tier2_embedding._tag_embeddings["문서"].matrix, np.memmap)
+
+    # 키워드 목록이 바뀌면 버전 키가 달라져 새로 만들고 이전 파일은 삭제
+    keywords = {**tier2_embedding.CATEGORY_KEYWORDS, "문서": [*tier2_embedding.CATEGORY_KEYWORDS["문서"], "공문"]}
+    monkeypatch.setattr(tier2_embedding, "CATEGORY_KEYWORDS", keywords)
+    new_key = tier2_embedding._artifact_key()
+    assert new_key != key
+    reload_embeddings(monkeypatch)
+    assert "공문" in encoded_texts(fake_encoder)
+    assert sorted(os.listdir(artifact_dir)) == [f"tier2-{new_key}.json", f"tier2-{new_key}.npy"]
+
+
+def test_custom_categories_encode_only_the_diff(artifact_dir, fake_encoder):
+    tier2_embedding._get_category_embeddings()
+    fake_encoder.calls.clear()
+
+    tier2_embedding.load_custom_categories([{"name": "여행", "keywords": ["항공권", "숙소"]}])
+    assert sorted(encoded_texts(fake_encoder)) == ["숙소", "항공권"]
+    fake_encoder.calls.clear()
+
+    tier2_embedding.load_custom_categories([
+        {"name": "여행", "keywords": ["항공권", "숙소"]},
+        {"name": "육아", "keywords": []},
+    ])
+    assert encoded_texts(fake_encoder) == ["육아"]
+    assert "여행" in tier2_embedding._get_category_embeddings()
+
+    tier2_embedding.load_custom_categories([])
+    assert tier2_embedding._get_category_embeddings().names == list(tier2_embedding.CATEGORY_KEYWORDS)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from engines import embedding_backend
+from engines.embedding_backend import PARITY_MIN_COSINE, PARITY_SAMPLES, load_encoder, min_cosine
+from engines.tier2_embedding import MODEL_NAME
+
+
+def test_auto_never_selects_int8(monkeypatch):
+    monkeypatch.setattr(embedding_backend, "EMBEDDING_BACKEND", "auto")
+    assert embedding_backend.resolve_backend() in ("onnx", "torch")
+    assert embedding_backend.resolve_backend("onnx-int8") == "onnx-int8"
+
+
+def test_int8_falls_back_to_fp32_onnx_then_torch(monkeypatch):
+    attempts = []
+
+    def fake_load_onnx(model_name, quantize):
+        attempts.append(quantize)
+        if quantize:
+            raise RuntimeError("int8 패리티 미달")
+        return "onnx-encoder"
+
+    monkeypatch.setattr(embedding_backend, "_load_onnx", fake_load_onnx)
+    monkeypatch.setattr(embedding_backend, "_load_torch", lambda model_name: "torch-encoder")
+    assert load_encoder(MODEL_NAME, "onnx-int8") == ("onnx-encoder", "onnx")
+    assert attempts == [True, False]
+
+    def broken_onnx(model_name, quantize):
+        raise ImportError("onnxruntime")
+
+    monkeypatch.setattr(embedding_backend, "_load_onnx", broken_onnx)
+    assert load_encoder(MODEL_NAME, "onnx-int8") == ("torch-encoder", "torch")
+
+
+def test_min_cosine():
+    a = np.array([[1.0, 0.0], [0.0, 2.0]], dtype=np.float32)
+    b = np.array([[3.0, 0.0], [1.0, 1.0]], dtype=np.float32)
+    assert min_cosine(a, b) == pytest.approx(np.sqrt(0.5))
+
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+def test_onnx_parity_with_torch(backend):
+    """ONNX 임베딩이 PyTorch fp32와 PARITY_MIN_COSINE 이상 일치 (모델·런타임이 설치된 환경에서만)"""
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+
+    reference, _ = load_encoder(MODEL_NAME, "torch")
+    encoder, used = load_encoder(MODEL_NAME, backend)
+    assert used == backend
+    expected = np.asarray(reference.encode(PARITY_SAMPLES), dtype=np.float32)
+    actual = np.asarray(encoder.encode(PARITY_SAMPLES), dtype=np.float32)
+    assert actual.shape == expected.shape
+    assert min_cosine(expected, actual) >= PARITY_MIN_COSINE
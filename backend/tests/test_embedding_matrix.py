@@ -0,0 +1,102 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from utils.embedding_matrix import EmbeddingMatrix, normalize
+
+
+def brute_force_top_k(names, vectors, query, k):
+    scores = normalize(vectors) @ normalize(query)
+    order = sorted(range(len(names)), key=lambda i: -scores[i])[:k]
+    return [(names[i], float(scores[i])) for i in order]
+
+
+@pytest.mark.parametrize("k", [1, 3, 8, 20])
+def test_top_k_matches_brute_force(k):
+    rng = np.random.default_rng(0)
+    names = [f"c{i}" for i in range(8)]
+    vectors = rng.standard_normal((8, 16)).astype(np.float32)
+    queries = rng.standard_normal((5, 16)).astype(np.float32)
+    matrix = EmbeddingMatrix(names, vectors)
+
+    ranked = matrix.top_k(queries, k)
+    assert len(ranked) == len(queries)
+    for query, result in zip(queries, ranked):
+        expected = brute_force_top_k(names, vectors, query, k)
+        assert [name for name, _ in result] == [name for name, _ in expected]
+        assert [score for _, score in result] == pytest.approx([score for _, score in expected], abs=1e-5)
+
+
+def test_top_k_single_query_and_empty_matrix():
+    matrix = EmbeddingMatrix(["a", "b"], np.array([[1.0, 0.0], [0.0, 1.0]]))
+    assert matrix.top_k(np.array([2.0, 1.0]), k=2)[0][0][0] == "a"
+    assert EmbeddingMatrix().top_k(np.ones((3, 2)), k=2) == [[], [], []]
+
+
+def test_top_k_follows_updates():
+    matrix = EmbeddingMatrix(["a", "b"], np.array([[1.0, 0.0], [0.0, 1.0]]))
+    matrix["c"] = np.array([1.0, 1.0])
+    assert matrix.top_k(np.array([1.0, 1.0]))[0][0] == ("c", pytest.approx(1.0))
+    matrix["a"] = np.array([1.0, 1.0])
+    del matrix["c"]
+    assert matrix.names == ["a", "b"]
+    assert matrix.top_k(np.array([1.0, 1.0]))[0][0] == ("a", pytest.approx(1.0))
+
+
+ROUNDS = 2000
+
+
+@pytest.fixture
+def frequent_thread_switches():
+    """스레드 전환을 자주 일으켜 변경끼리 끼어드는 경우를 만듦"""
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    yield
+    sys.setswitchinterval(previous)
+
+
+def test_concurrent_updates_and_scoring_stay_consistent(frequent_thread_switches):
+    rng = np.random.default_rng(1)
+    matrix = EmbeddingMatrix(["base"], rng.standard_normal((1, 8)))
+    queries = rng.standard_normal((4, 8)).astype(np.float32)
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        while not stop.is_set():
+            try:
+                for ranked in matrix.top_k(queries, k=3):
+                    names = [name for name, _ in ranked]
+                    assert names and len(names) == len(set(names))
+                assert matrix["base"].shape == (8,)
+            except Exception as e:
+                errors.append(e)
+                return
+
+    def write(worker):
+        local = np.random.default_rng(worker)
+        for i in range(ROUNDS):
+            name = f"w{worker}-{i % 5}"
+            matrix[name] = local.standard_normal(8)
+            matrix["base"] = local.standard_normal(8)
+            if i % 3 == 0 and name in matrix:
+                del matrix[name]
+
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    for thread in readers:
+        thread.start()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(write, range(4)))
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert len(set(matrix.names)) == len(matrix) == matrix.matrix.shape[0]
+    # 변경끼리 겹쳐도 잃어버린 추가·삭제 없이 각 작업자의 마지막 변경이 반영됨
+    expected = {"base"} | {f"w{worker}-{i % 5}" for worker in range(4) for i in range(ROUNDS - 5, ROUNDS) if i % 3}
+    assert set(matrix.names) == expected
+    assert all(matrix[name].shape == (8,) for name in expected)
@@ -0,0 +1,103 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from services import embedding_service
+from services.embedding_service import EmbeddingService
+
+
+def vector(text: str) -> np.ndarray:
+    return np.full(4, len(text), dtype=np.float32)
+
+
+def echo_worker(conn, model_name):
+    """텍스트 길이로 채운 벡터를 돌려주는 워커 — "hang"이 들어 있는 배치에서는 응답하지 않음"""
+    conn.send(("ready", "fake"))
+    while True:
+        task = conn.recv()
+        if task is None:
+            return
+        texts, _ = task
+        if "hang" in texts:
+            time.sleep(60)
+        conn.send(("ok", np.stack([vector(text) for text in texts])))
+
+
+def silent_worker(conn, model_name):
+    """모델 로드가 끝나지 않는 워커"""
+    time.sleep(60)
+
+
+class InProcessEncoder:
+    def encode(self, sentences, batch_size=32, **kwargs):
+        return np.stack([vector(text) for text in sentences])
+
+
+@pytest.fixture
+def service_factory(monkeypatch):
+    services = []
+
+    def create(worker, **kwargs):
+        monkeypatch.setattr(embedding_service, "_worker_main", worker)
+        service = EmbeddingService(**kwargs)
+        services.append(service)
+        return service
+
+    yield create
+    for service in services:
+        service.shutdown()
+
+
+def test_concurrent_requests_are_merged_into_micro_batches(service_factory):
+    service = service_factory(echo_worker, max_batch=64, max_wait_ms=200)
+    encoder, backend = service.connect("model")
+    assert backend == "fake"
+
+    requests = [[f"{i}" * (i + 1), "x" * i] for i in range(1, 9)]
+    barrier = threading.Barrier(len(requests))
+
+    def call(texts):
+        barrier.wait()
+        return encoder.encode(texts)
+
+    with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+        results = list(executor.map(call, requests))
+    for texts, result in zip(requests, results):
+        np.testing.assert_array_equal(result, np.stack([vector(text) for text in texts]))
+    np.testing.assert_array_equal(encoder.encode("단일"), vector("단일"))
+
+    stats = service.stats()
+    assert stats["texts"] == 17
+    assert stats["batches"] < len(requests) + 1
+    assert stats["running"] and not stats["in_process_fallback"]
+
+
+def test_stuck_batch_fails_and_worker_is_replaced(service_factory):
+    service = service_factory(echo_worker, max_wait_ms=1, timeout=0.5)
+    encoder, _ = service.connect("model")
+    first_pid = service._process.pid
+
+    with pytest.raises(RuntimeError, match="응답 없음"):
+        encoder.encode(["hang"])
+    assert service.stats()["timeouts"] == 1
+
+    np.testing.assert_array_equal(encoder.encode(["다시"]), np.stack([vector("다시")]))
+    assert service._process.pid != first_pid
+
+
+def test_start_timeout_falls_back_to_in_process_encoder(service_factory, monkeypatch):
+    fallback = InProcessEncoder()
+    monkeypatch.setattr(embedding_service.embedding_backend, "load_encoder", lambda model_name: (fallback, "torch"))
+    service = service_factory(silent_worker, start_timeout=0.5)
+
+    started = time.perf_counter()
+    assert service.connect("model") == (fallback, "torch")
+    assert time.perf_counter() - started < 10
+    assert service._process is None
+    assert service.connect("model") == (fallback, "torch")
+    stats = service.stats()
+    assert stats["in_process_fallback"] and not stats["running"]
+    assert stats["backend"] == "torch"
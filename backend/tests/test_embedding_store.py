@@ -0,0 +1,55 @@
+import unicodedata
+
+import numpy as np
+
+from engines import tier2_embedding
+from services import embedding_store
+from services.embedding_store import from_blob, load_vectors, save_vectors, text_hash, to_blob
+
+
+def encoded_texts(encoder) -> list[str]:
+    return [text for call in encoder.calls for text in call]
+
+
+def test_blob_round_trip():
+    vector = np.random.default_rng(0).standard_normal(384).astype(np.float32)
+    blob = to_blob(vector)
+    assert len(blob) == 384 * 4
+    np.testing.assert_array_equal(from_blob(blob), vector)
+    np.testing.assert_array_equal(from_blob(to_blob(vector.astype(np.float64))), vector)
+
+
+def test_text_hash_normalizes_unicode_and_whitespace():
+    nfc = "운영체제 과제"
+    assert text_hash(unicodedata.normalize("NFD", nfc)) == text_hash(nfc)
+    assert text_hash("  운영체제\n\t과제 ") == text_hash(nfc)
+    assert text_hash("운영체제과제") != text_hash(nfc)
+
+
+def test_save_and_load_vectors_per_model(db):
+    vectors = {"a": np.ones(4, dtype=np.float32), "b": np.zeros(4, dtype=np.float32)}
+    save_vectors(db, vectors, "model-1")
+    # 이미 있는 (모델, 해시)는 덮어쓰지 않음
+    save_vectors(db, {"a": np.full(4, 9, dtype=np.float32)}, "model-1")
+    db.commit()
+
+    loaded = load_vectors(db, ["a", "b", "missing"], "model-1")
+    assert set(loaded) == {"a", "b"}
+    np.testing.assert_array_equal(loaded["a"], vectors["a"])
+    assert load_vectors(db, ["a"], "model-2") == {}
+
+
+def test_embed_texts_sync_encodes_each_text_once(db, fake_encoder):
+    first = embedding_store.embed_texts_sync(db, ["보고서", "과제", "보고서"])
+    db.commit()
+    assert sorted(encoded_texts(fake_encoder)) == ["과제", "보고서"]
+
+    second = embedding_store.embed_texts_sync(db, ["보고서 ", "과제", "새 텍스트"])
+    assert encoded_texts(fake_encoder)[2:] == ["새 텍스트"]
+    np.testing.assert_array_equal(second["과제"], first["과제"])
+    np.testing.assert_array_equal(second["보고서 "], first["보고서"])
+
+
+def test_cover_key_matches_bundle_head():
+    cover = "운영체제 과제\n2024년 3월 2일\n학번 20231234"
+    assert embedding_store.cover_hash(cover) == text_hash(tier2_embedding.bundle_texts("본문", cover)[1])
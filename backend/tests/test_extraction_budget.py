@@ -0,0 +1,89 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from services import extraction_service
+from services.extraction_service import ExtractionBudgetExceeded, ExtractionPool, extract_document
+
+
+def hog_memory(mb: int) -> int:
+    data = b"x" * (mb * 1024 * 1024)
+    time.sleep(5)
+    return len(data)
+
+
+async def warm_pool(timeout_seconds: float, memory_limit_mb: int = 0) -> ExtractionPool:
+    """
+    워커 기동(spawn·import)이 끝난 뒤 짧은 시간 예산을 적용한 풀.
+    유휴 워커는 이벤트 루프에 귀속되므로 같은 루프 안에서 사용
+    """
+    pool = ExtractionPool(workers=1, timeout_seconds=30, memory_limit_mb=memory_limit_mb)
+    await pool.run(os.getpid)
+    pool._timeout = timeout_seconds
+    return pool
+
+
+def test_timeout_kills_worker_and_pool_recovers():
+    async def main():
+        pool = await warm_pool(0.5)
+        try:
+            first_pid = await pool.run(os.getpid)
+            started = time.perf_counter()
+            with pytest.raises(ExtractionBudgetExceeded) as exc:
+                await pool.run(time.sleep, 30)
+            assert exc.value.reason == "timeout"
+            assert time.perf_counter() - started < 5
+            pool._timeout = 30
+            assert await pool.run(os.getpid) != first_pid
+        finally:
+            pool.shutdown()
+
+    asyncio.run(main())
+
+
+def test_crashed_worker_is_reported_and_replaced():
+    async def main():
+        pool = await warm_pool(30)
+        try:
+            with pytest.raises(ExtractionBudgetExceeded) as exc:
+                await pool.run(os._exit, 3)
+            assert exc.value.reason == "crashed"
+            assert await pool.run(abs, -1) == 1
+        finally:
+            pool.shutdown()
+
+    asyncio.run(main())
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="RSS 감시는 resource 모듈이 있는 플랫폼에서만 동작")
+def test_memory_budget_kills_worker():
+    async def main():
+        pool = await warm_pool(20, memory_limit_mb=200)
+        try:
+            with pytest.raises(ExtractionBudgetExceeded) as exc:
+                await pool.run(hog_memory, 400)
+            assert exc.value.reason == "memory"
+        finally:
+            pool.shutdown()
+
+    asyncio.run(main())
+
+
+def test_budget_errors_become_extraction_errors(monkeypatch):
+    monkeypatch.setattr(extraction_service, "MAX_EXTRACT_FILE_MB", 1)
+
+    async def main():
+        pool = await warm_pool(0.5)
+        try:
+            timed_out = await extract_document(pool, time.sleep, 30, None)
+            too_large = await extract_document(pool, time.sleep, 30, 2 * 1024 * 1024)
+        finally:
+            pool.shutdown()
+        return timed_out, too_large
+
+    timed_out, too_large = asyncio.run(main())
+    assert timed_out == {"cover_text": None, "body_text": None, "error": "timeout"}
+    assert too_large["error"] == "too_large"
@@ -0,0 +1,61 @@
+import os
+from datetime import datetime
+
+from models.schema import Classification, ExtractionCache, File
+from services import scan_service
+from services.extraction_service import (
+    get_cached_extraction,
+    move_extraction,
+    prune_extraction_cache,
+    save_extraction,
+)
+
+MTIME = datetime(2024, 5, 1, 12, 0, 0)
+
+
+def test_cache_hits_only_for_same_size_and_mtime(db):
+    save_extraction(db, "/r/a.pdf", 100, MTIME, body_text="본문", cover_text="표지")
+    db.commit()
+    cached = get_cached_extraction(db, "/r/a.pdf", 100, MTIME)
+    assert (cached.body_text, cached.cover_text) == ("본문", "표지")
+    assert get_cached_extraction(db, "/r/a.pdf", 101, MTIME) is None
+    assert get_cached_extraction(db, "/r/a.pdf", 100, datetime(2024, 5, 2)) is None
+    assert get_cached_extraction(db, "/r/a.pdf", None, MTIME) is None
+
+
+def test_move_and_prune_follow_file_records(db):
+    save_extraction(db, "/r/old.pdf", 1, MTIME, body_text="옮길 본문", cover_text=None)
+    save_extraction(db, "/r/new.pdf", 2, MTIME, body_text="덮어쓰인 파일", cover_text=None)
+    save_extraction(db, "/r/gone.pdf", 3, MTIME, body_text="삭제된 파일", cover_text=None)
+    move_extraction(db, "/r/old.pdf", "/r/new.pdf")
+    db.add(File(path="/r/new.pdf", filename="new.pdf"))
+    db.commit()
+    assert db.query(ExtractionCache.body_text).filter(ExtractionCache.path == "/r/new.pdf").scalar() == "옮길 본문"
+
+    assert prune_extraction_cache(db) == 1
+    db.commit()
+    assert [path for (path,) in db.query(ExtractionCache.path)] == ["/r/new.pdf"]
+
+
+def test_rescan_reuses_cached_extraction(tmp_path, db, run_scan, monkeypatch):
+    for i in range(3):
+        (tmp_path / f"note{i}.txt").write_text(f"회의록 {i}")
+    run_scan("scan_cache_1", str(tmp_path))
+
+    extracted = []
+    original = scan_service.extract_document
+
+    async def counting(pool, fn, path, size):
+        extracted.append(os.path.basename(path))
+        return await original(pool, fn, path, size)
+
+    monkeypatch.setattr(scan_service, "extract_document", counting)
+    # 분류를 지워 재분류가 필요하게 만들어도 미변경 파일은 캐시에서 본문을 읽음
+    db.query(Classification).delete()
+    db.commit()
+    run_scan("scan_cache_2", str(tmp_path))
+    assert extracted == []
+
+    os.utime(tmp_path / "note0.txt", (1, 1))
+    run_scan("scan_cache_3", str(tmp_path))
+    assert extracted == ["note0.txt"]
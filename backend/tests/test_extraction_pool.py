@@ -0,0 +1,59 @@
+import asyncio
+import os
+
+import pytest
+
+from services.extraction_service import ExtractionPool, extract_document
+from utils.document_reader import read_document
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def pool():
+    pool = ExtractionPool(workers=2, max_tasks_per_worker=3, timeout_seconds=5, memory_limit_mb=0)
+    yield pool
+    pool.shutdown()
+
+
+def test_runs_in_worker_processes(pool):
+    async def main():
+        return await asyncio.gather(*(pool.run(os.getpid) for _ in range(4)))
+
+    pids = run(main())
+    assert os.getpid() not in pids
+    assert len(set(pids)) <= 2
+
+
+def test_worker_is_replaced_after_max_tasks():
+    pool = ExtractionPool(workers=1, max_tasks_per_worker=2, timeout_seconds=5, memory_limit_mb=0)
+    try:
+        async def main():
+            return [await pool.run(os.getpid) for _ in range(4)]
+
+        pids = run(main())
+        assert pids[0] == pids[1] != pids[2] == pids[3]
+    finally:
+        pool.shutdown()
+
+
+def test_worker_errors_are_raised_to_caller(pool):
+    async def main():
+        return await pool.run(int, "숫자 아님")
+
+    with pytest.raises(RuntimeError, match="ValueError"):
+        run(main())
+
+
+def test_extract_document_reads_text_file(pool, tmp_path):
+    path = tmp_path / "메모.txt"
+    path.write_text("회의록 본문", encoding="utf-8")
+
+    async def main():
+        return await extract_document(pool, read_document, str(path), path.stat().st_size)
+
+    result = run(main())
+    assert result["body_text"].strip() == "회의록 본문"
+    assert result["error"] is None
@@ -0,0 +1,46 @@
+import os
+
+from models.schema import Classification, File
+from services import scan_service
+from utils.fingerprint import quick_hash
+
+
+def test_quick_hash_depends_on_content_not_path(tmp_path):
+    a, b, c = tmp_path / "a.txt", tmp_path / "b.txt", tmp_path / "c.txt"
+    a.write_text("같은 내용")
+    b.write_text("같은 내용")
+    c.write_text("다른 내용")
+    assert quick_hash(str(a), a.stat().st_size) == quick_hash(str(b), b.stat().st_size)
+    assert quick_hash(str(a), a.stat().st_size) != quick_hash(str(c), c.stat().st_size)
+
+
+def test_moved_file_keeps_record_and_manual_classification(tmp_path, db, run_scan, monkeypatch):
+    (tmp_path / "report.txt").write_text("분기 실적 보고서")
+    (tmp_path / "memo.txt").write_text("회의 메모")
+    run_scan("scan_move_1", str(tmp_path))
+    record = db.query(File).filter(File.filename == "report.txt").one()
+    file_id = record.id
+    db.add(Classification(
+        file_id=file_id, scan_id="scan_move_1", category="재무", tier_used=0, confidence_score=1.0, is_manual=True,
+    ))
+    db.commit()
+
+    extracted = []
+
+    async def counting(pool, fn, path, size):
+        extracted.append(path)
+        raise AssertionError("이동된 파일은 다시 추출하지 않아야 함")
+
+    monkeypatch.setattr(scan_service, "extract_document", counting)
+    (tmp_path / "archive").mkdir()
+    new_path = tmp_path / "archive" / "2024 보고서.txt"
+    os.rename(tmp_path / "report.txt", new_path)
+    run_scan("scan_move_2", str(tmp_path))
+
+    db.expire_all()
+    assert extracted == []
+    assert db.query(File).count() == 2
+    moved = db.get(File, file_id)
+    assert (moved.path, moved.filename) == (str(new_path), "2024 보고서.txt")
+    manual = db.query(Classification).filter(Classification.file_id == file_id, Classification.is_manual == True).one()
+    assert manual.category == "재무"
@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from utils.keyword_automaton import KeywordAutomaton
+
+
+def naive_find(keywords, text):
+    lowered = (text or "").lower()
+    return {keyword.lower() for keyword in keywords if keyword.lower() in lowered}
+
+
+@pytest.mark.parametrize("keywords, text", [
+    (["he", "she", "his", "hers"], "ushers"),
+    (["보고서", "보고", "고서", "과제"], "운영체제 과제 보고서 제출"),
+    (["Report", "PORT", "final"], "report_FINAL_v2.docx"),
+    (["abc", "bcd", "cde"], "xabcdex"),
+    (["aa", "aaa"], "aaaa"),
+    (["강의", "노트"], ""),
+    (["강의", "노트"], None),
+    ([], "아무 텍스트"),
+])
+def test_find_matches_naive_substring(keywords, text):
+    assert KeywordAutomaton(keywords).find(text) == naive_find(keywords, text)
+
+
+def test_find_matches_naive_substring_random():
+    rng = random.Random(0)
+    alphabet = "abAB가나다 "
+    for _ in range(300):
+        keywords = ["".join(rng.choices(alphabet, k=rng.randint(1, 4))) for _ in range(rng.randint(1, 8))]
+        automaton = KeywordAutomaton(keywords)
+        for _ in range(5):
+            text = "".join(rng.choices(alphabet + "xyz", k=rng.randint(0, 40)))
+            assert automaton.find(text) == naive_find(keywords, text), (keywords, text)
+
+
+def test_find_is_repeatable_after_transition_cache_fills():
+    automaton = KeywordAutomaton(["network", "work", "net"])
+    texts = ["networking", "homework", "internet", "nothing"]
+    first = [automaton.find(text) for text in texts]
+    assert [automaton.find(text) for text in texts] == first
+    assert first == [naive_find(automaton.keywords, text) for text in texts]
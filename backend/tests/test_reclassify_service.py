@@ -0,0 +1,53 @@
+import asyncio
+
+from engines import tier1_rule
+from models.schema import Classification, ExtractionCache, File, Rule
+from services import reclassify_service
+from services.reclassify_service import affected_by_category, affected_by_rule, find_affected_files
+
+
+def add_file(db, name, category="문서", summary=None, manual=False) -> int:
+    record = File(
+        path=f"/r/{name}", filename=name, extension="." + name.rsplit(".", 1)[1], extracted_text_summary=summary,
+    )
+    db.add(record)
+    db.flush()
+    db.add(Classification(
+        file_id=record.id, scan_id="scan_x", category=category, tier_used=1, confidence_score=0.7, is_manual=manual,
+    ))
+    db.commit()
+    return record.id
+
+
+def test_affected_files_are_found_through_each_index(db):
+    pdf = add_file(db, "2023_결산.pdf")
+    hwp = add_file(db, "메모.hwp", summary="예산 회의 메모")
+    body = add_file(db, "보고.docx", category="기타")
+    db.add(ExtractionCache(path="/r/보고.docx", size=1, body_text="내년 예산 편성안"))
+    manual_only = add_file(db, "수동.pdf", manual=True)
+    db.commit()
+
+    assert affected_by_rule(db, "extension", "PDF") == {pdf}
+    assert affected_by_rule(db, "date", "2023") == {pdf}
+    assert affected_by_rule(db, "content", "예산") == {hwp, body}
+    assert affected_by_category(db, "기타", ["없는키워드"]) == {body}
+    assert find_affected_files(db, extensions=["hwp"], years=["2023"]) == {pdf, hwp}
+    assert manual_only not in find_affected_files(db, extensions=["pdf"])
+    assert find_affected_files(db) == set()
+
+
+def test_reclassify_updates_only_given_files(db, fake_encoder):
+    target = add_file(db, "invoice.xyz", category=None, summary="거래 명세")
+    other = add_file(db, "other.xyz", category=None, summary="거래 명세")
+    db.add(Rule(priority=1, type="extension", value="xyz", folder_name="거래"))
+    db.commit()
+    tier1_rule.invalidate_matcher()
+    try:
+        assert asyncio.run(reclassify_service.reclassify_files({target})) == 1
+    finally:
+        tier1_rule.invalidate_matcher()
+
+    db.expire_all()
+    rows = db.query(Classification).filter(Classification.file_id.in_([target, other]))
+    categories = {cls.file_id: cls.category for cls in rows}
+    assert categories == {target: "거래", other: None}
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from models.schema import Classification
+from services import scan_service
+from services.extraction_service import shutdown_extraction_pool
+from services.scan_jobs import ScanJobRunner
+
+
+@pytest.fixture
+def folder(tmp_path):
+    for i in range(6):
+        (tmp_path / f"과제_{i}.txt").write_text(f"운영체제 과제 {i}")
+    yield str(tmp_path)
+    shutdown_extraction_pool()
+
+
+@pytest.fixture
+def blocked_classification(monkeypatch):
+    """Stage 5 분류 배치가 시작되면 멈추는 스캔 — 실행 중인 스캔을 중단하는 테스트용"""
+    entered = []
+
+    async def never_finishes(db, scan_id, batch, *args):
+        entered.append(scan_id)
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(scan_service, "_classify_batch", never_finishes)
+    return entered
+
+
+async def start_and_block(runner, folder, entered):
+    job = runner.submit(folder)
+    while not entered:
+        await asyncio.sleep(0.01)
+    return job
+
+
+def test_app_shutdown_mid_scan_is_auto_resumed(db, fake_encoder, folder, blocked_classification):
+    async def main():
+        runner = ScanJobRunner(max_concurrent=1)
+        job = await start_and_block(runner, folder, blocked_classification)
+        await runner.stop()
+        return job.scan_id
+
+    scan_id = asyncio.run(main())
+    checkpoint = scan_service.find_resumable_checkpoint(db, folder)
+    assert checkpoint is not None
+    assert (checkpoint.scan_id, checkpoint.status) == (scan_id, "interrupted")
+
+
+def test_user_cancel_is_not_auto_resumed(db, fake_encoder, folder, blocked_classification):
+    async def main():
+        runner = ScanJobRunner(max_concurrent=1)
+        job = await start_and_block(runner, folder, blocked_classification)
+        assert await runner.cancel(job.scan_id)
+        await runner.stop()
+        return job.scan_id
+
+    scan_id = asyncio.run(main())
+    assert scan_service.get_checkpoint(db, scan_id).status == "cancelled"
+    assert scan_service.find_resumable_checkpoint(db, folder) is None
+
+
+def test_resumed_scan_skips_already_classified_files(db, run_scan, folder, monkeypatch):
+    run_scan("scan_resume", folder)
+    # 파이프라인 도중 중단된 것처럼 체크포인트를 되돌리고 같은 scan_id로 다시 실행
+    scan_service.save_checkpoint(db, "scan_resume", status="interrupted", stage=5)
+    db.commit()
+
+    classified = []
+    original = scan_service._classify_batch
+
+    async def counting(db, scan_id, batch, *args):
+        classified.extend(item["filename"] for item in batch)
+        return await original(db, scan_id, batch, *args)
+
+    monkeypatch.setattr(scan_service, "_classify_batch", counting)
+    events = run_scan("scan_resume", folder)
+    assert events[-1]["stage"] == 7
+    assert classified == []
+    assert db.query(Classification).filter(Classification.scan_id == "scan_resume").count() == 6
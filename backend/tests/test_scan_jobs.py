@@ -0,0 +1,71 @@
+import asyncio
+
+from services import scan_service
+from services.scan_jobs import ScanJobRunner
+
+
+EVENTS = [
+    {"stage": 1, "message": "", "total": 0, "completed": 0, "current_file": ""},
+    {"stage": 5, "message": "", "total": 2, "completed": 1, "current_file": "a.txt"},
+    {"stage": 7, "message": "완료", "total": 2, "completed": 2, "current_file": ""},
+]
+
+
+def test_job_runs_without_subscriber_and_replays_events(db, monkeypatch):
+    async def fake_run_scan(scan_id, folder_path):
+        for event in EVENTS:
+            await asyncio.sleep(0)
+            yield event
+
+    monkeypatch.setattr(scan_service, "run_scan", fake_run_scan)
+
+    async def main():
+        runner = ScanJobRunner(max_concurrent=1)
+        job = runner.submit("/tmp/folder")
+        try:
+            # 구독자 없이도 끝까지 진행
+            while job.active:
+                await asyncio.sleep(0.01)
+            replay = [event_id async for event_id, _ in job.subscribe(last_event_id=1)]
+            return job.status, replay
+        finally:
+            await runner.stop()
+
+    status, replay = asyncio.run(main())
+    assert status == "completed"
+    assert replay == [2, 3]
+
+
+def test_jobs_wait_for_a_slot_and_queued_jobs_can_be_cancelled(db, monkeypatch):
+    release = None
+    started = []
+
+    async def blocking_run_scan(scan_id, folder_path):
+        started.append(scan_id)
+        await release.wait()
+        yield EVENTS[-1]
+
+    monkeypatch.setattr(scan_service, "run_scan", blocking_run_scan)
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        runner = ScanJobRunner(max_concurrent=1)
+        first = runner.submit("/tmp/a", "scan_first")
+        second = runner.submit("/tmp/b", "scan_second")
+        try:
+            await asyncio.sleep(0.05)
+            assert started == ["scan_first"]
+            assert second.status == "queued"
+            assert await runner.cancel("scan_second")
+            release.set()
+            while first.active:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            return first.status, second.status, list(started)
+        finally:
+            await runner.stop()
+
+    first_status, second_status, ran = asyncio.run(main())
+    assert (first_status, second_status, ran) == ("completed", "cancelled", ["scan_first"])
+    assert scan_service.get_checkpoint(db, "scan_second").status == "cancelled"
@@ -0,0 +1,48 @@
+import asyncio
+
+from models.schema import Classification, File
+from services import scan_service
+
+
+def test_fan_out_limits_concurrency():
+    running = 0
+    peak = 0
+    handled = []
+
+    async def handler(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        handled.append(item)
+
+    async def main():
+        inbox: asyncio.Queue = asyncio.Queue(maxsize=2)
+
+        async def produce():
+            for i in range(10):
+                await inbox.put(i)
+            await inbox.put(scan_service._DONE)
+
+        await asyncio.gather(produce(), scan_service._fan_out(inbox, handler, 3))
+
+    asyncio.run(main())
+    assert peak == 3
+    assert sorted(handled) == list(range(10))
+
+
+def test_run_scan_classifies_every_file(tmp_path, db, run_scan):
+    for d in range(3):
+        folder = tmp_path / f"dir{d}"
+        folder.mkdir()
+        for i in range(10):
+            (folder / f"운영체제_과제_{d}_{i}.txt").write_text(f"운영체제 과제 보고서 {d} {i}")
+
+    events = run_scan("scan_pipeline", str(tmp_path))
+    assert events[-1]["stage"] == 7
+    stages = [event["stage"] for event in events]
+    assert stages == sorted(stages)
+
+    assert db.query(File).count() == 30
+    assert db.query(Classification).filter(Classification.scan_id == "scan_pipeline").count() == 30
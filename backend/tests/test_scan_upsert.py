@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from models.schema import CoverPage, File
+from services.cover_service import save_cover
+from services.embedding_store import cover_hash
+from services.scan_service import _upsert_files
+
+
+def row(path, size, **overrides):
+    values = {
+        "path": path,
+        "filename": path.rsplit("/", 1)[-1],
+        "extension": ".txt",
+        "created_at": datetime(2024, 1, 1),
+        "modified_at": datetime(2024, 1, 2),
+        "size": size,
+        "needs_classification": True,
+        "quick_hash": f"q{size}",
+        "full_hash": None,
+        "filename_year": "",
+    }
+    values.update(overrides)
+    return values
+
+
+def test_upsert_inserts_and_returns_ids(db):
+    ids = _upsert_files(db, [row("/r/a.txt", 1), row("/r/b.txt", 2)])
+    db.commit()
+    assert set(ids) == {"/r/a.txt", "/r/b.txt"}
+    assert {f.path: f.id for f in db.query(File)} == ids
+
+
+def test_upsert_updates_existing_rows_in_place(db):
+    first = _upsert_files(db, [row("/r/a.txt", 1)])
+    db.commit()
+
+    second = _upsert_files(db, [
+        row("/r/a.txt", 5, created_at=datetime(2030, 1, 1), modified_at=datetime(2024, 3, 1), full_hash="f5"),
+        row("/r/c.txt", 3),
+    ])
+    db.commit()
+    assert second["/r/a.txt"] == first["/r/a.txt"]
+    assert second["/r/c.txt"] != first["/r/a.txt"]
+
+    updated = db.query(File).filter(File.path == "/r/a.txt").one()
+    assert (updated.size, updated.modified_at, updated.quick_hash, updated.full_hash) == (
+        5, datetime(2024, 3, 1), "q5", "f5",
+    )
+    # created_at은 최초 생성 시 값 유지
+    assert updated.created_at == datetime(2024, 1, 1)
+    assert db.query(File).count() == 2
+
+
+def test_save_cover_upserts_and_leaves_commit_to_caller(db):
+    file_id = _upsert_files(db, [row("/r/cover.pdf", 10)])["/r/cover.pdf"]
+    db.commit()
+
+    save_cover(db, file_id, "운영체제 과제\n학번 20231234")
+    save_cover(db, file_id, "운영체제 과제\n학번 20239999")
+    db.commit()
+    cover = db.query(CoverPage).filter(CoverPage.file_id == file_id).one()
+    assert cover.cover_text.endswith("20239999")
+    assert cover.text_hash == cover_hash(cover.cover_text)
+
+    # 배치 commit 전에 롤백되면 반영되지 않음
+    save_cover(db, file_id, "다른 표지 2024-01-01")
+    db.rollback()
+    db.expire_all()
+    assert db.query(CoverPage.cover_text).filter(CoverPage.file_id == file_id).scalar().endswith("20239999")
@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from engines import tier1_rule
+from models.schema import CustomExtension, Rule
+
+
+@pytest.fixture
+def fresh_matcher(db):
+    tier1_rule.invalidate_matcher()
+    yield
+    tier1_rule.invalidate_matcher()
+
+
+def test_matcher_is_compiled_once_per_version(db, fresh_matcher, monkeypatch):
+    db.add(Rule(priority=1, type="extension", value="PDF", folder_name="논문"))
+    db.commit()
+    matcher = tier1_rule.get_matcher()
+    assert matcher.rules[0].value == "pdf"
+
+    def no_db():
+        raise AssertionError("컴파일된 매처가 있으면 DB를 조회하지 않아야 함")
+
+    monkeypatch.setattr(tier1_rule, "SessionLocal", no_db)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        matchers = list(executor.map(lambda _: tier1_rule.get_matcher(), range(32)))
+    assert all(m is matcher for m in matchers)
+    assert tier1_rule.run("/r/a.pdf", "a.pdf", ".pdf")["category"] == "논문"
+
+
+def test_invalidate_picks_up_rule_and_extension_changes(db, fresh_matcher):
+    assert tier1_rule.run("/r/a.hwpx", "a.hwpx", ".hwpx")["category"] is None
+
+    # 무효화 전에는 이전 매처를 그대로 사용
+    db.add(CustomExtension(extension="hwpx", category="한글문서"))
+    db.add(Rule(priority=1, type="content", value="예산", folder_name="재무"))
+    db.commit()
+    assert tier1_rule.run("/r/a.hwpx", "a.hwpx", ".hwpx")["category"] is None
+
+    tier1_rule.invalidate_matcher()
+    assert tier1_rule.run("/r/a.hwpx", "a.hwpx", ".hwpx")["category"] == "한글문서"
+    result = tier1_rule.run("/r/b.txt", "b.txt", ".txt", extracted_text="2024년 예산 집행 내역")
+    assert (result["category"], result["confidence_score"]) == ("재무", 0.85)
+
+
+def test_run_batch_matches_per_file_run(db, fresh_matcher):
+    db.add_all([
+        Rule(priority=1, type="date", value="2023", folder_name="2023년"),
+        Rule(priority=2, type="content", value="계약", folder_name="법무"),
+        CustomExtension(extension="hwpx", category="한글문서"),
+    ])
+    db.commit()
+    tier1_rule.invalidate_matcher()
+
+    files = [
+        ("2023_결산.xlsx", ".xlsx", None, None),
+        ("용역.pdf", ".pdf", "용역 계약 조건", None),
+        ("기말 report.hwpx", ".hwpx", None, None),
+        ("사진.PNG", ".PNG", None, None),
+        ("memo.unknown", ".unknown", None, None),
+        ("수정본.pdf", ".pdf", "계약", "개인"),
+    ]
+    filenames, extensions, texts, manuals = (list(column) for column in zip(*files))
+    batch = tier1_rule.run_batch(filenames, extensions, texts, manuals)
+    assert batch == [
+        tier1_rule.run("/r/" + name, name, ext, manual, text) for name, ext, text, manual in files
+    ]
+    assert [result["category"] for result in batch] == ["2023년", "법무", "문서", "이미지", None, "개인"]
+    assert tier1_rule.run_batch([], []) == []
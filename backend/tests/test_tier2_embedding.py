@@ -0,0 +1,47 @@
+import numpy as np
+
+from engines import tier2_embedding
+
+
+def test_encode_texts_batches_by_length_and_keeps_input_order(fake_encoder):
+    texts = ["다섯 글자다", "a", "세 글자", "아주 긴 문장으로 된 텍스트", "ab"]
+    encoded = tier2_embedding.encode_texts(texts, batch_size=2)
+
+    assert fake_encoder.calls == [["a", "ab"], ["세 글자", "다섯 글자다"], ["아주 긴 문장으로 된 텍스트"]]
+    assert encoded.shape == (5, 384) and encoded.dtype == np.float32
+    for text, row in zip(texts, encoded):
+        np.testing.assert_array_equal(row, fake_encoder.encode(text))
+
+
+def test_run_batch_matches_single_text_runs(fake_encoder):
+    texts = ["운영체제 과제 보고서", None, "분기 매출 정산 내역", "", "발표 자료 세미나"]
+    batch = tier2_embedding.run_batch(texts, batch_size=2)
+
+    assert [result["embedding"] is None for result in batch] == [False, True, False, True, False]
+    for text, result in zip(texts, batch):
+        single = tier2_embedding.run_batch([text])[0]
+        assert (result["category"], result["tag"]) == (single["category"], single["tag"])
+        assert np.isclose(result["confidence_score"], single["confidence_score"])
+
+
+def test_bundles_encode_each_distinct_text_once_and_are_reused(fake_encoder):
+    short = "짧은 메모"
+    long_body = "회의록 " * 100
+    bundles = tier2_embedding.encode_bundles([short, long_body, short, None], [None, "표지 제목", None, None])
+
+    # 짧은 본문은 body와 head가 같은 텍스트, 같은 텍스트의 파일끼리도 한 번만 인코딩
+    assert sorted(text for call in fake_encoder.calls for text in call) == sorted(
+        [short, long_body.strip(), "표지 제목"]
+    )
+    np.testing.assert_array_equal(bundles[0]["body"], bundles[0]["head"])
+    np.testing.assert_array_equal(bundles[0]["body"], bundles[2]["body"])
+    np.testing.assert_array_equal(bundles[1]["head"], fake_encoder.encode("표지 제목"))
+    assert bundles[3] is None
+
+    # 카테고리·태그 행렬을 먼저 준비해 두고, 저장된 번들을 넘기면 다시 인코딩하지 않는지 확인
+    tier2_embedding.run_batch([short])
+    fake_encoder.calls.clear()
+    result = tier2_embedding.run_batch([short, long_body], bundles=bundles[:2])
+    assert fake_encoder.calls == []
+    assert result[0]["bundle"] is bundles[0]
+    assert set(tier2_embedding.run(short)) == {"category", "tag", "confidence_score"}
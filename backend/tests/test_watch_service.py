@@ -0,0 +1,71 @@
+import asyncio
+import os
+
+import pytest
+
+from models.schema import File
+from services import scan_service, watch_service
+from services.watch_service import FolderWatcher
+
+
+@pytest.fixture
+def classify_calls(monkeypatch):
+    calls = []
+
+    async def fake_classify_paths(scan_id, folder_path, paths):
+        calls.append(paths)
+        return len(paths)
+
+    monkeypatch.setattr(scan_service, "classify_paths", fake_classify_paths)
+    monkeypatch.setattr(watch_service, "WATCH_DEBOUNCE_SECONDS", 0.05)
+    return calls
+
+
+async def run_watcher(watcher: FolderWatcher, events, settle: float = 0.3) -> None:
+    """옵저버 없이 디바운스 루프만 실행 — 옵저버 스레드처럼 _push로 원시 이벤트 전달"""
+    watcher._loop = asyncio.get_running_loop()
+    task = asyncio.create_task(watcher._run())
+    try:
+        for event in events:
+            watcher._push(*event)
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(settle)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def test_burst_of_events_is_flushed_once(tmp_path, db, classify_calls):
+    root = str(tmp_path)
+    a, b, c = (os.path.join(root, name) for name in ("a.txt", "b.txt", "c.txt"))
+    watcher = FolderWatcher("scan_watch", root)
+    asyncio.run(run_watcher(watcher, [
+        ("created", a, None, False),
+        ("modified", a, None, False),
+        ("modified", a, None, False),
+        ("created", b, None, False),
+        ("deleted", b, None, False),
+        # 다운로드 임시 파일이 제 이름으로 바뀐 경우는 새 파일
+        ("moved", os.path.join(root, ".c.txt.part"), c, False),
+        ("created", os.path.join(root, ".hidden", "x.txt"), None, False),
+    ]))
+    assert classify_calls == [[a, c]]
+    assert watcher.files_classified == 2
+    assert watcher.pending == 0
+
+
+def test_moves_and_deletes_update_records_without_reclassifying(tmp_path, db, classify_calls):
+    root = str(tmp_path)
+    old, new, gone = (os.path.join(root, name) for name in ("old.txt", "new.txt", "gone.txt"))
+    db.add_all([File(path=old, filename="old.txt"), File(path=gone, filename="gone.txt")])
+    db.commit()
+
+    watcher = FolderWatcher("scan_watch", root)
+    asyncio.run(run_watcher(watcher, [
+        ("moved", old, new, False),
+        ("deleted", gone, None, False),
+    ]))
+    db.expire_all()
+    assert [path for (path,) in db.query(File.path)] == [new]
+    assert classify_calls == []
+    assert (watcher.files_moved, watcher.files_deleted) == (1, 1)
@@ -63,11 +63,7 @@ def _extract_pdf_cover(file_path: str) -> Optional[str]:
     try:
         import fitz
         doc = fitz.open(file_path)
-        if len(doc) == 0:
-            return None
-        first_page_text = doc[0].get_text("text").strip()
-        if is_cover_page(first_page_text):
-            return first_page_text
+        return pdf_cover_text(doc)
     except Exception:
         pass
     finally:
@@ -76,6 +72,16 @@ def _extract_pdf_cover(file_path: str) -> Optional[str]:
     return None
 
 
+def pdf_cover_text(doc) -> Optional[str]:
+    """이미 열린 PyMuPDF 문서의 첫 페이지가 표지면 텍스트 반환"""
+    if len(doc) == 0:
+        return None
+    first_page_text = doc[0].get_text("text").strip()
+    if is_cover_page(first_page_text):
+        return first_page_text
+    return None
+
+
 def _extract_docx_cover(file_path: str) -> Optional[str]:
     """DOCX 첫 페이지 구간(첫 10개 단락)에서 표지 판정"""
     try:
@@ -84,13 +90,18 @@ def _extract_docx_cover(file_path: str) -> Optional[str]:
         return None
 
     try:
-        doc = Document(file_path)
-        first_paragraphs = [p.text.strip() for p in doc.paragraphs[:10] if p.text.strip()]
-        if not first_paragraphs:
-            return None
-        candidate = "\n".join(first_paragraphs)
-        if is_cover_page(candidate):
-            return candidate
+        return docx_cover_text(Document(file_path))
     except Exception:
         pass
     return None
+
+
+def docx_cover_text(doc) -> Optional[str]:
+    """이미 파싱된 python-docx 문서의 첫 10개 단락이 표지면 텍스트 반환"""
+    first_paragraphs = [p.text.strip() for p in doc.paragraphs[:10] if p.text.strip()]
+    if not first_paragraphs:
+        return None
+    candidate = "\n".join(first_paragraphs)
+    if is_cover_page(candidate):
+        return candidate
+    return None
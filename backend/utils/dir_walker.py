@@ -0,0 +1,81 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Optional
+
+# 디렉토리 단위 scandir을 동시에 실행할 스레드 수 — 느린 디스크/네트워크 공유에서 I/O 대기를 겹치기 위함
+WALK_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+
+
+def _scan_dir(
+    path: str,
+    excluded_dirs: set[str],
+    excluded_extensions: set[str],
+) -> tuple[list[tuple[str, Optional[os.stat_result]]], list[str]]:
+    """
+    디렉토리 하나를 os.scandir로 읽어 (파일 목록, 하위 디렉토리 목록) 반환.
+    파일은 DirEntry.stat() 결과를 함께 반환해 메타데이터 단계에서 다시 stat하지 않도록 함.
+    심볼릭 링크 디렉토리는 내려가지 않음 (os.walk followlinks=False와 동일).
+    """
+    files: list[tuple[str, Optional[os.stat_result]]] = []
+    subdirs: list[str] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith("."):
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if name not in excluded_dirs and not entry.is_symlink():
+                        subdirs.append(entry.path)
+                    continue
+                ext = os.path.splitext(name)[1].lower()
+                if ext in excluded_extensions:
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    stat = None
+                files.append((entry.path, stat))
+    except OSError:
+        # 권한 없음 / 탐색 중 삭제된 디렉토리는 건너뜀 (os.walk onerror=None과 동일)
+        pass
+    return files, subdirs
+
+
+async def walk_files(
+    root: str,
+    excluded_dirs: set[str],
+    excluded_extensions: set[str],
+    max_workers: int = WALK_WORKERS,
+) -> AsyncIterator[tuple[str, Optional[os.stat_result]]]:
+    """
+    스레드 풀에서 디렉토리별 scandir을 병렬 실행하며 (파일 경로, stat 결과)를 발견 즉시 yield.
+    하위 디렉토리는 부모 결과를 소비할 때 예약되므로 소비 측이 느리면 탐색도 함께 늦춰짐 (backpressure).
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="clasp-walk")
+    pending: set[asyncio.Future] = set()
+
+    def submit(path: str) -> None:
+        pending.add(loop.run_in_executor(executor, _scan_dir, path, excluded_dirs, excluded_extensions))
+
+    try:
+        submit(root)
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                files, subdirs = future.result()
+                for subdir in subdirs:
+                    submit(subdir)
+                for entry in files:
+                    yield entry
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,69 @@
+import os
+from typing import Optional
+
+from utils.cover_detector import docx_cover_text, pdf_cover_text
+from utils.text_extractor import docx_body_text, extract_text, pdf_body_text
+
+
+def read_document(file_path: str) -> dict:
+    """
+    문서를 한 번만 열어 표지 후보·본문 샘플·페이지 수를 함께 반환.
+    표지 탐지(Stage 3)와 본문 추출(Stage 4)이 같은 파싱 결과를 공유해 PDF/DOCX 파싱을 1회로 줄임.
+    반환: { cover_text, body_text, page_count }
+    - PDF/DOCX: 표지 판정 + 본문 추출 (DOCX page_count는 None)
+    - 그 외: extract_text 전략으로 본문만 추출
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    try:
+        if ext == ".pdf":
+            return _read_pdf(file_path)
+        if ext == ".docx":
+            return _read_docx(file_path)
+    except Exception:
+        return _empty()
+    return {"cover_text": None, "body_text": extract_text(file_path), "page_count": None}
+
+
+def _empty() -> dict:
+    return {"cover_text": None, "body_text": None, "page_count": None}
+
+
+def _read_pdf(file_path: str) -> dict:
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        return _empty()
+
+    doc = None
+    try:
+        doc = fitz.open(file_path)
+        return {
+            "cover_text": _safe(pdf_cover_text, doc),
+            "body_text": _safe(pdf_body_text, doc),
+            "page_count": len(doc),
+        }
+    finally:
+        if doc:
+            doc.close()
+
+
+def _read_docx(file_path: str) -> dict:
+    try:
+        from docx import Document
+    except ImportError:
+        return _empty()
+
+    doc = Document(file_path)
+    return {
+        "cover_text": _safe(docx_cover_text, doc),
+        "body_text": _safe(docx_body_text, doc),
+        "page_count": None,
+    }
+
+
+def _safe(fn, doc) -> Optional[str]:
+    """표지·본문 중 한쪽 실패가 다른 쪽 결과를 버리지 않도록 개별 처리"""
+    try:
+        return fn(doc)
+    except Exception:
+        return None
@@ -0,0 +1,108 @@
+import threading
+from typing import Iterable, Iterator
+
+import numpy as np
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (float32) — 정규화된 벡터끼리의 내적이 곧 코사인 유사도"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+class EmbeddingMatrix:
+    """
+    이름별 후보 임베딩을 L2 정규화된 float32 행렬 한 장으로 보관 (카테고리 중심·태그 후보).
+    행렬-벡터(배치면 행렬-행렬) 곱 한 번으로 모든 후보의 코사인 유사도를 계산.
+    dict처럼 이름으로 읽고 쓸 수 있음.
+    상태 (이름 목록, 이름→행 색인, 행렬)는 한 튜플로 묶어 변경할 때마다 새 튜플로 교체 (copy-on-write).
+    읽기는 튜플 하나를 꺼내 쓰므로 잠금 없이도 일관된 상태를 보고, 변경끼리는 잠금으로 직렬화 —
+    다른 스레드의 점수 계산과 동시에 갱신해도 안전. 후보는 수백 개 이하라 변경마다 행렬을 복사해도 비용이 작음.
+    """
+
+    def __init__(self, names: Iterable[str] = (), vectors=None):
+        names = list(names)
+        matrix = normalize(vectors) if names else np.zeros((0, 0), dtype=np.float32)
+        self._lock = threading.Lock()
+        self._state = self._make_state(names, matrix)
+
+    @staticmethod
+    def _make_state(names: list[str], matrix: np.ndarray) -> tuple[list[str], dict[str, int], np.ndarray]:
+        return names, {name: i for i, name in enumerate(names)}, matrix
+
+    @classmethod
+    def from_normalized(cls, names: Iterable[str], matrix: np.ndarray) -> "EmbeddingMatrix":
+        """이미 정규화된 행렬을 복사 없이 그대로 사용 (mmap으로 읽은 임베딩 아티팩트) — 처음 변경될 때 복사됨"""
+        instance = cls()
+        instance._state = cls._make_state(list(names), matrix)
+        return instance
+
+    @property
+    def names(self) -> list[str]:
+        return self._state[0]
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._state[2]
+
+    def __len__(self) -> int:
+        return len(self._state[0])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._state[1]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._state[0]))
+
+    def keys(self) -> list[str]:
+        return list(self._state[0])
+
+    def items(self) -> list[tuple[str, np.ndarray]]:
+        names, _, matrix = self._state
+        return list(zip(names, matrix))
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        _, index, matrix = self._state
+        return matrix[index[name]]
+
+    def __setitem__(self, name: str, vector) -> None:
+        row = normalize(vector).reshape(-1)
+        with self._lock:
+            names, index, matrix = self._state
+            i = index.get(name)
+            if i is not None:
+                matrix = np.array(matrix)
+                matrix[i] = row
+                self._state = (names, index, matrix)
+                return
+            matrix = np.vstack([matrix, row]) if names else row.reshape(1, -1)
+            self._state = ([*names, name], {**index, name: len(names)}, matrix)
+
+    def __delitem__(self, name: str) -> None:
+        with self._lock:
+            names, index, matrix = self._state
+            i = index[name]
+            self._state = self._make_state(names[:i] + names[i + 1:], np.delete(matrix, i, axis=0))
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        """queries (dim,) 또는 (m, dim) → 후보별 코사인 유사도 (후보 수,) 또는 (m, 후보 수)"""
+        return normalize(queries) @ self._state[2].T
+
+    def top_k(self, queries: np.ndarray, k: int = 1) -> list[list[tuple[str, float]]]:
+        """질의 벡터마다 유사도 상위 k개 후보 [(이름, 점수), ...] (점수 내림차순)"""
+        names, _, matrix = self._state
+        queries = np.atleast_2d(queries)
+        if not names:
+            return [[] for _ in queries]
+        scores = normalize(queries) @ matrix.T
+        k = min(k, len(names))
+        if k < len(names):
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(len(names)), scores.shape)
+        ranked = []
+        for row, candidates in zip(scores, top):
+            order = candidates[np.argsort(-row[candidates], kind="stable")]
+            ranked.append([(names[j], float(row[j])) for j in order])
+        return ranked
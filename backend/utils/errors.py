@@ -18,6 +18,7 @@ class ErrorCode:
     EXTENSION_NOT_FOUND = "EXTENSION_NOT_FOUND"
     CATEGORY_CONFLICT = "CATEGORY_CONFLICT"
     CATEGORY_NOT_FOUND = "CATEGORY_NOT_FOUND"
+    WATCH_UNAVAILABLE = "WATCH_UNAVAILABLE"
 
 
 ERROR_HTTP_STATUS = {
@@ -37,6 +38,7 @@ ERROR_HTTP_STATUS = {
     ErrorCode.EXTENSION_NOT_FOUND: 404,
     ErrorCode.CATEGORY_CONFLICT: 409,
     ErrorCode.CATEGORY_NOT_FOUND: 404,
+    ErrorCode.WATCH_UNAVAILABLE: 503,
 }
 
 ERROR_MESSAGES = {
@@ -56,6 +58,7 @@ ERROR_MESSAGES = {
     ErrorCode.EXTENSION_NOT_FOUND: "해당 확장자 ID 없음",
     ErrorCode.CATEGORY_CONFLICT: "동일한 카테고리 이름이 이미 존재함",
     ErrorCode.CATEGORY_NOT_FOUND: "해당 카테고리 ID 없음",
+    ErrorCode.WATCH_UNAVAILABLE: "폴더 감시 기능을 사용할 수 없음 (watchdog 미설치)",
 }
 
 
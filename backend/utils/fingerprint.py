@@ -0,0 +1,70 @@
+import hashlib
+import mmap
+import os
+from typing import Optional
+
+# 빠른 지문에 사용하는 앞·뒤 블록 크기
+FINGERPRINT_BLOCK_SIZE = 64 * 1024
+
+# 전체 해시를 계산할 때 한 번에 읽는 크기
+_READ_CHUNK_SIZE = 1024 * 1024
+
+
+def _new_digest():
+    return hashlib.blake2b(digest_size=16)
+
+
+def is_fully_hashed(size: Optional[int]) -> bool:
+    """앞·뒤 블록이 파일 전체를 덮는 크기 — 빠른 지문이 곧 전체 해시"""
+    return size is not None and size <= FINGERPRINT_BLOCK_SIZE * 2
+
+
+def quick_hash(file_path: str, size: Optional[int]) -> Optional[str]:
+    """
+    파일 크기 + 앞·뒤 블록 해시로 빠른 내용 지문 계산 (파일당 최대 128KB 읽기).
+    작은 파일은 전체 내용을 해시하므로 full_hash와 같은 값.
+    빈 파일이나 읽을 수 없는 파일은 None — 내용으로 구분할 수 없으므로 이동 감지 대상에서 제외.
+    """
+    if not size:
+        return None
+    digest = _new_digest()
+    digest.update(str(size).encode())
+    try:
+        with open(file_path, "rb") as f:
+            if is_fully_hashed(size):
+                digest.update(f.read())
+            else:
+                digest.update(f.read(FINGERPRINT_BLOCK_SIZE))
+                f.seek(-FINGERPRINT_BLOCK_SIZE, os.SEEK_END)
+                digest.update(f.read(FINGERPRINT_BLOCK_SIZE))
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def full_hash(file_path: str, size: Optional[int] = None) -> Optional[str]:
+    """
+    전체 내용 해시 — 빠른 지문이 같은 파일끼리만 계산.
+    작은 파일은 quick_hash와 같은 값을 반환해 다시 읽지 않도록 호출 측에서 재사용 가능.
+    큰 파일은 mmap으로 매핑해 복사 없이 청크 단위로 스트리밍 (mmap이 불가능한 파일 시스템은 read로 대체).
+    """
+    if is_fully_hashed(size):
+        return quick_hash(file_path, size)
+    digest = _new_digest()
+    digest.update(str(size).encode())
+    try:
+        with open(file_path, "rb") as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                mapped = None
+            if mapped is None:
+                while chunk := f.read(_READ_CHUNK_SIZE):
+                    digest.update(chunk)
+            else:
+                with mapped, memoryview(mapped) as view:
+                    for offset in range(0, len(view), _READ_CHUNK_SIZE):
+                        digest.update(view[offset:offset + _READ_CHUNK_SIZE])
+    except OSError:
+        return None
+    return digest.hexdigest()
@@ -0,0 +1,71 @@
+from collections import deque
+from typing import Iterable, Optional
+
+
+class KeywordAutomaton:
+    """
+    여러 키워드를 한 번에 찾는 Aho-Corasick 오토마톤 (대소문자 무시).
+    텍스트를 한 번만 훑어 포함된 키워드를 모두 찾으므로 비용이 키워드 수와 무관.
+    컴파일 후에는 읽기 전용 — 전이 캐시만 채워지며, 같은 값을 덮어쓰므로 여러 스레드에서 공유 가능.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = frozenset(keyword.lower() for keyword in keywords)
+        goto: list[dict[str, int]] = [{}]
+        outputs: list[set[str]] = [set()]
+        for keyword in self.keywords:
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    outputs.append(set())
+                    nxt = len(goto) - 1
+                    goto[state][ch] = nxt
+                state = nxt
+            outputs[state].add(keyword)
+
+        # 너비 우선으로 실패 링크 계산 — 출력은 실패 링크를 따라 합쳐 두어 매칭 시 다시 따라가지 않음
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[nxt] = goto[fallback].get(ch, 0) if state else 0
+                outputs[nxt] |= outputs[fail[nxt]]
+                queue.append(nxt)
+
+        self._alphabet = frozenset(ch for keyword in self.keywords for ch in keyword)
+        self._fail = fail
+        # 상태별 전이 — goto에서 시작해 실패 링크로 계산한 전이를 처음 쓸 때 채움
+        self._delta = goto
+        self._outputs: list[Optional[frozenset[str]]] = [frozenset(out) or None for out in outputs]
+
+    def _transition(self, state: int, ch: str) -> int:
+        origin = state
+        while state and ch not in self._delta[state]:
+            state = self._fail[state]
+        nxt = self._delta[state].get(ch, 0)
+        self._delta[origin][ch] = nxt
+        return nxt
+
+    def find(self, text: Optional[str]) -> set[str]:
+        """text에 포함된 키워드 집합 (소문자)"""
+        found = set(self._outputs[0] or ())
+        if not text or not self.keywords:
+            return found
+        delta, outputs, alphabet = self._delta, self._outputs, self._alphabet
+        hits: list[frozenset[str]] = []
+        state = 0
+        for ch in text.lower():
+            nxt = delta[state].get(ch)
+            if nxt is None:
+                nxt = self._transition(state, ch) if ch in alphabet else 0
+            state = nxt
+            if outputs[state] is not None:
+                hits.append(outputs[state])
+        found.update(*hits)
+        return found
@@ -40,43 +40,51 @@ def _extract_pdf(file_path: str) -> Optional[str]:
     doc = None
     try:
         doc = fitz.open(file_path)
-        total_pages = len(doc)
+        return pdf_body_text(doc)
+    finally:
+        if doc:
+            doc.close()
 
-        if total_pages == 0:
-            return None
 
-        # 3페이지 이상인 경우 1~2페이지(표지/목차) 스킵
-        start_page = 2 if total_pages >= 3 else 0
-        effective_pages = list(range(start_page, total_pages))
+def pdf_body_text(doc) -> Optional[str]:
+    """
+    이미 열린 PyMuPDF 문서에서 본문 샘플 추출.
+    document_reader가 표지 탐지와 같은 문서 핸들을 공유할 수 있도록 분리.
+    """
+    total_pages = len(doc)
 
-        if not effective_pages:
-            return None
+    if total_pages == 0:
+        return None
 
-        # 유효 페이지가 4 미만이면 샘플링 없이 전체 추출 (중복 샘플링 방지)
-        if len(effective_pages) < 4:
-            chunks = []
-            for page_idx in effective_pages:
-                text = doc[page_idx].get_text("text")
-                if text:
-                    chunks.append(text[:1200])
-            return "\n".join(chunks) if chunks else None
+    # 3페이지 이상인 경우 1~2페이지(표지/목차) 스킵
+    start_page = 2 if total_pages >= 3 else 0
+    effective_pages = list(range(start_page, total_pages))
 
-        # 4구간 샘플링 위치 (30%, 45%, 65%, 85%)
-        sample_ratios = [0.30, 0.45, 0.65, 0.85]
-        n = len(effective_pages)
-        sampled_indices = {effective_pages[min(int(r * n), n - 1)] for r in sample_ratios}
+    if not effective_pages:
+        return None
 
+    # 유효 페이지가 4 미만이면 샘플링 없이 전체 추출 (중복 샘플링 방지)
+    if len(effective_pages) < 4:
         chunks = []
-        for page_idx in sorted(sampled_indices):
-            page = doc[page_idx]
-            text = page.get_text("text")
+        for page_idx in effective_pages:
+            text = doc[page_idx].get_text("text")
             if text:
-                chunks.append(text[:300])
-
+                chunks.append(text[:1200])
         return "\n".join(chunks) if chunks else None
-    finally:
-        if doc:
-            doc.close()
+
+    # 4구간 샘플링 위치 (30%, 45%, 65%, 85%)
+    sample_ratios = [0.30, 0.45, 0.65, 0.85]
+    n = len(effective_pages)
+    sampled_indices = {effective_pages[min(int(r * n), n - 1)] for r in sample_ratios}
+
+    chunks = []
+    for page_idx in sorted(sampled_indices):
+        page = doc[page_idx]
+        text = page.get_text("text")
+        if text:
+            chunks.append(text[:300])
+
+    return "\n".join(chunks) if chunks else None
 
 
 def _extract_docx(file_path: str) -> Optional[str]:
@@ -85,7 +93,11 @@ def _extract_docx(file_path: str) -> Optional[str]:
     except ImportError:
         return None
 
-    doc = Document(file_path)
+    return docx_body_text(Document(file_path))
+
+
+def docx_body_text(doc) -> Optional[str]:
+    """이미 파싱된 python-docx 문서에서 단락 기반 본문 추출"""
     paragraphs = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
     return "\n".join(paragraphs)[:5000] if paragraphs else None
 
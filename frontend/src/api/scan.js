@@ -35,6 +35,8 @@ export function connectProgress(scanId, onMessage, onComplete, onError) {
   }
 
   es.onerror = (e) => {
+    // 연결이 잠시 끊긴 경우 브라우저가 Last-Event-ID로 자동 재접속 — 스캔은 서버에서 계속 진행됨
+    if (es.readyState === EventSource.CONNECTING) return
     es.close()
     onError?.(e)
   }